@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Book, Loan, Reservation, Notification
+from .models import Book, BorrowerProfile, DailyLoanStats, Loan, Reservation, Notification, OutboxMessage
 
 @admin.register(Book)
 class BookAdmin(admin.ModelAdmin):
@@ -9,8 +9,8 @@ class BookAdmin(admin.ModelAdmin):
 
 @admin.register(Loan)
 class LoanAdmin(admin.ModelAdmin):
-    list_display = ('book', 'user', 'loan_date', 'due_date', 'returned')
-    list_filter = ('returned', 'loan_date')
+    list_display = ('book', 'user', 'loan_date', 'due_date', 'returned', 'fine_amount', 'fine_paid')
+    list_filter = ('returned', 'fine_paid', 'loan_date')
     search_fields = ('book__title', 'user__username')
 
 @admin.register(Reservation)
@@ -21,4 +21,19 @@ class ReservationAdmin(admin.ModelAdmin):
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('subject', 'recipient', 'created_at', 'read')
-    list_filter = ('read', 'created_at')
\ No newline at end of file
+    list_filter = ('read', 'created_at')
+
+@admin.register(BorrowerProfile)
+class BorrowerProfileAdmin(admin.ModelAdmin):
+    list_display = ('user', 'active_loans')
+    search_fields = ('user__username',)
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipient', 'status', 'attempts', 'next_attempt_at')
+    list_filter = ('status',)
+
+@admin.register(DailyLoanStats)
+class DailyLoanStatsAdmin(admin.ModelAdmin):
+    list_display = ('day', 'loans', 'returns', 'late_returns', 'open_due')
+    date_hierarchy = 'day'
@@ -0,0 +1,80 @@
+# conditional.py
+import hashlib
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from .models import TableVersion
+
+class ConditionalGetMixin:
+    """
+    ETag y Last-Modified para `list` y `retrieve` de un viewset.
+
+    Los validadores salen de la versión de las tablas en `version_tables`
+    (una consulta de pocas filas), no del contenido serializado: si el
+    cliente envía If-None-Match o If-Modified-Since vigentes se responde 304
+    sin ejecutar la consulta ni el serializer. `version_tables` debe incluir
+    todas las tablas que aparecen en la respuesta, también las anidadas.
+
+    Si el detalle solo muestra su fila, `row_version_field` (p. ej.
+    'updated_at') lo versiona con la marca de esa fila: otras escrituras
+    sobre la tabla no lo invalidan.
+    """
+    version_tables = ()
+    row_version_field = None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        versions = self.get_versions(**kwargs)
+        self.table_versions = versions
+        etag = self.get_etag(request, versions)
+        modified = [updated_at for _, updated_at in versions.values()]
+        last_modified = int(max(modified).timestamp()) if modified else None
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        else:
+            response = not_modified
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # Datos autenticados: el navegador debe revalidar siempre y no compartir la copia
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
+
+    def get_versions(self, **kwargs) -> dict:
+        """{tabla: (versión, última escritura)} que validan esta respuesta."""
+        if self.action != 'retrieve' or not self.row_version_field:
+            return TableVersion.current(self.version_tables)
+        try:
+            stamp = (
+                self.get_queryset()
+                .filter(**{self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]})
+                .values_list(self.row_version_field, flat=True)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            stamp = None
+        if stamp is None:
+            # No existe: el detalle responde 404 sin validadores
+            return {}
+        return {self.version_tables[0]: (int(stamp.timestamp() * 1_000_000), stamp)}
+
+    def get_etag(self, request, versions: dict) -> str:
+        """Ruta con parámetros, formato negociado y versión de cada tabla."""
+        media_type = getattr(request, 'accepted_media_type', '')
+        state = ','.join(f'{table}:{versions.get(table, (0,))[0]}' for table in self.version_tables)
+        digest = hashlib.md5(
+            f'{request.get_full_path()}|{media_type}|{state}'.encode(),
+            usedforsecurity=False
+        ).hexdigest()
+        return quote_etag(digest)
@@ -3,10 +3,12 @@ from abc import ABC, abstractmethod
 from typing import Tuple, Optional
 
 from django.apps import apps
+from ..services.notification.notification_writer import NotificationWriter
 
 class BaseNotificationFactory(ABC):
-    def __init__(self):
+    def __init__(self, writer: Optional[NotificationWriter] = None):
         self.Notification = apps.get_model('biblioteca', 'Notification')
+        self.writer = writer
 
     @abstractmethod
     def create_notification(self) -> Tuple[str, str]:
@@ -17,6 +19,15 @@ class BaseNotificationFactory(ABC):
         """
         pass
 
+    @abstractmethod
+    def render_notification(self) -> Tuple[str, str]:
+        """
+        Construye el asunto y el mensaje sin guardarlos, para envíos por lotes.
+        Returns:
+            Tuple[str, str]: Una tupla con (asunto, mensaje)
+        """
+        pass
+
     def save_notification(self, subject: str, message: str, recipient: str) -> Optional[object]:
         """
         Guarda la notificación en la base de datos.
@@ -26,8 +37,11 @@ class BaseNotificationFactory(ABC):
             recipient (str): Destinatario de la notificación
         Returns:
             Optional[object]: El objeto Notification creado o None si hay error
+        Con un NotificationWriter la fila se guarda en el siguiente vaciado del buffer.
         """
         try:
+            if self.writer is not None:
+                return self.writer.add(subject, message, recipient)
             return self.Notification.objects.create(
                 subject=subject,
                 message=message,
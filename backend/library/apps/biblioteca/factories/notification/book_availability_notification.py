@@ -6,6 +6,11 @@ from ..base_notification import BaseNotificationFactory
 
 class BookAvailableNotificationFactory(BaseNotificationFactory):
     def create_notification(self, book: Book, user: User) -> Tuple[str, str]:
+        subject, message = self.render_notification(book, user)
+        self.save_notification(subject, message, user.email)
+        return subject, message
+
+    def render_notification(self, book: Book, user: User) -> Tuple[str, str]:
         if not user.email:
             raise ValueError("El usuario no tiene email registrado")
 
@@ -16,6 +21,4 @@ class BookAvailableNotificationFactory(BaseNotificationFactory):
             f"Por favor, pase por la biblioteca para retirarlo en los próximos 2 días.\n\n"
             f"Saludos cordiales,\nBiblioteca"
         )
-        
-        self.save_notification(subject, message, user.email)
         return subject, message
\ No newline at end of file
@@ -5,11 +5,16 @@ from ..base_notification import BaseNotificationFactory
 from ...models import Loan
 
 class DueDateNotificationFactory(BaseNotificationFactory):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, writer=None):
+        super().__init__(writer)
         self.Loan = apps.get_model('biblioteca', 'Loan')
 
     def create_notification(self, loan: 'Loan') -> Tuple[str, str]:
+        subject, message = self.render_notification(loan)
+        self.save_notification(subject, message, loan.user.email)
+        return subject, message
+
+    def render_notification(self, loan: 'Loan') -> Tuple[str, str]:
         if not loan.user.email:
             raise ValueError("El usuario no tiene email registrado")
 
@@ -21,6 +26,4 @@ class DueDateNotificationFactory(BaseNotificationFactory):
             f"Por favor, asegúrese de devolverlo a tiempo para evitar sanciones.\n\n"
             f"Saludos cordiales,\nBiblioteca"
         )
-        
-        self.save_notification(subject, message, loan.user.email)
         return subject, message
\ No newline at end of file
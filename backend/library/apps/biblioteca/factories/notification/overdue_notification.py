@@ -5,6 +5,11 @@ from ..base_notification import BaseNotificationFactory
 
 class OverdueNotificationFactory(BaseNotificationFactory):
     def create_notification(self, loan: Loan) -> Tuple[str, str]:
+        subject, message = self.render_notification(loan)
+        self.save_notification(subject, message, loan.user.email)
+        return subject, message
+
+    def render_notification(self, loan: Loan) -> Tuple[str, str]:
         if not loan.user.email:
             raise ValueError("El usuario no tiene email registrado")
 
@@ -16,6 +21,4 @@ class OverdueNotificationFactory(BaseNotificationFactory):
             f"Por favor, devuélvalo lo antes posible para evitar sanciones adicionales.\n\n"
             f"Saludos cordiales,\nBiblioteca"
         )
-        
-        self.save_notification(subject, message, loan.user.email)
         return subject, message
\ No newline at end of file
@@ -0,0 +1,81 @@
+# management/commands/benchmark_aging.py
+import random
+import time
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from ...models import Book, DailyLoanStats, Loan
+from ...services.report.loan_report_service import LoanReportService
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el histograma de vencidos desde el resumen diario con el cálculo en Python '
+        'sobre préstamos sintéticos'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loans', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        service = LoanReportService()
+
+        # Los datos sintéticos se descartan al terminar
+        with transaction.atomic():
+            self._populate(options['loans'], options['batch_size'], options['seed'])
+            # bulk_create no mantiene el resumen diario
+            DailyLoanStats.rebuild()
+            overdue = Loan.objects.filter(returned=False, due_date__lt=timezone.localdate())
+
+            sql = self._measure(service._group_by_days_overdue, options['repeat'])
+            python = self._measure(lambda: self._group_in_python(service, overdue), options['repeat'])
+            self.stdout.write(f'Resumen diario (CASE): {sql * 1000:.1f} ms')
+            self.stdout.write(f'Python sobre Loan:     {python * 1000:.1f} ms (x{python / sql if sql else 0:.1f})')
+            transaction.set_rollback(True)
+
+    def _populate(self, total: int, batch_size: int, seed: int) -> None:
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        user = User.objects.create_user('benchmark_aging', 'benchmark@biblioteca.local')
+        books = Book.objects.bulk_create([
+            Book(title=f'Libro {index}', author='Autor', genre='Novela', code=f'AGING-{index:05d}')
+            for index in range(1000)
+        ])
+        today = timezone.localdate()
+        for offset in range(0, total, batch_size):
+            Loan.objects.bulk_create([
+                Loan(
+                    book=books[index % len(books)],
+                    user=user,
+                    due_date=today - timedelta(days=rng.randint(-15, 180))
+                )
+                for index in range(offset, min(offset + batch_size, total))
+            ])
+        self.stdout.write(f'{total} préstamos abiertos generados en {time.perf_counter() - start:.1f}s')
+
+    def _group_in_python(self, service, overdue):
+        """Referencia: trae los vencidos y los agrupa en Python."""
+        today = timezone.localdate()
+        buckets = {label: [0, 0] for label, _, _ in service._get_aging_buckets()}
+        for due_date in overdue.values_list('due_date', flat=True).iterator(chunk_size=10000):
+            days_late = (today - due_date).days
+            for label, low, high in service._get_aging_buckets():
+                if days_late >= low and (high is None or days_late <= high):
+                    buckets[label][0] += 1
+                    buckets[label][1] += Loan.fine_for(due_date, today)
+                    break
+        return buckets
+
+    def _measure(self, run, repeat: int) -> float:
+        """Devuelve la mediana del tiempo de ejecución."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return sorted(timings)[len(timings) // 2]
@@ -0,0 +1,316 @@
+# management/commands/benchmark_api.py
+import json
+import math
+import time
+import tracemalloc
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from ...models import Book, BorrowerProfile, Loan, Notification, Reservation
+from ...services.dataset.dataset_service import DatasetService
+
+
+class Command(BaseCommand):
+    help = (
+        'Recorre todas las rutas de la API (y las de JWT) con el cliente de pruebas y reporta '
+        'latencia p50/p95/p99, consultas por petición y memoria pico'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='Peticiones medidas por ruta')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--only', help='Solo las rutas cuyo nombre contenga este texto')
+        parser.add_argument('--no-generate', action='store_true',
+                            help='Usa los datos existentes en lugar de generar un conjunto sintético')
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--books', type=int, default=10000)
+        parser.add_argument('--loans', type=int, default=50000)
+        parser.add_argument('--reservations', type=int, default=2000)
+        parser.add_argument('--notifications', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--baseline', help='JSON con resultados previos para comparar')
+        parser.add_argument('--save-baseline', help='Guarda los resultados en este JSON')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Aumento relativo de p95 que se considera regresión')
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        iterations = options['warmup'] + options['requests'] + 1
+
+        # Todo lo generado y lo que escriben las peticiones se descarta al
+        # terminar. Los on_commit (versiones de tabla, invalidación de cachés)
+        # se ejecutan al terminar cada paso, como al confirmar su transacción
+        with transaction.atomic():
+            if not options['no_generate']:
+                start = time.perf_counter()
+                with self._committed():
+                    created = DatasetService(seed=options['seed']).generate(
+                        users=options['users'],
+                        books=options['books'],
+                        loans=options['loans'],
+                        reservations=options['reservations'],
+                        notifications=options['notifications']
+                    )
+                self.stdout.write(
+                    f"Datos: {', '.join(f'{value} {name}' for name, value in created.items())} "
+                    f"({time.perf_counter() - start:.1f}s)"
+                )
+
+            client = Client()
+            with self._committed():
+                state = self._prepare(client, iterations)
+            results = {}
+            for name, run, after in self._scenarios(client, state):
+                if options['only'] and options['only'] not in name:
+                    continue
+                results[name] = self._measure(run, after, options['warmup'], options['requests'])
+            transaction.set_rollback(True)
+
+        self._report(results)
+        regressions = []
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as handle:
+                regressions = self._compare(results, json.load(handle)['results'], options['threshold'])
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w', encoding='utf-8') as handle:
+                json.dump({
+                    'created_at': timezone.now().isoformat(),
+                    'options': {
+                        key: options[key]
+                        for key in ('requests', 'users', 'books', 'loans', 'reservations', 'notifications')
+                    },
+                    'results': results,
+                }, handle, indent=2)
+            self.stdout.write(f"Resultados guardados en {options['save_baseline']}")
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} regresiones: {", ".join(regressions)}')
+
+    def _prepare(self, client, iterations: int) -> dict:
+        """Usuario de benchmark, su token y los datos que consumen las rutas que escriben."""
+        user = User.objects.create_user(
+            'benchmark_api', 'benchmark_api@biblioteca.local', DatasetService.PASSWORD, is_staff=True
+        )
+        Notification.objects.bulk_create([
+            Notification(subject='Aviso', message='Benchmark', recipient=user.email)
+            for _ in range(50)
+        ])
+        tokens = client.post(
+            '/api/token/', {'username': user.username, 'password': DatasetService.PASSWORD}
+        ).json()
+        if 'access' not in tokens:
+            raise CommandError(f'No se pudo obtener el token JWT: {tokens}')
+
+        busy = BorrowerProfile.objects.filter(active_loans__gt=0).values('user_id')
+        borrowers = list(
+            User.objects.exclude(id__in=busy).exclude(id=user.id).values_list('id', flat=True)[:iterations]
+        )
+        if not borrowers:
+            raise CommandError('No hay usuarios sin préstamos; genere datos o quite --no-generate')
+
+        return {
+            'user': user,
+            'headers': {'Authorization': f"Bearer {tokens['access']}"},
+            'refresh': tokens['refresh'],
+            'user_id': User.objects.order_by('id').values_list('id', flat=True).first(),
+            'book_id': Book.objects.order_by('id').values_list('id', flat=True).first(),
+            'loan_id': Loan.objects.order_by('id').values_list('id', flat=True).first(),
+            'reservation_id': Reservation.objects.order_by('id').values_list('id', flat=True).first(),
+            'borrowed': list(
+                Book.objects.filter(status='borrowed')
+                .exclude(reservations__user=user)
+                .values_list('id', flat=True)[:iterations]
+            ),
+            'borrowers': borrowers,
+            'books': [],
+            'loans': [],
+            'reservations': [],
+        }
+
+    def _scenarios(self, client, state: dict) -> list:
+        """
+        (nombre, petición, después) por ruta, en un orden en que cada escritura
+        tiene sus datos listos. `después` guarda lo creado fuera de la medición.
+        """
+        headers = state['headers']
+        # /metrics no usa el JWT: su token o, sin él, la sesión del usuario
+        # (staff) en un cliente aparte, para no sumar la sesión a las demás rutas
+        metrics_client = Client()
+        metrics_headers = {}
+        if settings.METRICS_TOKEN:
+            metrics_headers['Authorization'] = f'Bearer {settings.METRICS_TOKEN}'
+        else:
+            metrics_client.force_login(state['user'])
+        since = (timezone.localdate() - timedelta(days=30)).isoformat()
+
+        def get(path, **params):
+            return lambda i: client.get(path, params, headers=headers)
+
+        def remember(key):
+            return lambda i, response: state[key].append(response.json().get('id'))
+
+        def remember_reservation(i, response):
+            state['reservations'].append(
+                Reservation.objects.filter(
+                    book_id=state['borrowed'][i % len(state['borrowed'])],
+                    user=state['user'],
+                    active=True
+                ).values_list('id', flat=True).first()
+            )
+
+        return [
+            ('token_obtain', lambda i: client.post('/api/token/', {
+                'username': state['user'].username, 'password': DatasetService.PASSWORD
+            }), None),
+            ('token_refresh', lambda i: client.post(
+                '/api/token/refresh/', {'refresh': state['refresh']}
+            ), None),
+            ('api_root', get('/api/'), None),
+            ('users_list', get('/api/users/'), None),
+            ('users_detail', get(f"/api/users/{state['user_id']}/"), None),
+            ('users_fines', get(f"/api/users/{state['user_id']}/fines/"), None),
+            ('users_library_fines', get('/api/users/fines/'), None),
+            ('books_list', get('/api/books/'), None),
+            ('books_list_keyset', get('/api/books/', page_size=50), None),
+            ('books_detail', get(f"/api/books/{state['book_id']}/"), None),
+            ('books_search', get('/api/books/search/', query='amor soledad'), None),
+            ('books_create', lambda i: client.post('/api/books/', {
+                'title': f'Libro de benchmark {i}', 'author': 'Autor', 'genre': 'Novela',
+                'code': f'BENCH-API-{i:06d}'
+            }, headers=headers), remember('books')),
+            ('books_update', lambda i: client.patch(
+                f"/api/books/{state['books'][i]}/", {'title': f'Libro corregido {i}'},
+                content_type='application/json', headers=headers
+            ), None),
+            ('loans_list', get('/api/loans/'), None),
+            ('loans_list_keyset', get('/api/loans/', page_size=50), None),
+            ('loans_list_sparse', get(
+                '/api/loans/', page_size=50, fields='id,due_date,book.title,user.username'
+            ), None),
+            ('loans_detail', get(f"/api/loans/{state['loan_id']}/"), None),
+            ('loans_overdue', get('/api/loans/overdue/', page_size=50), None),
+            ('loans_statistics', get('/api/loans/statistics/', start_date=since), None),
+            ('loans_create', lambda i: client.post('/api/loans/', {
+                'book_id': state['books'][i],
+                'user_id': state['borrowers'][i % len(state['borrowers'])],
+                'due_date': (timezone.localdate() + timedelta(days=15)).isoformat()
+            }, headers=headers), remember('loans')),
+            ('loans_return_book', lambda i: client.post(
+                f"/api/loans/{state['loans'][i]}/return_book/", headers=headers
+            ), None),
+            ('books_delete', lambda i: client.delete(
+                f"/api/books/{state['books'][i]}/", headers=headers
+            ), None),
+            ('reservations_list', get('/api/reservations/'), None),
+            ('reservations_detail', get(f"/api/reservations/{state['reservation_id']}/"), None),
+            ('reservations_active', get('/api/reservations/active/', page_size=50), None),
+            ('reservations_create', lambda i: client.post('/api/reservations/', {
+                'book_id': state['borrowed'][i % len(state['borrowed'])],
+                'user_id': state['user'].id
+            }, headers=headers), remember_reservation),
+            ('reservations_cancel', lambda i: client.post(
+                f"/api/reservations/{state['reservations'][i]}/cancel/", headers=headers
+            ), None),
+            ('notifications_list', get('/api/notifications/'), None),
+            ('notifications_unread_count', get('/api/notifications/unread_count/'), None),
+            ('notifications_mark_read', lambda i: client.post(
+                '/api/notifications/mark_read/', {'all': True}, content_type='application/json',
+                headers=headers
+            ), None),
+            ('exports_loans', get('/api/exports/loans/', start_date=since, status='open'), None),
+            ('exports_books', get('/api/exports/books/', status='borrowed', file_format='ndjson'), None),
+            ('exports_loan_report', get('/api/exports/loan_report/', report='monthly'), None),
+            ('exports_book_report', get('/api/exports/book_report/', report='genres'), None),
+            ('debug_profiles', get('/api/debug/profiles/'), None),
+            ('metrics', lambda i: metrics_client.get('/metrics', headers=metrics_headers), None),
+        ]
+
+    def _measure(self, run, after, warmup: int, requests: int) -> dict:
+        timings = []
+        queries = []
+        errors = 0
+        for index in range(warmup + requests):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                with self._committed():
+                    response = run(index)
+                    self._consume(response)
+                elapsed = time.perf_counter() - start
+            if after:
+                after(index, response)
+            if index < warmup:
+                continue
+            timings.append(elapsed * 1000)
+            queries.append(len(context.captured_queries))
+            errors += int(response.status_code >= 400)
+
+        # Memoria en una petición aparte: tracemalloc distorsiona la latencia
+        tracemalloc.start()
+        try:
+            with self._committed():
+                response = run(warmup + requests)
+                self._consume(response)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        if after:
+            after(warmup + requests, response)
+
+        timings.sort()
+        return {
+            'p50_ms': round(self._percentile(timings, 50), 2),
+            'p95_ms': round(self._percentile(timings, 95), 2),
+            'p99_ms': round(self._percentile(timings, 99), 2),
+            'queries': max(queries),
+            'peak_kb': round(peak / 1024, 1),
+            'errors': errors,
+        }
+
+    def _committed(self):
+        """Ejecuta al salir los on_commit registrados dentro, como si se confirmara."""
+        return TestCase.captureOnCommitCallbacks(execute=True)
+
+    def _consume(self, response) -> None:
+        if getattr(response, 'streaming', False):
+            for _ in response.streaming_content:
+                pass
+
+    def _percentile(self, ordered: list, percentile: int) -> float:
+        """Percentil por rango más cercano sobre una lista ordenada."""
+        return ordered[max(0, math.ceil(percentile / 100 * len(ordered)) - 1)]
+
+    def _report(self, results: dict) -> None:
+        self.stdout.write(
+            f"{'ruta':<30}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'consultas':>11}{'pico KB':>10}{'errores':>9}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<30}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                f"{result['queries']:>11}{result['peak_kb']:>10.1f}{result['errors']:>9}"
+            )
+
+    def _compare(self, results: dict, baseline: dict, threshold: float) -> list:
+        """Compara p95 y consultas con la línea base. Devuelve las rutas con regresión."""
+        regressions = []
+        self.stdout.write(f"\n{'ruta':<30}{'p95 base':>10}{'p95':>10}{'cambio':>9}{'consultas':>13}")
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if previous is None:
+                self.stdout.write(f'{name:<30}{"(nueva)":>10}')
+                continue
+            change = result['p95_ms'] / previous['p95_ms'] - 1 if previous['p95_ms'] else 0.0
+            regressed = change > threshold or result['queries'] > previous['queries']
+            line = (
+                f"{name:<30}{previous['p95_ms']:>10.2f}{result['p95_ms']:>10.2f}{change:>+9.0%}"
+                f"{previous['queries']:>6} → {result['queries']:<4}"
+            )
+            if regressed:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        return regressions
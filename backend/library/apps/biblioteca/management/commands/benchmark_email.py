@@ -0,0 +1,130 @@
+# management/commands/benchmark_email.py
+import socket
+import socketserver
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from ...services.notification.email_service import EmailService
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara send_email (una conexión reutilizada, un envío por llamada) con send_bulk '
+        '(lotes) contra un servidor SMTP local'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=1000)
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        received = []
+        host, port, stop = self._start_server(received)
+        smtp_settings = {
+            'EMAIL_BACKEND': 'django.core.mail.backends.smtp.EmailBackend',
+            'EMAIL_HOST': host,
+            'EMAIL_PORT': port,
+            'EMAIL_USE_TLS': False,
+            'EMAIL_HOST_USER': '',
+            'EMAIL_HOST_PASSWORD': '',
+            'DEFAULT_FROM_EMAIL': 'biblioteca@localhost',
+        }
+        service = EmailService()
+        total = options['messages']
+        recipients = [f'lector{index}@biblioteca.local' for index in range(total)]
+
+        try:
+            with override_settings(**smtp_settings):
+                start = time.perf_counter()
+                single_ok = sum(
+                    service.send_email('Benchmark', 'Mensaje de prueba', recipient)
+                    for recipient in recipients
+                )
+                single = time.perf_counter() - start
+                service.close()
+
+                messages = [
+                    service.build_message('Benchmark', 'Mensaje de prueba', recipient)
+                    for recipient in recipients
+                ]
+                start = time.perf_counter()
+                results = service.send_bulk(messages, options['batch_size'])
+                bulk = time.perf_counter() - start
+        finally:
+            stop()
+
+        bulk_ok = sum(1 for result in results if result['sent'])
+        self.stdout.write(f'Servidor SMTP local {host}:{port}, {len(received)} emails recibidos')
+        self.stdout.write(f'send_email: {single_ok}/{total} en {single:.2f}s ({total / single:.0f} emails/s)')
+        self.stdout.write(
+            f'send_bulk (lotes de {options["batch_size"]}): {bulk_ok}/{total} en {bulk:.2f}s '
+            f'({total / bulk:.0f} emails/s, x{single / bulk:.1f})'
+        )
+
+    def _start_server(self, received):
+        """Inicia un servidor SMTP que descarta los mensajes (aiosmtpd o uno propio)."""
+        host = '127.0.0.1'
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError:
+            Controller = None
+
+        if Controller is not None:
+            class Handler:
+                async def handle_DATA(self, server, session, envelope):
+                    received.append(envelope.rcpt_tos)
+                    return '250 OK'
+
+            with socket.socket() as probe:
+                probe.bind((host, 0))
+                port = probe.getsockname()[1]
+            controller = Controller(Handler(), hostname=host, port=port)
+            controller.start()
+            return host, port, controller.stop
+
+        # smtpd y asyncore ya no existen desde Python 3.12: sumidero mínimo propio
+        server = socketserver.ThreadingTCPServer((host, 0), self._sink_handler(received))
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.1}, daemon=True)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+            thread.join(timeout=1)
+        return host, server.server_address[1], stop
+
+    def _sink_handler(self, received):
+        """Atiende el diálogo SMTP básico de smtplib y descarta el contenido."""
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                self.wfile.write(f'{line}\r\n'.encode())
+
+            def handle(self):
+                self.reply('220 localhost ESMTP')
+                recipients = []
+                for raw in self.rfile:
+                    command = raw.decode(errors='replace').strip().upper()
+                    if command.startswith('EHLO'):
+                        self.reply('250-localhost')
+                        self.reply('250 8BITMIME')
+                    elif command.startswith('RCPT'):
+                        recipients.append(raw.decode(errors='replace').split(':', 1)[1].strip())
+                        self.reply('250 OK')
+                    elif command == 'DATA':
+                        self.reply('354 Fin con <CRLF>.<CRLF>')
+                        for line in self.rfile:
+                            if line.rstrip(b'\r\n') == b'.':
+                                break
+                        received.append(recipients)
+                        recipients = []
+                        self.reply('250 OK')
+                    elif command == 'QUIT':
+                        self.reply('221 Adiós')
+                        return
+                    else:
+                        # HELO, MAIL, RSET, NOOP
+                        self.reply('250 OK')
+        return Handler
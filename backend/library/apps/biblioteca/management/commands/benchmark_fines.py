@@ -0,0 +1,93 @@
+# management/commands/benchmark_fines.py
+import random
+import time
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from ...models import Book, Loan
+from ...services.fine.fine_service import FineService
+
+PREFIX = 'bench-fines'
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara las multas acumuladas agrupadas por fecha límite con el cálculo préstamo '
+        'por préstamo, sobre préstamos abiertos sintéticos'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loans', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        service = FineService()
+
+        # Los datos sintéticos se descartan al terminar
+        with transaction.atomic():
+            users = self._populate(options['loans'], options['users'], options['batch_size'], options['seed'])
+            # El total de la biblioteca cubre todos los préstamos, no solo los sintéticos
+            loans = Loan.objects.all()
+
+            library = service.get_library_fines()
+            per_loan = self._per_loan(service, loans)
+            if library['accrued'] != per_loan:
+                raise CommandError(
+                    f"Totales distintos: agrupado {library['accrued']}, por préstamo {per_loan}"
+                )
+            self.stdout.write(f"{library['accrued_loans']} préstamos con multa, {library['accrued']} acumulado")
+
+            user_id = random.Random(options['seed']).choice(users)
+            for name, run in (
+                ('biblioteca (por fecha límite)', service.get_library_fines),
+                ('biblioteca (caché)', service.get_cached_library_fines),
+                ('por préstamo (Python)', lambda: self._per_loan(service, loans)),
+                ('usuario', lambda: service.get_user_fines(user_id)),
+            ):
+                self.stdout.write(f"{name:<32}{self._measure(run, options['repeat']) * 1000:>10.1f} ms")
+            transaction.set_rollback(True)
+
+    def _populate(self, total: int, users: int, batch_size: int, seed: int) -> list:
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        User.objects.bulk_create([
+            User(username=f'{PREFIX}-{index}', email=f'{PREFIX}-{index}@biblioteca.local')
+            for index in range(users)
+        ])
+        user_ids = list(User.objects.filter(username__startswith=PREFIX).values_list('id', flat=True))
+        books = Book.objects.bulk_create([
+            Book(title=f'Libro {index}', author='Autor', genre='Novela', code=f'{PREFIX}-{index:05d}')
+            for index in range(1000)
+        ])
+        today = timezone.localdate()
+        for offset in range(0, total, batch_size):
+            Loan.objects.bulk_create([
+                Loan(
+                    book=books[index % len(books)],
+                    user_id=user_ids[index % len(user_ids)],
+                    due_date=today - timedelta(days=rng.randint(-15, 180))
+                )
+                for index in range(offset, min(offset + batch_size, total))
+            ])
+        self.stdout.write(f'{total} préstamos abiertos generados en {time.perf_counter() - start:.1f}s')
+        return user_ids
+
+    def _per_loan(self, service: FineService, loans) -> int:
+        """Referencia: trae cada préstamo abierto y calcula su multa en Python."""
+        today = timezone.localdate()
+        due_dates = loans.filter(returned=False).values_list('due_date', flat=True)
+        return sum(service._fine(due_date, today) for due_date in due_dates.iterator(chunk_size=10000))
+
+    def _measure(self, run, repeat: int) -> float:
+        """Devuelve la mediana del tiempo de ejecución."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return sorted(timings)[len(timings) // 2]
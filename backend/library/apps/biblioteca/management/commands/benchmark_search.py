@@ -0,0 +1,77 @@
+# management/commands/benchmark_search.py
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from ...models import Book
+from ...services.book.book_search_service import BookSearchService
+
+WORDS = [
+    'árbol', 'ciencia', 'años', 'soledad', 'amor', 'tiempos', 'cólera', 'ciudad',
+    'perros', 'casa', 'espíritus', 'sombra', 'viento', 'laberinto', 'pasión',
+    'noche', 'mar', 'río', 'montaña', 'corazón', 'historia', 'guerra', 'paz',
+    'jardín', 'senderos', 'bifurcan', 'ficciones', 'rayuela', 'pedro', 'páramo',
+]
+AUTHORS = [
+    'Gabriel García Márquez', 'Mario Vargas Llosa', 'Isabel Allende',
+    'Jorge Luis Borges', 'Julio Cortázar', 'Juan Rulfo', 'Pío Baroja',
+    'Benito Pérez Galdós', 'Miguel de Cervantes', 'Carlos Ruiz Zafón',
+]
+GENRES = ['Novela', 'Poesía', 'Ensayo', 'Cuento', 'Teatro', 'Historia', 'Ciencia ficción']
+QUERIES = [
+    ('arbol', 'all'), ('garcia marquez', 'author'), ('soledad', 'title'),
+    ('poes', 'genre'), ('BENCH-00042', 'code'), ('corazon guerra', 'all'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compara la búsqueda FTS5 con la búsqueda LIKE sobre un catálogo sintético'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        service = BookSearchService()
+        if not service.is_fts_available():
+            self.stderr.write('El índice FTS5 no está disponible; ejecute las migraciones en SQLite')
+            return
+
+        # Los datos sintéticos se descartan al terminar
+        with transaction.atomic():
+            self._populate(options['books'], options['batch_size'], options['seed'])
+            self.stdout.write(f"{'consulta':<28}{'tipo':<8}{'LIKE (ms)':>12}{'FTS5 (ms)':>12}{'x':>8}")
+            for query, search_type in QUERIES:
+                like = self._measure(lambda: service.search_like(query, search_type), options['repeat'])
+                fts = self._measure(lambda: service.search(query, search_type), options['repeat'])
+                self.stdout.write(
+                    f"{query:<28}{search_type:<8}{like * 1000:>12.2f}{fts * 1000:>12.2f}"
+                    f"{like / fts if fts else 0:>8.1f}"
+                )
+            transaction.set_rollback(True)
+
+    def _populate(self, total: int, batch_size: int, seed: int) -> None:
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        for offset in range(0, total, batch_size):
+            Book.objects.bulk_create([
+                Book(
+                    title=' '.join(rng.sample(WORDS, rng.randint(2, 5))).capitalize(),
+                    author=rng.choice(AUTHORS),
+                    genre=rng.choice(GENRES),
+                    code=f'BENCH-{index:08d}',
+                )
+                for index in range(offset, min(offset + batch_size, total))
+            ])
+        self.stdout.write(f'{total} libros generados en {time.perf_counter() - start:.1f}s')
+
+    def _measure(self, build_queryset, repeat: int) -> float:
+        """Devuelve la mediana del tiempo de evaluar los primeros 50 resultados."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(build_queryset()[:50])
+            timings.append(time.perf_counter() - start)
+        return sorted(timings)[len(timings) // 2]
@@ -0,0 +1,80 @@
+# management/commands/benchmark_serializers.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from ...models import Book, Loan, Reservation
+from ...serializers.book_serializers import BookListSerializer
+from ...serializers.loan_serializers import LoanDetailSerializer
+from ...serializers.reservation_serializers import ReservationDetailSerializer
+from ...serializers.row_mappers import RowMapper
+from ...services.dataset.dataset_service import DatasetService
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara en filas/s los serializers de DRF con los RowMapper de los listados '
+        '(consulta + representación + JSON) y verifica que el JSON sea idéntico'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=20000)
+        parser.add_argument('--loans', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        # Los datos sintéticos se descartan al terminar
+        with transaction.atomic():
+            start = time.perf_counter()
+            DatasetService(seed=options['seed']).generate(
+                users=max(options['loans'] // 20, 10),
+                books=options['books'],
+                loans=options['loans'],
+                reservations=options['loans'] // 10,
+                notifications=0
+            )
+            self.stdout.write(f'Datos generados en {time.perf_counter() - start:.1f}s')
+
+            self.stdout.write(
+                f"{'listado':<14}{'filas':>9}{'serializer f/s':>17}{'mapper f/s':>14}{'mejora':>9}"
+            )
+            for name, serializer_class, queryset in (
+                ('books', BookListSerializer, Book.objects.order_by('title', 'id')),
+                ('loans', LoanDetailSerializer,
+                 Loan.objects.select_related('book', 'user').order_by('-loan_date', '-id')),
+                ('reservations', ReservationDetailSerializer,
+                 Reservation.objects.select_related('book', 'user').order_by('-reservation_date', '-id')),
+            ):
+                self._compare(name, serializer_class, queryset, options['repeat'])
+            transaction.set_rollback(True)
+
+    def _compare(self, name: str, serializer_class, queryset, repeat: int) -> None:
+        mapper = RowMapper(serializer_class)
+        renderer = JSONRenderer()
+
+        def with_serializer():
+            return renderer.render(serializer_class(list(queryset), many=True).data)
+
+        def with_mapper():
+            return renderer.render(mapper.map_rows(mapper.map_queryset(queryset)))
+
+        if with_serializer() != with_mapper():
+            raise CommandError(f'{name}: el RowMapper no produce el mismo JSON que {serializer_class.__name__}')
+
+        rows = queryset.count()
+        serializer_time = self._measure(with_serializer, repeat)
+        mapper_time = self._measure(with_mapper, repeat)
+        self.stdout.write(
+            f'{name:<14}{rows:>9}{rows / serializer_time:>17.0f}{rows / mapper_time:>14.0f}'
+            f'{serializer_time / mapper_time:>8.1f}x'
+        )
+
+    def _measure(self, run, repeat: int) -> float:
+        """Devuelve la mediana del tiempo de ejecución."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return sorted(timings)[len(timings) // 2]
@@ -0,0 +1,151 @@
+# management/commands/benchmark_sqlite.py
+import math
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from ...models import Book, DailyLoanStats, Loan, Notification, OutboxMessage
+from ...services.loan.loan_service import LoanService
+
+PREFIX = 'bench-sqlite'
+
+# Valores por defecto de SQLite y de Django, para comparar
+BASELINE_OPTIONS = {'init_command': 'PRAGMA journal_mode=DELETE;PRAGMA synchronous=FULL'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Préstamos y devoluciones concurrentes con lectores en paralelo, con la configuración '
+        'por defecto de SQLite y con el perfil de producción (WAL, pragmas, BEGIN IMMEDIATE)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--books-per-writer', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('La base por defecto no es SQLite')
+        if connection.is_in_memory_db():
+            raise CommandError('Se necesita una base SQLite en archivo')
+
+        database = connections.settings['default']
+        original = database.get('OPTIONS', {})
+        production = {
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in settings.SQLITE_PRAGMAS.items()),
+            'transaction_mode': 'IMMEDIATE',
+        }
+        books, users = self._setup(options['writers'], options['books_per_writer'])
+        try:
+            self.stdout.write(
+                f"{'perfil':<12}{'op/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+                f"{'lecturas/s':>12}{'bloqueos':>10}{'errores':>9}"
+            )
+            for name, profile_options in (('sqlite', BASELINE_OPTIONS), ('producción', production)):
+                database['OPTIONS'] = profile_options
+                connections.close_all()
+                self._report(name, self._run(books, users, options))
+        finally:
+            database['OPTIONS'] = original
+            connections.close_all()
+            self._cleanup()
+
+    def _setup(self, writers: int, books_per_writer: int):
+        Book.objects.bulk_create([
+            Book(title=f'Bench {i}', author='Bench', genre='Bench', code=f'{PREFIX}-{i}')
+            for i in range(writers * books_per_writer)
+        ])
+        books = list(Book.objects.filter(code__startswith=PREFIX).order_by('id'))
+        users = [
+            User.objects.create_user(f'{PREFIX}-{i}', f'{PREFIX}-{i}@biblioteca.local')
+            for i in range(writers)
+        ]
+        # Cada escritor usa sus propios libros: se mide la contención, no los rechazos
+        return [books[i::writers] for i in range(writers)], users
+
+    def _run(self, books: list, users: list, options: dict) -> dict:
+        deadline = time.perf_counter() + options['seconds']
+        latencies = []
+        outcomes = Counter()
+        reads = Counter()
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['writers'] + options['readers'])
+
+        def writer(index):
+            service = LoanService()
+            own = books[index]
+            barrier.wait()
+            attempt = 0
+            while time.perf_counter() < deadline:
+                book = own[attempt % len(own)]
+                attempt += 1
+                start = time.perf_counter()
+                try:
+                    loan = service.create_loan(users[index].id, book.id)
+                    service.process_return(loan.id)
+                    outcome = 'ok'
+                except Exception as e:
+                    outcome = 'bloqueo' if 'locked' in str(e) else 'error'
+                elapsed = time.perf_counter() - start
+                with lock:
+                    outcomes[outcome] += 1
+                    if outcome == 'ok':
+                        latencies.append(elapsed * 1000)
+            connection.close()
+
+        def reader():
+            barrier.wait()
+            while time.perf_counter() < deadline:
+                try:
+                    list(Loan.objects.select_related('book', 'user').filter(returned=False)[:50])
+                    outcome = 'ok'
+                except OperationalError:
+                    outcome = 'bloqueo'
+                with lock:
+                    reads[outcome] += 1
+            connection.close()
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(options['writers'])]
+        threads += [threading.Thread(target=reader) for _ in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        latencies.sort()
+        return {
+            'ops': outcomes['ok'] / options['seconds'],
+            'p50': self._percentile(latencies, 50),
+            'p95': self._percentile(latencies, 95),
+            'p99': self._percentile(latencies, 99),
+            'reads': reads['ok'] / options['seconds'],
+            'locked': outcomes['bloqueo'] + reads['bloqueo'],
+            'errors': outcomes['error'],
+        }
+
+    def _report(self, name: str, result: dict) -> None:
+        self.stdout.write(
+            f"{name:<12}{result['ops']:>9.1f}{result['p50']:>9.1f}{result['p95']:>9.1f}{result['p99']:>9.1f}"
+            f"{result['reads']:>12.1f}{result['locked']:>10}{result['errors']:>9}"
+        )
+
+    def _percentile(self, ordered: list, percentile: int) -> float:
+        """Percentil por rango más cercano sobre una lista ordenada."""
+        if not ordered:
+            return 0.0
+        return ordered[max(0, math.ceil(percentile / 100 * len(ordered)) - 1)]
+
+    def _cleanup(self) -> None:
+        recipients = {'recipient__startswith': PREFIX}
+        OutboxMessage.objects.filter(**recipients).delete()
+        Notification.objects.filter(**recipients).delete()
+        Loan.objects.filter(book__code__startswith=PREFIX).delete()
+        Book.objects.filter(code__startswith=PREFIX).delete()
+        User.objects.filter(username__startswith=PREFIX).delete()
+        # Los préstamos borrados siguen contados en el resumen diario
+        DailyLoanStats.rebuild()
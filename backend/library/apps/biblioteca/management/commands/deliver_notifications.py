@@ -0,0 +1,45 @@
+# management/commands/deliver_notifications.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from ...services.notification.outbox_service import OutboxService, get_outbox_settings
+
+
+class Command(BaseCommand):
+    help = 'Entrega en segundo plano los emails encolados en el outbox'
+
+    def add_arguments(self, parser):
+        config = get_outbox_settings()
+        parser.add_argument('--workers', type=int, default=config['WORKERS'])
+        parser.add_argument('--batch-size', type=int, default=config['BATCH_SIZE'])
+        parser.add_argument('--poll-interval', type=float, default=5.0)
+        parser.add_argument('--once', action='store_true', help='Vacía la cola y termina')
+
+    def handle(self, *args, **options):
+        service = OutboxService()
+        totals = {'sent': 0, 'retry': 0, 'dead': 0}
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            try:
+                while True:
+                    results = service.deliver_batch(
+                        executor, options['batch_size'], options['workers']
+                    )
+                    for key, value in results.items():
+                        totals[key] += value
+                    if any(results.values()):
+                        self.stdout.write(
+                            f"enviados {results['sent']}, reintentos {results['retry']}, "
+                            f"descartados {results['dead']}"
+                        )
+                        continue
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Total: enviados {totals['sent']}, reintentos {totals['retry']}, "
+            f"descartados {totals['dead']}"
+        ))
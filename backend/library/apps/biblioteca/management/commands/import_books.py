@@ -0,0 +1,104 @@
+# management/commands/import_books.py
+import json
+import os
+import sys
+import time
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from ...services.book.book_import_service import BookImportService
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa libros desde un archivo CSV o JSONL (o la entrada estándar con "-"), '
+        'creando o actualizando por código'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Ruta del archivo, o "-" para leer de stdin')
+        parser.add_argument('--format', dest='file_format', choices=BookImportService.FORMATS,
+                            help='Por defecto se deduce de la extensión del archivo')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--checkpoint',
+                            help='Archivo de progreso para reanudar (por defecto <archivo>.checkpoint)')
+        parser.add_argument('--restart', action='store_true', help='Ignora el progreso guardado')
+        parser.add_argument('--rejects', help='Guarda las filas rechazadas en este archivo')
+        parser.add_argument('--dry-run', action='store_true', help='Valida sin escribir en la base de datos')
+
+    def handle(self, *args, **options):
+        source = options['source']
+        file_format = options['file_format'] or self._guess_format(source)
+        checkpoint = options['checkpoint'] or (None if source == '-' else f'{source}.checkpoint')
+        skip = 0 if options['restart'] else self._load_checkpoint(checkpoint, source)
+        if skip:
+            self.stdout.write(f'Reanudando después de la fila {skip}')
+
+        service = BookImportService(chunk_size=options['chunk_size'])
+        totals = {'rows': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'duplicates': 0, 'rejected': 0}
+        rejects = open(options['rejects'], 'a', encoding='utf-8') if options['rejects'] else None
+        stream = sys.stdin if source == '-' else open(source, encoding='utf-8-sig', newline='')
+        start = time.perf_counter()
+
+        try:
+            for stats in service.import_rows(
+                service.read_rows(stream, file_format),
+                skip=skip,
+                dry_run=options['dry_run']
+            ):
+                for number, error in stats['rejected']:
+                    if rejects:
+                        rejects.write(json.dumps({'row': number, 'error': error}, ensure_ascii=False) + '\n')
+                    elif totals['rejected'] < 20:
+                        self.stderr.write(f'Fila {number}: {error}')
+                stats['rejected'] = len(stats['rejected'])
+                for key in totals:
+                    totals[key] += stats[key]
+
+                if checkpoint and not options['dry_run']:
+                    self._save_checkpoint(checkpoint, source, stats['last_row'])
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"Fila {stats['last_row']}: {totals['rows'] / elapsed:.0f} filas/s"
+                )
+        except ValidationError as e:
+            raise CommandError(' '.join(e.messages))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if rejects:
+                rejects.close()
+
+        if checkpoint and not options['dry_run'] and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['rows']} filas en {elapsed:.1f}s ({totals['rows'] / elapsed if elapsed else 0:.0f} filas/s): "
+            f"{totals['created']} creados, {totals['updated']} actualizados, "
+            f"{totals['unchanged']} sin cambios, {totals['duplicates']} duplicados, "
+            f"{totals['rejected']} rechazados"
+        ))
+
+    def _guess_format(self, source: str) -> str:
+        extension = os.path.splitext(source)[1].lower()
+        if extension in ('.jsonl', '.ndjson'):
+            return 'jsonl'
+        if extension == '.csv':
+            return 'csv'
+        raise CommandError('No se puede deducir el formato, indique --format')
+
+    def _load_checkpoint(self, checkpoint: str, source: str) -> int:
+        if not checkpoint or not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint, encoding='utf-8') as handle:
+            progress = json.load(handle)
+        if progress.get('source') != source:
+            raise CommandError(f'El progreso de {checkpoint} corresponde a otro archivo, use --restart')
+        return progress['last_row']
+
+    def _save_checkpoint(self, checkpoint: str, source: str, last_row: int) -> None:
+        # Se escribe a un temporal y se renombra para no dejar un archivo a medias
+        temporary = f'{checkpoint}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as handle:
+            json.dump({'source': source, 'last_row': last_row}, handle)
+        os.replace(temporary, checkpoint)
@@ -0,0 +1,13 @@
+# management/commands/rebuild_loan_counters.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from ...models import BorrowerProfile
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de préstamos activos de cada usuario desde la tabla Loan'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            corrected = BorrowerProfile.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'{corrected} contadores corregidos'))
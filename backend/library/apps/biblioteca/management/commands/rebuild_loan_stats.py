@@ -0,0 +1,15 @@
+# management/commands/rebuild_loan_stats.py
+import time
+from django.core.management.base import BaseCommand
+from ...models import DailyLoanStats
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el resumen diario de préstamos (DailyLoanStats) desde la tabla Loan'
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        days = DailyLoanStats.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'{days} días recalculados ({time.perf_counter() - start:.2f}s)'
+        ))
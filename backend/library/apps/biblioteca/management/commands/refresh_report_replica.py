@@ -0,0 +1,70 @@
+# management/commands/refresh_report_replica.py
+import os
+import sqlite3
+import time
+from contextlib import closing, suppress
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from ...routers import get_replica_settings
+
+
+class Command(BaseCommand):
+    help = (
+        'Copia la base principal al snapshot de solo lectura de los reportes con la API de '
+        'backup en línea de SQLite, cada REPORT_REPLICA["REFRESH_SECONDS"] o una vez con --once'
+    )
+
+    def add_arguments(self, parser):
+        config = get_replica_settings()
+        parser.add_argument('--interval', type=float, default=config['REFRESH_SECONDS'])
+        parser.add_argument('--once', action='store_true', help='Una sola copia y termina')
+        parser.add_argument('--output', help='Archivo destino (por defecto el NAME de la réplica)')
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('La base principal no es SQLite')
+        target = options['output'] or self._replica_path()
+        if target == str(source.settings_dict['NAME']):
+            raise CommandError('El destino es la misma base principal')
+
+        try:
+            while True:
+                start = time.perf_counter()
+                pages = self._refresh(source, target)
+                self.stdout.write(
+                    f'Snapshot {target}: {pages} páginas en {(time.perf_counter() - start) * 1000:.0f} ms'
+                )
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def _replica_path(self) -> str:
+        alias = get_replica_settings()['ALIAS']
+        if alias not in connections.settings:
+            raise CommandError(f"No hay una base '{alias}' en DATABASES")
+        replica = connections[alias]
+        if replica.vendor != 'sqlite':
+            raise CommandError(f"La base '{alias}' no es SQLite; la actualiza la replicación de su motor")
+        return str(replica.settings_dict['NAME'])
+
+    def _refresh(self, source, target: str) -> int:
+        """
+        Copia en un archivo temporal y lo renombra sobre el snapshot: las
+        conexiones abiertas terminan de leer la copia anterior y las nuevas ven
+        la nueva, nunca una a medias. En WAL la copia no bloquea escrituras.
+        """
+        temporary = f'{target}.tmp'
+        with suppress(FileNotFoundError):
+            os.remove(temporary)
+
+        source.ensure_connection()
+        with closing(sqlite3.connect(temporary)) as snapshot:
+            source.connection.backup(snapshot)
+            # Un solo archivo, sin -wal ni -shm, para abrirlo en solo lectura
+            snapshot.execute('PRAGMA journal_mode=DELETE')
+            pages = snapshot.execute('PRAGMA page_count').fetchone()[0]
+        os.replace(temporary, target)
+        return pages
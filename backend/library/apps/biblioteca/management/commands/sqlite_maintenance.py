@@ -0,0 +1,80 @@
+# management/commands/sqlite_maintenance.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Mantenimiento de la base SQLite: PRAGMA optimize (por defecto), ANALYZE completo, '
+        'vacuum incremental y checkpoint del WAL'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--analyze', action='store_true',
+                            help='ANALYZE completo en lugar de PRAGMA optimize')
+        parser.add_argument('--vacuum', action='store_true',
+                            help='Libera páginas vacías con PRAGMA incremental_vacuum')
+        parser.add_argument('--pages', type=int, default=0,
+                            help='Páginas a liberar con --vacuum (0 = todas las libres)')
+        parser.add_argument('--enable-incremental', action='store_true',
+                            help='Activa auto_vacuum=INCREMENTAL; requiere un VACUUM completo una vez')
+        parser.add_argument('--checkpoint', action='store_true',
+                            help='PRAGMA wal_checkpoint(TRUNCATE) para vaciar el archivo WAL')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f"La base '{options['database']}' no es SQLite")
+
+        with connection.cursor() as cursor:
+            before = self._stats(cursor)
+            self.stdout.write(
+                f"{before['pages']} páginas de {before['page_size']} bytes, "
+                f"{before['free']} libres, auto_vacuum={before['auto_vacuum']}"
+            )
+
+            if options['enable_incremental'] and before['auto_vacuum'] != 'incremental':
+                # Cambiar auto_vacuum solo tiene efecto tras reconstruir el archivo
+                self._run(cursor, 'PRAGMA auto_vacuum=INCREMENTAL', 'VACUUM')
+            elif options['vacuum']:
+                if before['auto_vacuum'] != 'incremental':
+                    raise CommandError('auto_vacuum no es INCREMENTAL; ejecute una vez con --enable-incremental')
+                self._run(cursor, f"PRAGMA incremental_vacuum({options['pages']})")
+
+            if options['analyze']:
+                self._run(cursor, 'ANALYZE')
+            else:
+                # Solo analiza las tablas cuyas estadísticas lo necesitan
+                self._run(cursor, 'PRAGMA optimize')
+
+            if options['checkpoint']:
+                cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                busy, log_frames, checkpointed = cursor.fetchone()
+                self.stdout.write(f'Checkpoint: {checkpointed}/{log_frames} páginas del WAL (busy={busy})')
+
+            after = self._stats(cursor)
+        self.stdout.write(self.style.SUCCESS(
+            f"{after['pages']} páginas, {after['free']} libres "
+            f"({(before['pages'] - after['pages']) * after['page_size'] / 1024:.0f} KB liberados)"
+        ))
+
+    def _run(self, cursor, *statements: str) -> None:
+        for statement in statements:
+            start = time.perf_counter()
+            cursor.execute(statement)
+            cursor.fetchall()
+            self.stdout.write(f'{statement}: {(time.perf_counter() - start) * 1000:.0f} ms')
+
+    def _stats(self, cursor) -> dict:
+        values = {}
+        for name in ('page_count', 'page_size', 'freelist_count', 'auto_vacuum'):
+            cursor.execute(f'PRAGMA {name}')
+            values[name] = cursor.fetchone()[0]
+        return {
+            'pages': values['page_count'],
+            'page_size': values['page_size'],
+            'free': values['freelist_count'],
+            'auto_vacuum': {0: 'none', 1: 'full', 2: 'incremental'}[values['auto_vacuum']],
+        }
@@ -0,0 +1,107 @@
+# management/commands/stress_checkout.py
+import threading
+import time
+from collections import Counter
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from ...models import Book, BorrowerProfile, Loan
+from ...services.loan.loan_service import LoanService
+
+PREFIX = 'stress-checkout'
+
+
+class Command(BaseCommand):
+    help = 'Lanza préstamos concurrentes sobre pocos libros y verifica que no haya préstamos dobles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--books', type=int, default=20)
+        parser.add_argument('--users', type=int, default=4)
+        parser.add_argument('--attempts', type=int, default=50, help='Intentos por hilo')
+
+    def handle(self, *args, **options):
+        books, users = self._setup(options['books'], options['users'])
+        results = Counter()
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['threads'])
+
+        def worker(index):
+            service = LoanService()
+            barrier.wait()
+            for attempt in range(options['attempts']):
+                book = books[(index + attempt) % len(books)]
+                user = users[(index * 7 + attempt) % len(users)]
+                try:
+                    service.create_loan(user.id, book.id)
+                    outcome = 'ok'
+                except ValidationError:
+                    outcome = 'rechazado'
+                except Exception:
+                    outcome = 'error'
+                with lock:
+                    results[outcome] += 1
+            connection.close()
+
+        try:
+            start = time.perf_counter()
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(options['threads'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            self.stdout.write(f'{sum(results.values())} intentos en {elapsed:.2f}s: {dict(results)}')
+            self._verify(books, users)
+            self._report_query_count(users[0])
+        finally:
+            Loan.objects.filter(book__code__startswith=PREFIX).delete()
+            Book.objects.filter(code__startswith=PREFIX).delete()
+            User.objects.filter(username__startswith=PREFIX).delete()
+
+    def _setup(self, total_books: int, total_users: int):
+        books = Book.objects.bulk_create([
+            Book(title=f'Stress {i}', author='Stress', genre='Stress', code=f'{PREFIX}-{i}')
+            for i in range(total_books)
+        ])
+        users = [
+            User.objects.create_user(f'{PREFIX}-{i}', f'{PREFIX}-{i}@biblioteca.com')
+            for i in range(total_users)
+        ]
+        return list(Book.objects.filter(code__startswith=PREFIX)), users
+
+    def _verify(self, books, users) -> None:
+        active = Loan.objects.filter(book__in=books, returned=False)
+        double_lent = active.values('book').annotate(total=Count('id')).filter(total__gt=1)
+        over_limit = active.values('user').annotate(total=Count('id')).filter(
+            total__gt=LoanService().MAX_LOANS
+        )
+        orphan_books = Book.objects.filter(id__in=[b.id for b in books], status='borrowed').exclude(
+            loans__returned=False
+        )
+        drifted = [
+            user for user in users
+            if BorrowerProfile.get_active_loans(user.id)
+            != Loan.objects.filter(user=user, returned=False).count()
+        ]
+        checks = {
+            'libros prestados dos veces': double_lent.count(),
+            'usuarios sobre el límite': over_limit.count(),
+            'contadores desfasados': len(drifted),
+            'libros marcados sin préstamo': orphan_books.count(),
+        }
+        for label, value in checks.items():
+            style = self.style.SUCCESS if value == 0 else self.style.ERROR
+            self.stdout.write(style(f'{label}: {value}'))
+
+    def _report_query_count(self, user) -> None:
+        book = Book.objects.create(title='Stress', author='Stress', genre='Stress', code=f'{PREFIX}-q')
+        for loan in Loan.objects.filter(user=user, returned=False):
+            LoanService().process_return(loan.id)
+        with CaptureQueriesContext(connection) as context:
+            LoanService().create_loan(user.id, book.id)
+        self.stdout.write(f'Consultas por préstamo: {len(context)}')
@@ -0,0 +1,53 @@
+# management/commands/sweep_loan_notifications.py
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from ...services.notification.loan_reminder_service import LoanReminderService
+
+
+class Command(BaseCommand):
+    help = 'Genera los avisos diarios de préstamos vencidos y próximos a vencer'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            choices=[LoanReminderService.KIND_OVERDUE, LoanReminderService.KIND_DUE_DATE, 'all'],
+            default='all'
+        )
+        parser.add_argument('--date', help='Fecha del barrido (AAAA-MM-DD), por defecto hoy')
+        parser.add_argument('--reminder-days', type=int, default=2,
+                            help='Días de anticipación del recordatorio de devolución')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--no-email', action='store_true', help='Solo guarda las notificaciones')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            run_date = date.fromisoformat(options['date']) if options['date'] else timezone.localdate()
+        except ValueError:
+            raise CommandError('Fecha inválida, use el formato AAAA-MM-DD')
+
+        service = LoanReminderService(reminder_days=options['reminder_days'])
+        kinds = (
+            [service.KIND_OVERDUE, service.KIND_DUE_DATE]
+            if options['kind'] == 'all' else [options['kind']]
+        )
+
+        for kind in kinds:
+            start = time.perf_counter()
+            totals = {'candidates': 0, 'created': 0, 'skipped': 0, 'rejected': 0}
+            for stats in service.sweep(
+                kind,
+                run_date,
+                chunk_size=options['chunk_size'],
+                send_email=not options['no_email'],
+                dry_run=options['dry_run']
+            ):
+                for key, value in stats.items():
+                    totals[key] += value
+            self.stdout.write(self.style.SUCCESS(
+                f"{kind} {run_date}: {totals['candidates']} préstamos, {totals['created']} avisos, "
+                f"{totals['skipped']} ya enviados hoy, {totals['rejected']} sin email "
+                f"({time.perf_counter() - start:.2f}s)"
+            ))
@@ -0,0 +1,167 @@
+# metrics.py
+"""
+Métricas Prometheus de la capa de servicios y de las vistas.
+
+`instrument_service` e `instrument_viewset` envuelven los métodos públicos
+de una clase para contar llamadas y errores y registrar la latencia en un
+histograma. Los hijos de cada métrica (una combinación de etiquetas) se
+resuelven una sola vez al decorar la clase, así una llamada solo suma al
+contador y al histograma ya creados, sin búsquedas ni objetos nuevos.
+
+Con varios procesos (gunicorn) se debe definir PROMETHEUS_MULTIPROC_DIR
+antes de arrancar: cada proceso escribe sus valores en archivos mmap de ese
+directorio y /metrics los agrega. El directorio se vacía al desplegar y el
+hook `child_exit` de gunicorn debe llamar a `mark_process_dead(worker.pid)`.
+"""
+import inspect
+import os
+import time
+from functools import wraps
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import Http404
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client import multiprocess
+from rest_framework.exceptions import APIException
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SERVICE_CALLS = Counter(
+    'biblioteca_service_calls_total', 'Llamadas a métodos de servicio', ['service', 'method']
+)
+SERVICE_ERRORS = Counter(
+    'biblioteca_service_errors_total',
+    'Llamadas a métodos de servicio que fallaron (sin contar validaciones ni 4xx)',
+    ['service', 'method']
+)
+SERVICE_LATENCY = Histogram(
+    'biblioteca_service_duration_seconds', 'Duración de los métodos de servicio',
+    ['service', 'method'], buckets=LATENCY_BUCKETS
+)
+VIEW_CALLS = Counter(
+    'biblioteca_view_requests_total', 'Peticiones atendidas por acción de viewset', ['view', 'action']
+)
+VIEW_ERRORS = Counter(
+    'biblioteca_view_errors_total', 'Acciones de viewset con error de servidor o respuesta 5xx',
+    ['view', 'action']
+)
+VIEW_LATENCY = Histogram(
+    'biblioteca_view_duration_seconds', 'Duración de las acciones de viewset',
+    ['view', 'action'], buckets=LATENCY_BUCKETS
+)
+EMAIL_LATENCY = Histogram(
+    'biblioteca_email_send_duration_seconds', 'Duración del envío de cada email por SMTP',
+    ['mode'], buckets=LATENCY_BUCKETS
+)
+EMAIL_ERRORS = Counter(
+    'biblioteca_email_send_errors_total', 'Emails que no se pudieron enviar', ['mode']
+)
+RESPONSE_CACHE_REQUESTS = Counter(
+    'biblioteca_response_cache_requests_total', 'Consultas a la caché de respuestas del catálogo',
+    ['action', 'result']
+)
+REPORT_DATABASE = Counter(
+    'biblioteca_report_database_total', 'Reportes y exportaciones por base de datos usada', ['database']
+)
+
+VIEW_ACTIONS = ('list', 'create', 'retrieve', 'update', 'partial_update', 'destroy')
+
+def _timed(function, calls, errors, latency, is_error=None):
+    """Envuelve `function` con hijos de métricas ya resueltos."""
+    inc_calls = calls.inc
+    inc_errors = errors.inc
+    observe = latency.observe
+    perf_counter = time.perf_counter
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as exc:
+            if not _is_client_error(exc):
+                inc_errors()
+            raise
+        else:
+            if is_error is not None and is_error(result):
+                inc_errors()
+            return result
+        finally:
+            observe(perf_counter() - start)
+            inc_calls()
+    return wrapper
+
+def instrument_service(cls):
+    """Decorador de clase: mide los métodos públicos definidos en el servicio."""
+    service = cls.__name__
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.isfunction(attribute):
+            continue
+        setattr(cls, name, _timed(
+            attribute,
+            SERVICE_CALLS.labels(service, name),
+            SERVICE_ERRORS.labels(service, name),
+            SERVICE_LATENCY.labels(service, name)
+        ))
+    return cls
+
+def instrument_viewset(cls):
+    """Decorador de clase: mide las acciones estándar y las @action del viewset."""
+    view = cls.__name__
+    names = [name for name in VIEW_ACTIONS if hasattr(cls, name)]
+    names += [action.__name__ for action in cls.get_extra_actions()]
+    for name in names:
+        setattr(cls, name, _timed(
+            getattr(cls, name),
+            VIEW_CALLS.labels(view, name),
+            VIEW_ERRORS.labels(view, name),
+            VIEW_LATENCY.labels(view, name),
+            is_error=_is_server_error
+        ))
+    return cls
+
+def _is_server_error(response) -> bool:
+    return getattr(response, 'status_code', 200) >= 500
+
+def _is_client_error(exc: BaseException) -> bool:
+    """Excepciones que terminan en una respuesta 4xx: no son fallas del servicio."""
+    if isinstance(exc, APIException):
+        return exc.status_code < 500
+    return isinstance(exc, (Http404, PermissionDenied, ValidationError))
+
+class NotificationBacklogCollector:
+    """Mensajes pendientes del outbox, consultados en cada lectura de /metrics."""
+
+    def collect(self):
+        from .services.notification.outbox_service import OutboxService
+
+        backlog = GaugeMetricFamily(
+            'biblioteca_notification_outbox_backlog',
+            'Emails pendientes de entrega en el outbox'
+        )
+        backlog.add_metric([], OutboxService().get_backlog())
+        yield backlog
+
+def render_metrics() -> tuple:
+    """Devuelve (contenido, content type) en formato de texto de Prometheus."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = CollectorRegistry()
+        registry.register(_DefaultCollectors())
+    registry.register(NotificationBacklogCollector())
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+class _DefaultCollectors:
+    """Expone el registro global del proceso dentro de un registro propio."""
+
+    def collect(self):
+        return REGISTRY.collect()
+
+def mark_process_dead(pid: int) -> None:
+    """Para el hook `child_exit` de gunicorn en modo multiproceso."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,65 @@
+# Índice de texto completo (FTS5) para el catálogo de libros
+
+from django.db import migrations
+
+
+FTS_FORWARD_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS biblioteca_book_fts USING fts5(
+        title, author, genre, code,
+        content='biblioteca_book',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS biblioteca_book_fts_ai AFTER INSERT ON biblioteca_book BEGIN
+        INSERT INTO biblioteca_book_fts(rowid, title, author, genre, code)
+        VALUES (new.id, new.title, new.author, new.genre, new.code);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS biblioteca_book_fts_ad AFTER DELETE ON biblioteca_book BEGIN
+        INSERT INTO biblioteca_book_fts(biblioteca_book_fts, rowid, title, author, genre, code)
+        VALUES ('delete', old.id, old.title, old.author, old.genre, old.code);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS biblioteca_book_fts_au
+    AFTER UPDATE OF title, author, genre, code ON biblioteca_book BEGIN
+        INSERT INTO biblioteca_book_fts(biblioteca_book_fts, rowid, title, author, genre, code)
+        VALUES ('delete', old.id, old.title, old.author, old.genre, old.code);
+        INSERT INTO biblioteca_book_fts(rowid, title, author, genre, code)
+        VALUES (new.id, new.title, new.author, new.genre, new.code);
+    END
+    """,
+    "INSERT INTO biblioteca_book_fts(biblioteca_book_fts) VALUES ('rebuild')",
+]
+
+FTS_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS biblioteca_book_fts_au",
+    "DROP TRIGGER IF EXISTS biblioteca_book_fts_ad",
+    "DROP TRIGGER IF EXISTS biblioteca_book_fts_ai",
+    "DROP TABLE IF EXISTS biblioteca_book_fts",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        # El índice FTS5 solo existe en SQLite; otros motores usan la búsqueda LIKE
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biblioteca', '0003_alter_book_options_alter_loan_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FTS_FORWARD_SQL), _run(FTS_REVERSE_SQL)),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.5 on 2026-10-18 04:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_active_loans(apps, schema_editor):
+    Loan = apps.get_model('biblioteca', 'Loan')
+    BorrowerProfile = apps.get_model('biblioteca', 'BorrowerProfile')
+    counts = (
+        Loan.objects.filter(returned=False)
+        .order_by()
+        .values('user')
+        .annotate(total=Count('id'))
+    )
+    BorrowerProfile.objects.bulk_create(
+        [BorrowerProfile(user_id=row['user'], active_loans=row['total']) for row in counts],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('biblioteca', '0005_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BorrowerProfile',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='borrower_profile', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('active_loans', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Perfil de lector',
+                'verbose_name_plural': 'Perfiles de lector',
+            },
+        ),
+        migrations.RunPython(populate_active_loans, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-18 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biblioteca', '0008_loan_notification_sweep'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'read', 'created_at'], name='notification_inbox_idx'),
+        ),
+    ]
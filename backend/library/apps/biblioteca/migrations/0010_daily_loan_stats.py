@@ -0,0 +1,72 @@
+# Generated by Django 5.1.5 on 2026-10-18 04:47
+
+import datetime
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def populate_daily_loan_stats(apps, schema_editor):
+    Loan = apps.get_model('biblioteca', 'Loan')
+    DailyLoanStats = apps.get_model('biblioteca', 'DailyLoanStats')
+    rows = {}
+
+    def row(day):
+        return rows.setdefault(day, DailyLoanStats(day=day))
+
+    created = (
+        Loan.objects.annotate(day=TruncDate('loan_date'))
+        .order_by().values('day').annotate(total=Count('id'))
+    )
+    for item in created:
+        row(item['day']).loans = item['total']
+
+    returned = (
+        Loan.objects.filter(returned=True, returned_date__isnull=False)
+        .annotate(day=TruncDate('returned_date'))
+        .order_by().values('day')
+        .annotate(
+            total=Count('id'),
+            duration=Sum(F('returned_date') - F('loan_date')),
+            late=Count('id', filter=Q(day__gt=F('due_date')))
+        )
+    )
+    for item in returned:
+        stats = row(item['day'])
+        stats.returns = item['total']
+        stats.total_duration = item['duration'] or datetime.timedelta()
+        stats.late_returns = item['late']
+
+    open_loans = Loan.objects.filter(returned=False).order_by().values('due_date').annotate(total=Count('id'))
+    for item in open_loans:
+        row(item['due_date']).open_due = item['total']
+
+    DailyLoanStats.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biblioteca', '0009_notification_inbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyLoanStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('loans', models.PositiveIntegerField(default=0)),
+                ('returns', models.PositiveIntegerField(default=0)),
+                ('total_duration', models.DurationField(default=datetime.timedelta)),
+                ('late_returns', models.PositiveIntegerField(default=0)),
+                ('open_due', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Resumen diario de préstamos',
+                'verbose_name_plural': 'Resúmenes diarios de préstamos',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.RunPython(populate_daily_loan_stats, migrations.RunPython.noop),
+    ]
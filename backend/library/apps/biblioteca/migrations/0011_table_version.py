@@ -0,0 +1,32 @@
+# Generated by Django 5.1.5 on 2026-10-18 05:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+VERSIONED_TABLES = ['book', 'loan', 'reservation', 'user']
+
+def create_versions(apps, schema_editor):
+    TableVersion = apps.get_model('biblioteca', 'TableVersion')
+    TableVersion.objects.bulk_create([TableVersion(table=table) for table in VERSIONED_TABLES])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biblioteca', '0010_daily_loan_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('table', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Versión de tabla',
+                'verbose_name_plural': 'Versiones de tabla',
+            },
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-18 05:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('biblioteca', '0011_table_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loan',
+            name='fine_amount',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='loan',
+            name='fine_paid',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(condition=models.Q(('fine_amount__gt', 0), ('fine_paid', False)), fields=['user'], name='loan_unpaid_fine_idx'),
+        ),
+    ]
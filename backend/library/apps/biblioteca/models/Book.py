@@ -1,7 +1,16 @@
 # models/book.py
 from django.db import models
+from django.utils import timezone
+from .tableversion import VersionedModel, VersionedQuerySet
 
-class Book(models.Model):
+class BookQuerySet(VersionedQuerySet):
+    def update(self, **kwargs):
+        # `updated_at` versiona la caché y los validadores del detalle: los
+        # updates masivos (y bulk_update) también lo marcan
+        kwargs.setdefault('updated_at', timezone.now())
+        return super().update(**kwargs)
+
+class Book(VersionedModel):
     title = models.CharField(max_length=200)
     author = models.CharField(max_length=200)
     genre = models.CharField(max_length=100)
@@ -19,10 +28,15 @@ class Book(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BookQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Libro'
         verbose_name_plural = 'Libros'
         ordering = ['title']
+        indexes = [
+            models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.author}"
\ No newline at end of file
@@ -0,0 +1,105 @@
+from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.contrib.auth.models import User
+
+class BorrowerProfile(models.Model):
+    """
+    Datos de circulación de un usuario.
+
+    `active_loans` es un contador desnormalizado de préstamos no devueltos que
+    se mantiene con UPDATE atómicos al prestar y devolver, para no ejecutar un
+    COUNT(*) sobre Loan en cada préstamo. `rebuild_loan_counters` lo recalcula.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='borrower_profile'
+    )
+    active_loans = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def get_active_loans(cls, user_id: int) -> int:
+        """Devuelve el contador del usuario, creándolo si aún no existe."""
+        counter = cls.objects.filter(user_id=user_id).values_list('active_loans', flat=True).first()
+        if counter is None:
+            counter = cls._create_from_loans(user_id).active_loans
+        return counter
+
+    @classmethod
+    def increment_active_loans(cls, user_id: int, limit: int = None) -> bool:
+        """
+        Suma un préstamo activo con un UPDATE condicional.
+
+        Devuelve False si el usuario ya alcanzó `limit`.
+        """
+        profiles = cls.objects.filter(user_id=user_id)
+        if limit is not None:
+            profiles = profiles.filter(active_loans__lt=limit)
+        if profiles.update(active_loans=F('active_loans') + 1):
+            return True
+
+        if cls.objects.filter(user_id=user_id).exists():
+            return False
+        cls._create_from_loans(user_id)
+        return cls.increment_active_loans(user_id, limit)
+
+    @classmethod
+    def decrement_active_loans(cls, user_id: int, create_missing: bool = True) -> None:
+        """
+        Resta un préstamo activo sin bajar de cero.
+
+        Con `create_missing=False` no crea el perfil si no existe, p. ej. al
+        borrar en cascada un usuario cuyo perfil ya se eliminó.
+        """
+        updated = cls.objects.filter(user_id=user_id, active_loans__gt=0).update(
+            active_loans=F('active_loans') - 1
+        )
+        if not updated and create_missing and not cls.objects.filter(user_id=user_id).exists():
+            cls._create_from_loans(user_id)
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """Recalcula todos los contadores desde Loan. Devuelve los perfiles corregidos."""
+        Loan = cls._meta.apps.get_model('biblioteca', 'Loan')
+        active = (
+            Loan.objects.filter(user=OuterRef('user'), returned=False)
+            .order_by()
+            .values('user')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        expected = Coalesce(Subquery(active), 0)
+
+        missing = (
+            Loan.objects.filter(returned=False)
+            .filter(user__borrower_profile__isnull=True)
+            .values_list('user_id', flat=True)
+            .distinct()
+        )
+        cls.objects.bulk_create(
+            [cls(user_id=user_id) for user_id in missing],
+            ignore_conflicts=True
+        )
+
+        drifted = cls.objects.annotate(expected=expected).exclude(active_loans=F('expected'))
+        return cls.objects.filter(pk__in=drifted.values('pk')).update(active_loans=expected)
+
+    @classmethod
+    def _create_from_loans(cls, user_id: int) -> 'BorrowerProfile':
+        Loan = cls._meta.apps.get_model('biblioteca', 'Loan')
+        profile, _ = cls.objects.get_or_create(
+            user_id=user_id,
+            defaults={
+                'active_loans': Loan.objects.filter(user_id=user_id, returned=False).count()
+            }
+        )
+        return profile
+
+    def __str__(self):
+        return f"{self.user.username} - {self.active_loans}"
+
+    class Meta:
+        verbose_name = 'Perfil de lector'
+        verbose_name_plural = 'Perfiles de lector'
@@ -0,0 +1,210 @@
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, Q, Sum, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+class DailyLoanStats(models.Model):
+    """
+    Resumen diario de préstamos para los reportes.
+
+    Se actualiza de forma incremental al prestar, devolver, cambiar la fecha
+    límite y borrar préstamos, con UPDATE atómicos sobre la fila del día,
+    para que las estadísticas se calculen sobre un registro por día y no
+    sobre toda la tabla Loan. Los `update()` masivos de Loan sobre las
+    fechas o `returned` (y con ellos `bulk_update`) también lo mantienen,
+    ver `tracking`; `bulk_create` no: quien inserta préstamos en masa
+    (DatasetService, los benchmarks) llama a `rebuild()` al terminar.
+    `rebuild_loan_stats` lo recalcula desde Loan.
+
+    - `loans`: préstamos creados ese día.
+    - `returns`, `total_duration`, `late_returns`: devoluciones registradas
+      ese día, la suma de sus duraciones y cuántas llegaron después de la
+      fecha límite.
+    - `open_due`: préstamos sin devolver cuya fecha límite es ese día; la
+      suma de los días anteriores a hoy es el total de vencidos.
+    """
+    day = models.DateField(unique=True)
+    loans = models.PositiveIntegerField(default=0)
+    returns = models.PositiveIntegerField(default=0)
+    total_duration = models.DurationField(default=timedelta)
+    late_returns = models.PositiveIntegerField(default=0)
+    open_due = models.PositiveIntegerField(default=0)
+
+    # Contadores del resumen y su valor nulo
+    _COUNTERS = {
+        'loans': 0, 'returns': 0, 'total_duration': timedelta(), 'late_returns': 0, 'open_due': 0,
+    }
+
+    @classmethod
+    def record_loan(cls, loan_date: datetime, due_date: date) -> None:
+        """
+        Suma un préstamo al día en que se creó y a su fecha límite con un solo
+        UPDATE sobre las dos filas. Si falta alguna se crea y se suma día por
+        día; la fila que sí existía ya quedó sumada, y ninguna otra transacción
+        puede crearla mientras tanto porque SQLite solo admite una escritora
+        (el préstamo ya escribió al reclamar el libro).
+        """
+        day = cls._local_day(loan_date)
+        days = {day, due_date}
+        changes = {
+            'loans': F('loans') + Case(When(day=day, then=1), default=0),
+            'open_due': F('open_due') + Case(When(day=due_date, then=1), default=0),
+        }
+        if cls.objects.filter(day__in=days).update(**changes) == len(days):
+            return
+        existing = set(cls.objects.filter(day__in=days).values_list('day', flat=True))
+        if day not in existing:
+            cls._add(day, loans=F('loans') + 1)
+        if due_date not in existing:
+            cls._add(due_date, open_due=F('open_due') + 1)
+
+    @classmethod
+    def record_return(cls, loan_date: datetime, due_date: date, returned_date: datetime) -> None:
+        """Registra una devolución y libera el préstamo de su fecha límite."""
+        return_day = cls._local_day(returned_date)
+        changes = {
+            'returns': F('returns') + 1,
+            'total_duration': F('total_duration') + (returned_date - loan_date),
+        }
+        if return_day > due_date:
+            changes['late_returns'] = F('late_returns') + 1
+        cls._add(return_day, **changes)
+        cls.release_due(due_date)
+
+    @classmethod
+    def move_due(cls, old_due_date: date, new_due_date: date) -> None:
+        """Pasa un préstamo abierto de una fecha límite a otra."""
+        cls.release_due(old_due_date)
+        cls._add(new_due_date, open_due=F('open_due') + 1)
+
+    @classmethod
+    def remove_loan(cls, loan_date: datetime, due_date: date, returned: bool, returned_date: datetime = None) -> None:
+        """Descuenta un préstamo borrado de todos los contadores que lo incluían."""
+        cls.objects.filter(day=cls._local_day(loan_date), loans__gt=0).update(loans=F('loans') - 1)
+        if not returned:
+            cls.release_due(due_date)
+        elif returned_date:
+            return_day = cls._local_day(returned_date)
+            changes = {
+                'returns': F('returns') - 1,
+                'total_duration': F('total_duration') - (returned_date - loan_date),
+            }
+            returns = cls.objects.filter(day=return_day, returns__gt=0)
+            if return_day > due_date:
+                changes['late_returns'] = F('late_returns') - 1
+                returns = returns.filter(late_returns__gt=0)
+            returns.update(**changes)
+
+    @classmethod
+    def release_due(cls, due_date: date) -> None:
+        """Quita un préstamo abierto de su fecha límite (devuelto o borrado)."""
+        cls.objects.filter(day=due_date, open_due__gt=0).update(open_due=F('open_due') - 1)
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """Recalcula todo el resumen desde Loan. Devuelve los días guardados."""
+        Loan = cls._meta.apps.get_model('biblioteca', 'Loan')
+        rows = [cls(day=day, **values) for day, values in cls._collect(Loan.objects.all()).items()]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    @classmethod
+    @contextmanager
+    def tracking(cls, loan_ids: List[int]) -> Iterator[None]:
+        """
+        Suma al resumen lo que cambia el bloque en los préstamos indicados:
+        lo que aportaban antes menos lo que aportan después, día por día.
+        """
+        before = cls._collect_ids(loan_ids)
+        yield
+        after = cls._collect_ids(loan_ids)
+        for day in before.keys() | after.keys():
+            old, new = before.get(day, {}), after.get(day, {})
+            changes = {
+                field: F(field) + (new.get(field, zero) - old.get(field, zero))
+                for field, zero in cls._COUNTERS.items()
+                if new.get(field, zero) != old.get(field, zero)
+            }
+            if changes:
+                cls._add(day, **changes)
+
+    @classmethod
+    def _collect_ids(cls, loan_ids: List[int], chunk_size: int = 500) -> Dict[date, Dict]:
+        """`_collect` por bloques de ids, para no pasar el límite de parámetros de SQLite."""
+        Loan = cls._meta.apps.get_model('biblioteca', 'Loan')
+        rows = {}
+        for start in range(0, len(loan_ids), chunk_size):
+            chunk = cls._collect(Loan.objects.filter(id__in=loan_ids[start:start + chunk_size]))
+            for day, values in chunk.items():
+                row = rows.setdefault(day, {})
+                for field, value in values.items():
+                    row[field] = row.get(field, cls._COUNTERS[field]) + value
+        return rows
+
+    @classmethod
+    def _collect(cls, loans) -> Dict[date, Dict]:
+        """Aporte de `loans` a cada día del resumen: {día: {contador: valor}}."""
+        rows = {}
+
+        created = (
+            loans.annotate(day=TruncDate('loan_date'))
+            .order_by().values('day').annotate(total=Count('id'))
+        )
+        for item in created:
+            rows.setdefault(item['day'], {})['loans'] = item['total']
+
+        returned = (
+            loans.filter(returned=True, returned_date__isnull=False)
+            .annotate(day=TruncDate('returned_date'))
+            .order_by().values('day')
+            .annotate(
+                total=Count('id'),
+                duration=Sum(F('returned_date') - F('loan_date')),
+                late=Count('id', filter=Q(day__gt=F('due_date')))
+            )
+        )
+        for item in returned:
+            rows.setdefault(item['day'], {}).update(
+                returns=item['total'],
+                total_duration=item['duration'] or timedelta(),
+                late_returns=item['late']
+            )
+
+        open_loans = (
+            loans.filter(returned=False)
+            .order_by().values('due_date').annotate(total=Count('id'))
+        )
+        for item in open_loans:
+            rows.setdefault(item['due_date'], {})['open_due'] = item['total']
+        return rows
+
+    @classmethod
+    def _add(cls, day: date, **changes) -> None:
+        if cls.objects.filter(day=day).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(day=day)
+        except IntegrityError:
+            # Otro préstamo creó la fila del día al mismo tiempo
+            pass
+        cls.objects.filter(day=day).update(**changes)
+
+    @staticmethod
+    def _local_day(value: datetime) -> date:
+        if timezone.is_aware(value):
+            return timezone.localdate(value)
+        return value.date()
+
+    def __str__(self):
+        return f"{self.day} - {self.loans} préstamos"
+
+    class Meta:
+        verbose_name = 'Resumen diario de préstamos'
+        verbose_name_plural = 'Resúmenes diarios de préstamos'
+        ordering = ['day']
@@ -1,11 +1,36 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from datetime import date
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from .book import Book
+from .borrowerprofile import BorrowerProfile
+from .dailyloanstats import DailyLoanStats
+from .tableversion import VersionedModel, VersionedQuerySet
 
-class Loan(models.Model):
+class LoanQuerySet(VersionedQuerySet):
+    """`update()` masivo que mantiene el resumen diario si cambia fechas o devoluciones."""
+    STATS_FIELDS = {'loan_date', 'due_date', 'returned', 'returned_date'}
+
+    def update(self, **kwargs):
+        if not self.STATS_FIELDS & kwargs.keys():
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            # Los ids antes del cambio: después el filtro puede ya no cubrirlos
+            loan_ids = list(self.values_list('id', flat=True))
+            with DailyLoanStats.tracking(loan_ids):
+                return super().update(**kwargs)
+
+    def update_untracked(self, **kwargs) -> int:
+        """update() cuyo efecto en el resumen diario registra el llamador (la devolución)."""
+        return super().update(**kwargs)
+
+class Loan(VersionedModel):
     MAX_LOANS = 5  # Constante para el límite máximo de préstamos
+    GRACE_DAYS = 2  # Días de atraso sin multa
+    DAILY_FINE = 10  # Multa por cada día de atraso después de la gracia
 
     book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='loans')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='loans')
@@ -13,38 +38,112 @@ class Loan(models.Model):
     due_date = models.DateField()
     returned_date = models.DateTimeField(null=True, blank=True)
     returned = models.BooleanField(default=False)
+    # Multa cobrada al devolver (LoanService.process_return o save) y si ya se pagó
+    fine_amount = models.PositiveIntegerField(default=0)
+    fine_paid = models.BooleanField(default=False)
+
+    objects = LoanQuerySet.as_manager()
 
     def clean(self):
         if self.book.status != 'available' and not self.id:
             raise ValidationError('Este libro no está disponible para préstamo')
         
-        if self.due_date and self.due_date < timezone.now().date():
+        # Solo al prestar o cambiar la fecha: un préstamo vencido se puede devolver
+        if self.due_date and self.due_date < timezone.now().date() and self._due_date_changed():
             raise ValidationError('La fecha de devolución no puede ser anterior a hoy')
 
         # Verificar límite de préstamos
-        active_loans = Loan.objects.filter(
-            user=self.user,
-            returned=False
-        ).count()
-        
-        if active_loans >= self.MAX_LOANS and not self.id:
+        if not self.id and BorrowerProfile.get_active_loans(self.user_id) >= self.MAX_LOANS:
             raise ValidationError(f'El usuario ha alcanzado el límite de {self.MAX_LOANS} préstamos')
 
-    def save(self, *args, **kwargs):
-        self.clean()
-        if not self.id:  # Si es un nuevo préstamo
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valores guardados, para mover el préstamo en el resumen diario si
+        # cambia su fecha límite
+        instance._stored = (instance.__dict__.get('due_date'), instance.__dict__.get('returned'))
+        return instance
+
+    def save(self, *args, book_claimed=False, **kwargs):
+        # book_claimed: el servicio ya validó y reclamó el libro en la transacción
+        if not book_claimed:
+            self.clean()
+        is_new = not self.id
+        moved_from = None if is_new else self._moved_due_date()
+        is_return = False
+        if is_new and not book_claimed:  # Si es un nuevo préstamo
             self.book.status = 'borrowed'
             self.book.save()
+            BorrowerProfile.increment_active_loans(self.user_id)
         elif self.returned and not self.returned_date:
             self.returned_date = timezone.now()
             self.book.status = 'available'
             self.book.save()
+            BorrowerProfile.decrement_active_loans(self.user_id)
+            if not self.fine_amount:
+                # Misma multa que cobra LoanService.process_return
+                self.fine_amount = self.fine_for(self.due_date)
+            is_return = True
         super().save(*args, **kwargs)
 
+        if is_new:
+            DailyLoanStats.record_loan(self.loan_date, self.due_date)
+        if moved_from:
+            DailyLoanStats.move_due(moved_from, self.due_date)
+        if is_return:
+            DailyLoanStats.record_return(self.loan_date, self.due_date, self.returned_date)
+        self._stored = (self.due_date, self.returned)
+
+    @classmethod
+    def fine_for(cls, due_date: date, today: date = None) -> int:
+        """Multa de un préstamo con esa fecha límite si se devuelve `today` (hoy, hora local)."""
+        days_late = ((today or timezone.localdate()) - due_date).days
+        return max(0, days_late - cls.GRACE_DAYS) * cls.DAILY_FINE
+
+    def _stored_state(self):
+        """(due_date, returned) guardados en la base; None si el préstamo es nuevo."""
+        if not self.pk:
+            return None
+        if getattr(self, '_stored', None) is None:
+            # Instancia armada a mano, no leída de la base
+            self._stored = Loan.objects.filter(pk=self.pk).values_list('due_date', 'returned').first()
+        return self._stored
+
+    def _due_date_changed(self) -> bool:
+        stored = self._stored_state()
+        return stored is None or stored[0] != self.due_date
+
+    def _moved_due_date(self):
+        """Fecha límite anterior si el préstamo seguía abierto y cambió; si no, None."""
+        stored = self._stored_state()
+        if not stored or stored[1] or stored[0] is None or stored[0] == self.due_date:
+            return None
+        return stored[0]
+
     def __str__(self):
         return f"{self.book.title} - {self.user.username}"
 
     class Meta:
         verbose_name = 'Préstamo'
         verbose_name_plural = 'Préstamos'
-        ordering = ['-loan_date']
\ No newline at end of file
+        ordering = ['-loan_date']
+        indexes = [
+            models.Index(fields=['loan_date', 'id'], name='loan_date_id_idx'),
+            models.Index(
+                fields=['due_date'],
+                condition=models.Q(returned=False),
+                name='loan_open_due_idx'
+            ),
+            models.Index(
+                fields=['user'],
+                condition=models.Q(fine_amount__gt=0, fine_paid=False),
+                name='loan_unpaid_fine_idx'
+            ),
+        ]
+
+@receiver(post_delete, sender=Loan)
+def release_deleted_loan(sender, instance, **kwargs):
+    # También cubre QuerySet.delete() y los borrados en cascada de Book y User
+    if not instance.returned:
+        BorrowerProfile.decrement_active_loans(instance.user_id, create_missing=False)
+    DailyLoanStats.remove_loan(instance.loan_date, instance.due_date, instance.returned, instance.returned_date)
@@ -1,14 +1,111 @@
-from django.db import models
+from typing import Iterable
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+UNREAD_COUNT_KEY = 'notifications:unread:{}'
+
+class NotificationQuerySet(models.QuerySet):
+    """Invalida el contador de no leídas también en inserciones y updates masivos."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        Notification.invalidate_unread_count(obj.recipient for obj in objs)
+        return objs
+
+    def update(self, **kwargs):
+        # Solo `read` y `recipient` cambian el contador
+        if not {'read', 'recipient'} & kwargs.keys():
+            return super().update(**kwargs)
+        recipients = set(self.values_list('recipient', flat=True).distinct())
+        return self.update_for(recipients, **kwargs)
+
+    def update_for(self, recipients: Iterable[str], **kwargs) -> int:
+        """update() cuando ya se conocen los destinatarios: evita la consulta previa."""
+        updated = super().update(**kwargs)
+        if updated:
+            recipients = set(recipients)
+            if 'recipient' in kwargs:
+                recipients.add(kwargs['recipient'])
+            Notification.invalidate_unread_count(recipients)
+        return updated
+
+    def delete(self):
+        recipients = set(self.values_list('recipient', flat=True).distinct())
+        result = super().delete()
+        Notification.invalidate_unread_count(recipients)
+        return result
+
 class Notification(models.Model):
     subject = models.CharField(max_length=200)
     message = models.TextField()
     recipient = models.EmailField()
     created_at = models.DateTimeField(auto_now_add=True)
     read = models.BooleanField(default=False)
+    # Préstamo que originó el aviso; permite que los barridos diarios sean idempotentes
+    loan = models.ForeignKey(
+        'biblioteca.Loan',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notifications'
+    )
+    kind = models.CharField(max_length=20, blank=True, default='')
+    sent_on = models.DateField(null=True, blank=True)
+
+    objects = NotificationQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.invalidate_unread_count([self.recipient])
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.invalidate_unread_count([self.recipient])
+        return result
+
+    @classmethod
+    def unread_count(cls, recipient: str) -> int:
+        """Notificaciones no leídas del destinatario, servidas desde caché."""
+        key = UNREAD_COUNT_KEY.format(recipient)
+        cache = cls.unread_cache()
+        count = cache.get(key)
+        if count is None:
+            count = cls.objects.filter(recipient=recipient, read=False).count()
+            cache.set(key, count, cls.unread_cache_timeout(cache))
+        return count
+
+    @staticmethod
+    def unread_cache_timeout(cache) -> int:
+        """
+        LocMemCache es de cada proceso: no le llegan las invalidaciones del
+        barrido, del worker del outbox ni de otro worker web, así que con ella
+        el contador solo vale unos segundos.
+        """
+        if isinstance(cache, LocMemCache):
+            return getattr(settings, 'NOTIFICATION_UNREAD_LOCAL_CACHE_TIMEOUT', 5)
+        return getattr(settings, 'NOTIFICATION_UNREAD_CACHE_TIMEOUT', 3600)
+
+    @classmethod
+    def invalidate_unread_count(cls, recipients: Iterable[str]) -> None:
+        """
+        Borra el contador ahora, para que la propia transacción lea el valor
+        nuevo, y otra vez al confirmar, por si otra petición lo volvió a
+        guardar con los datos anteriores mientras tanto.
+        """
+        keys = list({UNREAD_COUNT_KEY.format(recipient) for recipient in recipients})
+        if keys:
+            cache = cls.unread_cache()
+            cache.delete_many(keys)
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def unread_cache():
+        return caches[getattr(settings, 'NOTIFICATION_UNREAD_CACHE_ALIAS', 'default')]
 
     def __str__(self):
         return f"{self.subject} - {self.recipient}"
@@ -16,4 +113,14 @@ class Notification(models.Model):
     class Meta:
         verbose_name = 'Notificación'
         verbose_name_plural = 'Notificaciones'
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', 'read', 'created_at'], name='notification_inbox_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['loan', 'kind', 'sent_on'],
+                condition=models.Q(loan__isnull=False),
+                name='unique_loan_notification_per_day'
+            ),
+        ]
\ No newline at end of file
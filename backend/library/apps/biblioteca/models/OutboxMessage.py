@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils import timezone
+
+class OutboxMessage(models.Model):
+    """
+    Email pendiente de envío (patrón transactional outbox).
+
+    Se escribe en la misma transacción que la operación que lo origina y lo
+    entrega en segundo plano el comando `deliver_notifications`.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+
+    subject = models.CharField(max_length=200)
+    message = models.TextField()
+    recipient = models.EmailField()
+    status = models.CharField(
+        max_length=10,
+        choices=[
+            (STATUS_PENDING, 'Pendiente'),
+            (STATUS_SENDING, 'Enviando'),
+            (STATUS_SENT, 'Enviado'),
+            (STATUS_DEAD, 'Descartado')
+        ],
+        default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True, default='')
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.subject} - {self.recipient} ({self.status})"
+
+    class Meta:
+        verbose_name = 'Email pendiente'
+        verbose_name_plural = 'Emails pendientes'
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ]
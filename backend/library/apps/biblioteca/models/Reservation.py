@@ -2,8 +2,9 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from .tableversion import VersionedModel
 
-class Reservation(models.Model):
+class Reservation(VersionedModel):
     book = models.ForeignKey('biblioteca.Book', on_delete=models.CASCADE, related_name='reservations')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reservations')
     reservation_date = models.DateTimeField(default=timezone.now)
@@ -30,4 +31,7 @@ class Reservation(models.Model):
     class Meta:
         verbose_name = 'Reservación'
         verbose_name_plural = 'Reservaciones'
-        ordering = ['-reservation_date']
\ No newline at end of file
+        ordering = ['-reservation_date']
+        indexes = [
+            models.Index(fields=['reservation_date', 'id'], name='reservation_date_id_idx'),
+        ]
\ No newline at end of file
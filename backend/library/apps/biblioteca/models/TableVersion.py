@@ -0,0 +1,129 @@
+import threading
+from typing import Dict, Iterable
+from django.contrib.auth.models import User
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+# Tablas con escrituras cuya versión falta sumar. Es por hilo, como la
+# conexión: otro hilo no debe sumar antes de que esta transacción confirme
+_pending = threading.local()
+
+class TableVersion(models.Model):
+    """
+    Contador de versión por tabla para los validadores HTTP (ETag y
+    Last-Modified) de las listas y detalles.
+
+    Cada escritura sobre una tabla versionada suma uno a su fila cuando la
+    transacción se confirma (`on_commit`), fuera de ella: si la fila se
+    actualizara dentro, todos los préstamos esperarían por el mismo bloqueo
+    hasta confirmar. Una versión nueva siempre llega después de los datos que
+    la causaron; en el breve intervalo entre ambos una respuesta con datos
+    nuevos puede llevar la versión anterior, que deja de valer con la suma.
+    """
+    table = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def bump(cls, *tables: str) -> None:
+        """
+        Suma una versión a cada tabla al confirmar la transacción en curso (o
+        ya, fuera de una). Las tablas de la transacción se acumulan y el
+        primer callback las suma todas; si un savepoint revertido descarta su
+        callback, sus tablas se suman igual con las demás, nunca se pierden.
+        """
+        if not hasattr(_pending, 'tables'):
+            _pending.tables = set()
+        _pending.tables.update(tables)
+        transaction.on_commit(cls._bump_pending)
+
+    @classmethod
+    def _bump_pending(cls) -> None:
+        tables, _pending.tables = _pending.tables, set()
+        if tables:
+            cls._bump_now(tables)
+
+    @classmethod
+    def _bump_now(cls, tables) -> None:
+        """Suma una versión a cada tabla, creando su fila si aún no existe."""
+        now = timezone.now()
+        updated = cls.objects.filter(table__in=tables).update(version=F('version') + 1, updated_at=now)
+        if updated < len(set(tables)):
+            existing = set(cls.objects.filter(table__in=tables).values_list('table', flat=True))
+            cls.objects.bulk_create(
+                [cls(table=table, version=1, updated_at=now) for table in set(tables) - existing],
+                ignore_conflicts=True
+            )
+
+    @classmethod
+    def current(cls, tables: Iterable[str]) -> Dict[str, tuple]:
+        """{tabla: (versión, última escritura)} en una sola consulta."""
+        return {
+            table: (version, updated_at)
+            for table, version, updated_at in cls.objects.filter(table__in=tables)
+            .values_list('table', 'version', 'updated_at')
+        }
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
+
+    class Meta:
+        verbose_name = 'Versión de tabla'
+        verbose_name_plural = 'Versiones de tabla'
+
+class VersionedQuerySet(models.QuerySet):
+    """Suma la versión de la tabla también en inserciones, updates y borrados masivos."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            TableVersion.bump(self.model._meta.model_name)
+        return objs
+
+    def bulk_update(self, objs, *args, **kwargs):
+        updated = super().bulk_update(objs, *args, **kwargs)
+        if updated:
+            TableVersion.bump(self.model._meta.model_name)
+        return updated
+
+    def update(self, **kwargs):
+        updated = super().update(**kwargs)
+        if updated:
+            TableVersion.bump(self.model._meta.model_name)
+        return updated
+
+    def delete(self):
+        result = super().delete()
+        if result[0]:
+            TableVersion.bump(*{label.split('.')[1].lower() for label in result[1]})
+        return result
+
+class VersionedModel(models.Model):
+    """Base de los modelos cuyas respuestas llevan validadores HTTP."""
+
+    objects = VersionedQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        TableVersion.bump(self._meta.model_name)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        # Incluye las tablas borradas en cascada
+        TableVersion.bump(*{label.split('.')[1].lower() for label in result[1]})
+        return result
+
+    class Meta:
+        abstract = True
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_user_version(sender, update_fields=None, **kwargs):
+    # Préstamos y reservaciones incluyen los datos del usuario; el último
+    # acceso no se serializa
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    TableVersion.bump('user')
@@ -1,5 +1,9 @@
 # models/__init__.py
 from .book import Book
+from .borrowerprofile import BorrowerProfile
+from .dailyloanstats import DailyLoanStats
 from .loan import Loan
 from .notification import Notification
-from .reservation import Reservation
\ No newline at end of file
+from .outboxmessage import OutboxMessage
+from .reservation import Reservation
+from .tableversion import TableVersion
\ No newline at end of file
@@ -1,18 +1,26 @@
 # observers/database_observer.py
-from typing import List
+from typing import List, Optional
 from django.apps import apps
 from .notification_observer import NotificationObserver
+from ..services.notification.notification_writer import NotificationWriter
 import logging
 
 logger = logging.getLogger(__name__)
 
 class DatabaseObserver(NotificationObserver):
-    def __init__(self):
+    transactional = True
+
+    def __init__(self, writer: Optional[NotificationWriter] = None):
         self.Notification = apps.get_model('biblioteca', 'Notification')
+        self.writer = writer
 
     def update(self, subject: str, message: str, recipient: str) -> bool:
-        """Guarda las notificaciones en la base de datos."""
+        """Guarda las notificaciones en la base de datos (o en el buffer del writer)."""
         try:
+            if self.writer is not None:
+                self.writer.add(subject, message, recipient)
+                return True
+
             notification = self.Notification.objects.create(
                 subject=subject,
                 message=message,
@@ -1,28 +1,27 @@
 # observers/email_observer.py
-from django.core.mail import send_mail
-from django.conf import settings
+from typing import List, Optional, Tuple
 import logging
 from .notification_observer import NotificationObserver
+from ..services.notification.email_service import EmailService
 
 logger = logging.getLogger(__name__)
 
 class EmailObserver(NotificationObserver):
+    def __init__(self, email_service: Optional[EmailService] = None):
+        self.email_service = email_service or EmailService()
+
     def update(self, subject: str, message: str, recipient: str) -> bool:
-        """Envía notificaciones por correo electrónico."""
-        try:
-            if not recipient:
-                raise ValueError("No se proporcionó un destinatario válido")
+        """Envía notificaciones por correo electrónico, reutilizando la conexión del servicio."""
+        return self.email_service.send_email(subject, message, recipient)
 
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.EMAIL_HOST_USER,
-                recipient_list=[recipient],
-                fail_silently=False,
-            )
-            logger.info(f"Email enviado exitosamente a {recipient}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error enviando email a {recipient}: {str(e)}")
-            return False
\ No newline at end of file
+    def update_many(self, notifications: List[Tuple[str, str, str]],
+                    batch_size: Optional[int] = None) -> List[bool]:
+        """
+        Envía varias notificaciones (asunto, mensaje, destinatario) reutilizando
+        la conexión SMTP. Devuelve el resultado de cada una en el mismo orden.
+        """
+        messages = [
+            self.email_service.build_message(subject, message, recipient)
+            for subject, message, recipient in notifications
+        ]
+        return [result['sent'] for result in self.email_service.send_bulk(messages, batch_size)]
@@ -2,9 +2,13 @@
 from abc import ABC, abstractmethod
 
 class NotificationObserver(ABC):
+    # Los observadores transaccionales escriben en la transacción del
+    # llamador: el sujeto los ejecuta en su hilo, no en el pool
+    transactional = False
+
     @abstractmethod
     def update(self, subject: str, message: str, recipient: str) -> bool:
         """
         Método abstracto para actualizar las notificaciones.
         """
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,146 @@
+# observers/notification_subject.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Dict, List, Optional
+from django.db import close_old_connections
+from .notification_observer import NotificationObserver
+import logging
+
+logger = logging.getLogger(__name__)
+
+class NotificationSubject:
+    """
+    Sujeto del patrón observer: reparte cada notificación entre los
+    observadores registrados.
+
+    Los observadores se ejecutan en paralelo en un pool de hilos acotado, cada
+    uno con su propio tiempo límite, así un canal lento (SMTP) no retrasa a uno
+    rápido (BD). Un fallo o un timeout solo afecta al observador que lo produjo.
+    La latencia de cada observador queda registrada en `get_stats()`.
+
+    Los observadores transaccionales (BD, outbox) se ejecutan en el hilo del
+    llamador, en orden y sin tiempo límite, mientras el pool atiende a los
+    demás: así escriben en su transacción y sus errores se propagan para que
+    la revierta.
+    """
+
+    def __init__(self, max_workers: int = 4, timeout: float = 10.0):
+        self.timeout = timeout
+        self._observers: List[NotificationObserver] = []
+        self._timeouts: Dict[str, float] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='notification')
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def attach(self, observer: NotificationObserver, timeout: Optional[float] = None) -> None:
+        """Registra un observador, opcionalmente con un tiempo límite propio."""
+        if observer not in self._observers:
+            self._observers.append(observer)
+        if timeout is not None:
+            self._timeouts[self._name(observer)] = timeout
+
+    def detach(self, observer: NotificationObserver) -> None:
+        if observer in self._observers:
+            self._observers.remove(observer)
+        self._timeouts.pop(self._name(observer), None)
+
+    def notify(self, subject: str, message: str, recipient: str) -> Dict[str, bool]:
+        """
+        Envía la notificación a todos los observadores.
+        Returns:
+            Dict[str, bool]: Resultado por observador; False si falló o excedió su tiempo
+        """
+        started = time.monotonic()
+        observers = list(self._observers)
+        futures = [
+            (observer, self._executor.submit(self._run_pooled, observer, subject, message, recipient))
+            for observer in observers if not observer.transactional
+        ]
+
+        results = {}
+        for observer in observers:
+            if observer.transactional:
+                results[self._name(observer)] = self._run_inline(observer, subject, message, recipient)
+        for observer, future in futures:
+            name = self._name(observer)
+            remaining = started + self._timeouts.get(name, self.timeout) - time.monotonic()
+            try:
+                results[name] = bool(future.result(timeout=max(0, remaining)))
+            except TimeoutError:
+                logger.error(f"El observador {name} excedió su tiempo límite notificando a {recipient}")
+                self._record(name, timed_out=True)
+                results[name] = False
+        return results
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Llamadas, fallos, timeouts y latencia (ms) por observador."""
+        with self._lock:
+            stats = {name: dict(values) for name, values in self._stats.items()}
+        for values in stats.values():
+            values['avg_ms'] = values['total_ms'] / values['calls'] if values['calls'] else 0.0
+        return stats
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _run_pooled(self, observer: NotificationObserver, subject: str, message: str,
+                    recipient: str) -> bool:
+        try:
+            return self._run_inline(observer, subject, message, recipient)
+        except Exception as e:
+            logger.error(f"Error en el observador {self._name(observer)}: {str(e)}")
+            return False
+        finally:
+            # Cada hilo del pool tiene su propia conexión a la BD
+            close_old_connections()
+
+    def _run_inline(self, observer: NotificationObserver, subject: str, message: str,
+                    recipient: str) -> bool:
+        name = self._name(observer)
+        start = time.perf_counter()
+        ok = False
+        try:
+            ok = bool(observer.update(subject, message, recipient))
+        finally:
+            self._record(name, elapsed=time.perf_counter() - start, failed=not ok)
+        return ok
+
+    def _record(self, name: str, elapsed: float = None, failed: bool = False,
+                timed_out: bool = False) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                'calls': 0, 'failures': 0, 'timeouts': 0, 'total_ms': 0.0, 'max_ms': 0.0
+            })
+            if timed_out:
+                stats['timeouts'] += 1
+                return
+            elapsed_ms = elapsed * 1000
+            stats['calls'] += 1
+            stats['failures'] += int(failed)
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+    def _name(self, observer: NotificationObserver) -> str:
+        return type(observer).__name__
+
+
+_default_subject = None
+_default_subject_lock = threading.Lock()
+
+def get_notification_subject() -> NotificationSubject:
+    """
+    Sujeto compartido de `NotificationService`: guarda la notificación y
+    encola el email en el outbox, ambos en la transacción del llamador.
+    """
+    global _default_subject
+    with _default_subject_lock:
+        if _default_subject is None:
+            from .database_observer import DatabaseObserver
+            from .outbox_observer import OutboxObserver
+            from ..services.notification.notification_writer import get_notification_writer
+
+            _default_subject = NotificationSubject()
+            _default_subject.attach(OutboxObserver())
+            _default_subject.attach(DatabaseObserver(get_notification_writer()))
+        return _default_subject
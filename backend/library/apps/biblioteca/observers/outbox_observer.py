@@ -0,0 +1,16 @@
+# observers/outbox_observer.py
+from typing import Optional
+from .notification_observer import NotificationObserver
+from ..services.notification.outbox_service import OutboxService
+
+class OutboxObserver(NotificationObserver):
+    """Encola el email en el outbox; lo envía después `deliver_notifications`."""
+    transactional = True
+
+    def __init__(self, outbox_service: Optional[OutboxService] = None):
+        self.outbox_service = outbox_service or OutboxService()
+
+    def update(self, subject: str, message: str, recipient: str) -> bool:
+        """Los errores se propagan para que el llamador revierta su transacción."""
+        self.outbox_service.enqueue(subject, message, recipient)
+        return True
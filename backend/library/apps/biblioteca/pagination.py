@@ -0,0 +1,127 @@
+# pagination.py
+import base64
+import binascii
+import json
+from typing import List, Optional, Tuple
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) sobre el `Meta.ordering` del modelo más el id.
+
+    Es opcional: solo se activa si la petición incluye `cursor` o `page_size`,
+    así los clientes que esperan la lista completa siguen funcionando. No
+    ejecuta COUNT(*) y cada página filtra por la última clave vista, por lo que
+    una página profunda cuesta lo mismo que la primera.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> Optional[List]:
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.model = queryset.model
+        self.ordering = self.get_ordering(queryset)
+        self.limit = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode_cursor(cursor)))
+
+        rows = list(queryset[:self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        self.page = rows[:self.limit]
+        return self.page
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def is_requested(self, request) -> bool:
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, queryset: QuerySet) -> Tuple[str, ...]:
+        """`Meta.ordering` del modelo con el id como desempate en la misma dirección."""
+        ordering = [field for field in queryset.model._meta.ordering if isinstance(field, str)]
+        ordering = [field for field in ordering if field.lstrip('-') not in ('id', 'pk')]
+        descending = bool(ordering) and ordering[-1].startswith('-')
+        return tuple(ordering) + ('-id' if descending else 'id',)
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = [getattr(last, field.lstrip('-')) for field in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values))
+
+    def encode_cursor(self, values: List) -> str:
+        payload = json.dumps([self._dump(value) for value in values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> List:
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound('Cursor inválido')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound('Cursor inválido')
+        return values
+
+    def _after(self, values: List) -> Q:
+        """
+        Condición "fila posterior al cursor" para el orden compuesto.
+
+        Cada nivel se expresa como `campo >= valor AND (campo > valor OR ...)`
+        para que el primer campo delimite un rango que el índice pueda recorrer.
+        """
+        condition = None
+        for field, value in reversed(list(zip(self.ordering, values))):
+            name = field.lstrip('-')
+            try:
+                value = self.model._meta.get_field(name).to_python(value)
+            except ValidationError:
+                raise NotFound('Cursor inválido')
+            op = 'lt' if field.startswith('-') else 'gt'
+            strict = Q(**{f'{name}__{op}': value})
+            if condition is None:
+                condition = strict
+            else:
+                condition = Q(**{f'{name}__{op}e': value}) & (strict | condition)
+        return condition
+
+    def _dump(self, value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
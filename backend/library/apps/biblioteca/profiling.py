@@ -0,0 +1,212 @@
+# profiling.py
+import cProfile
+import io
+import itertools
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+PROFILING_DEFAULTS = {
+    'ENABLED': True,
+    # Fracción de peticiones con cProfile y tracemalloc (0 = solo por cabecera)
+    'SAMPLE_RATE': 0.0,
+    # Cabecera que fuerza el perfilado; si HEADER_SECRET está vacío solo se
+    # acepta con DEBUG, si no la cabecera debe traer ese valor
+    'HEADER': 'X-Profile',
+    'HEADER_SECRET': '',
+    # Peticiones más lentas que esto se guardan aunque no estén muestreadas
+    'SLOW_REQUEST_MS': 1000,
+    'BUFFER_SIZE': 100,
+    'TOP_FUNCTIONS': 25,
+    'EXCLUDE_PATHS': ['/api/debug/profiles/'],
+}
+
+def get_profiling_settings() -> Dict[str, Any]:
+    return {**PROFILING_DEFAULTS, **getattr(settings, 'REQUEST_PROFILING', {})}
+
+class ProfileStore:
+    """Últimos perfiles de peticiones en un buffer circular acotado."""
+
+    def __init__(self, size: int = 100):
+        self._profiles = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            profile['id'] = next(self._ids)
+            self._profiles.append(profile)
+        return profile
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return next((profile for profile in self._profiles if profile['id'] == profile_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+profile_store = ProfileStore(get_profiling_settings()['BUFFER_SIZE'])
+
+class MemoryTracing:
+    """
+    tracemalloc es global al proceso: las peticiones muestreadas en paralelo
+    lo comparten con un contador de referencias, y solo la última en salir lo
+    detiene (nunca uno que ya estaba activo antes). El pico es del proceso,
+    así que se marca como compartido si otra petición medida se solapó o si
+    tracemalloc ya lo había iniciado otro código.
+    """
+
+    _lock = threading.Lock()
+    _active = 0
+    _started = 0
+    _owned = False
+
+    def __enter__(self) -> 'MemoryTracing':
+        cls = type(self)
+        with cls._lock:
+            if cls._active == 0:
+                cls._owned = not tracemalloc.is_tracing()
+                if cls._owned:
+                    tracemalloc.start()
+            self.shared = cls._active > 0 or not cls._owned
+            cls._active += 1
+            cls._started += 1
+            self._started = cls._started
+        return self
+
+    def snapshot(self, limit: int) -> Dict[str, Any]:
+        cls = type(self)
+        try:
+            peak = tracemalloc.get_traced_memory()[1]
+            allocations = tracemalloc.take_snapshot().statistics('lineno')[:limit]
+        except RuntimeError:
+            # Otro código detuvo tracemalloc durante la petición
+            return {'memory_error': 'tracemalloc no estaba activo'}
+        with cls._lock:
+            shared = self.shared or cls._started != self._started
+        return {
+            'peak_kb': round(peak / 1024, 1),
+            'peak_shared': shared,
+            'allocations': [str(allocation) for allocation in allocations],
+        }
+
+    def __exit__(self, *exc_info) -> None:
+        cls = type(self)
+        with cls._lock:
+            cls._active -= 1
+            if cls._active == 0 and cls._owned and tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+class QueryTimer:
+    """execute_wrapper que cuenta las consultas y acumula su duración."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+class RequestProfilingMiddleware:
+    """
+    Mide cada petición: tiempo total, número de consultas y tiempo en SQL, y
+    los publica en la cabecera `Server-Timing`.
+
+    Una fracción configurable de peticiones (o las que traen la cabecera de
+    perfilado) se ejecuta además con cProfile y tracemalloc; esas y las más
+    lentas que `SLOW_REQUEST_MS` quedan en `profile_store`, que se consulta
+    en /api/debug/profiles/. Sin muestreo el costo es un contador por consulta.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = get_profiling_settings()
+
+    def __call__(self, request):
+        options = self.options
+        if not options['ENABLED'] or request.path.startswith(tuple(options['EXCLUDE_PATHS'])):
+            return self.get_response(request)
+
+        sampled = self._should_sample(request)
+        timer = QueryTimer()
+        profiler = cProfile.Profile() if sampled else None
+        started_at = timezone.now()
+        start = time.perf_counter()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            if sampled:
+                memory_tracing = stack.enter_context(MemoryTracing())
+                try:
+                    profiler.enable()
+                except ValueError:
+                    # Ya hay otro profiler activo en este hilo
+                    profiler = None
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                if sampled:
+                    memory = memory_tracing.snapshot(options['TOP_FUNCTIONS'])
+
+        wall_ms = (time.perf_counter() - start) * 1000
+        sql_ms = timer.seconds * 1000
+        response['Server-Timing'] = (
+            f'total;dur={wall_ms:.1f}, '
+            f'db;dur={sql_ms:.1f};desc="{timer.count} consultas", '
+            f'app;dur={max(wall_ms - sql_ms, 0):.1f}'
+        )
+
+        if sampled or wall_ms >= options['SLOW_REQUEST_MS']:
+            profile = {
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'started_at': started_at.isoformat(),
+                'wall_ms': round(wall_ms, 2),
+                'sql_count': timer.count,
+                'sql_ms': round(sql_ms, 2),
+                'sampled': sampled,
+            }
+            if profiler is not None:
+                profile['functions'] = self._top_functions(profiler, options['TOP_FUNCTIONS'])
+            if sampled:
+                profile.update(memory)
+            profile_store.add(profile)
+            response['X-Profile-Id'] = str(profile['id'])
+        return response
+
+    def _should_sample(self, request) -> bool:
+        options = self.options
+        header = request.headers.get(options['HEADER'])
+        if header:
+            if options['HEADER_SECRET']:
+                return header == options['HEADER_SECRET']
+            return settings.DEBUG
+        return options['SAMPLE_RATE'] > 0 and random.random() < options['SAMPLE_RATE']
+
+    def _top_functions(self, profiler: cProfile.Profile, limit: int) -> str:
+        output = io.StringIO()
+        stats = pstats.Stats(profiler, stream=output)
+        stats.sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
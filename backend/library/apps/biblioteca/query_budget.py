@@ -0,0 +1,48 @@
+# query_budget.py
+from functools import wraps
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+class QueryBudget(CaptureQueriesContext):
+    """
+    Limita el número de consultas SQL ejecutadas dentro de un bloque.
+
+    Uso como context manager o decorador:
+
+        with QueryBudget(2):
+            client.get('/api/loans/')
+
+    Con `exact=True` el número debe coincidir exactamente, útil para fijar
+    el costo de un endpoint en las pruebas. Al superarse el presupuesto se
+    lanza `QueryBudgetExceeded` con la lista de consultas ejecutadas.
+    """
+
+    def __init__(self, limit: int, exact: bool = False, using: str = DEFAULT_DB_ALIAS):
+        super().__init__(connections[using])
+        self.limit = limit
+        self.exact = exact
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return
+        executed = len(self)
+        if executed > self.limit or (self.exact and executed != self.limit):
+            queries = '\n'.join(
+                f"{index}. {query['sql']}"
+                for index, query in enumerate(self.captured_queries, start=1)
+            )
+            expected = self.limit if self.exact else f'como máximo {self.limit}'
+            raise QueryBudgetExceeded(
+                f"Se ejecutaron {executed} consultas, se esperaban {expected}:\n{queries}"
+            )
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with QueryBudget(self.limit, self.exact, self.connection.alias):
+                return func(*args, **kwargs)
+        return wrapper
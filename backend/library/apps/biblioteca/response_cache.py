@@ -0,0 +1,84 @@
+# response_cache.py
+import hashlib
+from typing import Callable
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+from .metrics import RESPONSE_CACHE_REQUESTS
+from .models import TableVersion
+
+RESPONSE_CACHE_DEFAULTS = {
+    'ENABLED': True,
+    # Alias de CACHES: locmem (LRU por proceso), archivo o cualquier backend de Django
+    'ALIAS': 'responses',
+    # Tope de vida de una entrada; cubre las escrituras por SQL directo, que no suman versión
+    'TIMEOUT': 300,
+}
+
+CACHED_ACTIONS = ('list', 'retrieve', 'search')
+CACHE_HITS = {action: RESPONSE_CACHE_REQUESTS.labels(action, 'hit') for action in CACHED_ACTIONS}
+CACHE_MISSES = {action: RESPONSE_CACHE_REQUESTS.labels(action, 'miss') for action in CACHED_ACTIONS}
+
+def get_response_cache_settings() -> dict:
+    return {**RESPONSE_CACHE_DEFAULTS, **getattr(settings, 'BOOK_RESPONSE_CACHE', {})}
+
+class BookResponseCache:
+    """
+    Caché de los datos serializados del catálogo.
+
+    La clave de listado y búsqueda incluye los parámetros y la versión de la
+    tabla de libros (TableVersion); la del detalle, el `updated_at` de ese
+    libro (ConditionalGetMixin.row_version_field), así un préstamo o una
+    devolución solo invalida el detalle del libro que cambió. Ambas están en
+    la base, así que cambian con cualquier escritura (API, admin, servicios,
+    updates masivos, que también marcan `updated_at`) y las ven todos los
+    procesos. La versión se lee antes de construir la respuesta: una lectura
+    que termina tarde escribe en una versión que ya nadie consulta.
+
+    Las entradas reemplazadas no se borran: las desaloja el LRU del backend.
+    """
+
+    def __init__(self, alias: str = None, timeout: int = None):
+        options = get_response_cache_settings()
+        self.enabled = options['ENABLED']
+        self.cache = caches[alias or options['ALIAS']]
+        self.timeout = options['TIMEOUT'] if timeout is None else timeout
+
+    def fetch(self, action: str, key: str, build: Callable[[], Response]) -> Response:
+        """Devuelve la respuesta guardada en `key` o la construye y guarda si es 200."""
+        if not self.enabled:
+            return build()
+        key = f'books:{action}:{hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()}'
+        data = self.cache.get(key)
+        if data is not None:
+            CACHE_HITS[action].inc()
+            return Response(data)
+
+        CACHE_MISSES[action].inc()
+        response = build()
+        if response.status_code == 200:
+            self.cache.set(key, response.data, self.timeout)
+        return response
+
+class CachedBookResponseMixin:
+    """`list`, `retrieve` y `cached_response` para las acciones de BookViewSet."""
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response('list', super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response('retrieve', super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, action: str, handler, request, *args, **kwargs):
+        # ConditionalGetMixin ya leyó las versiones en esta petición (la del
+        # detalle, de su fila)
+        versions = getattr(self, 'table_versions', None) or TableVersion.current(['book'])
+        version = versions.get('book', (0,))[0]
+        # Los enlaces de paginación incluyen el host
+        key = f'{version}:{request.get_host()}:{request.get_full_path()}'
+        return self.get_response_cache().fetch(action, key, lambda: handler(request, *args, **kwargs))
+
+    def get_response_cache(self) -> BookResponseCache:
+        if not hasattr(self, '_response_cache'):
+            self._response_cache = BookResponseCache()
+        return self._response_cache
@@ -0,0 +1,87 @@
+# routers.py
+import logging
+import os
+import time
+from typing import Optional
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from .metrics import REPORT_DATABASE
+
+logger = logging.getLogger(__name__)
+
+REPORT_REPLICA_DEFAULTS = {
+    'ENABLED': False,
+    'ALIAS': 'replica',
+    # Antigüedad máxima del snapshot; si es mayor los reportes leen de la principal
+    'MAX_STALENESS_SECONDS': 900,
+    # Intervalo de refresh_report_replica entre copias
+    'REFRESH_SECONDS': 300,
+}
+
+def get_replica_settings() -> dict:
+    return {**REPORT_REPLICA_DEFAULTS, **getattr(settings, 'REPORT_REPLICA', {})}
+
+class PrimaryReplicaRouter:
+    """
+    Todo va a la base principal salvo lo que se pide con `using()`.
+
+    La réplica solo la usan los reportes y exportaciones, que eligen la base
+    con `get_report_database`; así LoanService y las demás escrituras, y las
+    lecturas que siguen a una escritura, nunca ven datos atrasados. Un objeto
+    leído de la réplica se guarda en la principal.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Las relaciones de un objeto se leen de la misma base que el objeto
+            return instance._state.db
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplica es una copia de la principal: los ids son los mismos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # El esquema de la réplica llega con la copia
+        return db == DEFAULT_DB_ALIAS
+
+def replica_lag(alias: str) -> Optional[float]:
+    """
+    Segundos de atraso de la réplica, o None si todavía no existe.
+
+    Para un snapshot SQLite es la antigüedad del archivo, que
+    refresh_report_replica reemplaza entero en cada copia. Con otro motor el
+    atraso lo controla su replicación y se toma como 0.
+    """
+    replica = connections[alias].settings_dict
+    if replica['ENGINE'] != 'django.db.backends.sqlite3':
+        return 0.0
+    name = str(replica['NAME'])
+    if name == str(connections[DEFAULT_DB_ALIAS].settings_dict['NAME']):
+        # Espejo de la principal (TEST MIRROR en las pruebas)
+        return 0.0
+    try:
+        return time.time() - os.path.getmtime(name)
+    except OSError:
+        return None
+
+def get_report_database() -> str:
+    """Alias desde el que leen los reportes: la réplica si está al día, si no la principal."""
+    config = get_replica_settings()
+    alias = config['ALIAS']
+    if not config['ENABLED'] or alias not in connections.settings:
+        return DEFAULT_DB_ALIAS
+
+    lag = replica_lag(alias)
+    if lag is None or lag > config['MAX_STALENESS_SECONDS']:
+        logger.warning(
+            f"Réplica '{alias}' no disponible o atrasada ({'sin snapshot' if lag is None else f'{lag:.0f}s'}), "
+            f"los reportes leen de la base principal"
+        )
+        alias = DEFAULT_DB_ALIAS
+    REPORT_DATABASE.labels(alias).inc()
+    return alias
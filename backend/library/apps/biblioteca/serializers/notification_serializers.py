@@ -0,0 +1,22 @@
+# serializers/notification_serializers.py
+from rest_framework import serializers
+from ..models import Notification
+
+class NotificationSerializer(serializers.ModelSerializer):
+    """Serializer para la bandeja de notificaciones"""
+    created_at = serializers.DateTimeField(format='%Y-%m-%d %H:%M:%S', read_only=True)
+
+    class Meta:
+        model = Notification
+        fields = ['id', 'subject', 'message', 'kind', 'read', 'created_at']
+        read_only_fields = fields
+
+class MarkReadSerializer(serializers.Serializer):
+    """Serializer para marcar notificaciones como leídas"""
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    all = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if not data['all'] and 'ids' not in data:
+            raise serializers.ValidationError('Indique "ids" o "all"')
+        return data
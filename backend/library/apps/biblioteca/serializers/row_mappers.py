@@ -0,0 +1,202 @@
+# serializers/row_mappers.py
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Campos cuya representación de un valor leído de la base es el mismo valor
+IDENTITY_FIELDS = (
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+)
+
+class RowMapper:
+    """
+    Versión de solo lectura de un serializer para listados grandes.
+
+    Recorre los campos del serializer una vez y genera el código de una
+    función que convierte una tupla de `values_list` (con los joins de los
+    serializers anidados) en el mismo diccionario que produciría
+    `to_representation`, sin instanciar modelos ni pasar por cada campo de
+    DRF en cada fila. Los campos que no sabe traducir usan su propio
+    `to_representation`.
+
+    `fields` limita la salida a esas rutas (`id`, `book.title`) y `expand`
+    indica qué serializers anidados se incluyen completos; los demás se
+    devuelven como su id, sin join. Sin ninguno de los dos la forma es la
+    del serializer. Solo se seleccionan las columnas de la forma pedida.
+    """
+
+    def __init__(self, serializer_class, fields: FrozenSet[str] = None, expand: FrozenSet[str] = None):
+        self.columns: List[str] = []
+        self.converters: Dict[str, Callable] = {}
+        self.fields = fields
+        self.expand = expand
+        if fields is not None and expand is not None:
+            # Pedir `book.title` implica expandir `book`
+            self.expand = expand | {
+                field[:index] for field in fields for index, char in enumerate(field) if char == '.'
+            }
+        self.matched = set()
+        self.relations = set()
+
+        expression = self._compile(serializer_class(), prefix='', parent='')
+        unknown = sorted((fields or frozenset()) - self.matched)
+        unknown += sorted((self.expand or frozenset()) - self.relations)
+        if unknown:
+            raise ValidationError(f"Campos desconocidos: {', '.join(unknown)}")
+
+        namespace = dict(self.converters)
+        exec(f'def to_representation(row):\n    return {expression}', namespace)
+        self.to_representation = namespace['to_representation']
+
+    def map_queryset(self, queryset, extra_columns: Iterable[str] = ()):
+        """
+        Filas con nombre con las columnas del serializer. `extra_columns` se
+        agregan al final sin aparecer en la salida (p. ej. las del cursor).
+        """
+        extra = [column for column in extra_columns if column not in self.columns]
+        return queryset.values_list(*self.columns, *extra, named=True)
+
+    def map_rows(self, rows) -> list:
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
+
+    def _compile(self, serializer, prefix: str, parent: str) -> str:
+        """Expresión del diccionario de una fila, p. ej. `{'id': row[0], ...}`."""
+        items = []
+        for name, field in serializer.fields.items():
+            dotted = parent + name
+            if isinstance(field, serializers.BaseSerializer):
+                self.relations.add(dotted)
+            if field.write_only or not self._selected(dotted):
+                continue
+            self.matched.add(dotted)
+            source = field.source if field.source != '*' else name
+            path = prefix + source.replace('.', '__')
+            if isinstance(field, serializers.BaseSerializer):
+                if self.expand is None or dotted in self.expand:
+                    items.append(f'{name!r}: {self._compile(field, prefix=f"{path}__", parent=f"{dotted}.")}')
+                else:
+                    # Sin expandir: la clave foránea, sin join
+                    items.append(f'{name!r}: row[{len(self.columns)}]')
+                    self.columns.append(path)
+                continue
+
+            value = f'row[{len(self.columns)}]'
+            self.columns.append(path)
+            converter = self._converter(field)
+            if converter is not None:
+                converter_name = f'convert_{len(self.converters)}'
+                self.converters[converter_name] = converter
+                value = f'{converter_name}({value})'
+            items.append(f'{name!r}: {value}')
+        return '{' + ', '.join(items) + '}'
+
+    def _selected(self, dotted: str) -> bool:
+        """La ruta se pidió, está dentro de una pedida o contiene alguna pedida."""
+        if self.fields is None:
+            return True
+        return any(
+            dotted == field or dotted.startswith(f'{field}.') or field.startswith(f'{dotted}.')
+            for field in self.fields
+        )
+
+    def _converter(self, field) -> Optional[Callable]:
+        """Función para el valor de la columna, o None si se copia tal cual."""
+        if isinstance(field, serializers.DateTimeField):
+            return self._datetime_converter(field)
+        if isinstance(field, serializers.DateField):
+            output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+            if output_format == '%Y-%m-%d':
+                return lambda value: None if value is None else value.isoformat()
+        elif isinstance(field, IDENTITY_FIELDS):
+            return None
+
+        to_representation = field.to_representation
+        return lambda value: None if value is None else to_representation(value)
+
+    def _datetime_converter(self, field) -> Callable:
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if output_format != '%Y-%m-%d %H:%M:%S':
+            return field.to_representation
+
+        # Igual que enforce_timezone + strftime: str() es ISO 8601 con espacio y
+        # sus primeros 19 caracteres son la fecha y la hora sin microsegundos
+        zone = getattr(field, 'timezone', None) or timezone.get_current_timezone()
+
+        def convert(value):
+            if not value:
+                return None
+            if value.tzinfo is not None:
+                value = value.astimezone(zone)
+            return str(value)[:19]
+        return convert
+
+@lru_cache(maxsize=256)
+def get_row_mapper(serializer_class, fields: FrozenSet[str] = None, expand: FrozenSet[str] = None) -> RowMapper:
+    """Un RowMapper compilado por serializer y forma pedida, por proceso."""
+    return RowMapper(serializer_class, fields, expand)
+
+def parse_field_list(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    """`a, b.c` → {'a', 'b.c'}; None si el parámetro no se envió."""
+    if value is None:
+        return None
+    return frozenset(field.strip() for field in value.split(',') if field.strip())
+
+class FastListMixin:
+    """
+    `list` de solo lectura con RowMapper en lugar de instanciar el serializer
+    por fila, y `?fields=` / `?expand=` en listados y detalle.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.fast_list(self.filter_queryset(self.get_queryset()))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.is_sparse_request():
+            return super().retrieve(request, *args, **kwargs)
+        try:
+            mapper = self.get_row_mapper()
+        except ValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        row = mapper.map_queryset(
+            self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: kwargs[lookup]})
+        ).first()
+        if row is None:
+            raise Http404
+        return Response(mapper.to_representation(row))
+
+    def fast_list(self, queryset):
+        try:
+            mapper = self.get_row_mapper()
+        except ValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # La paginación por cursor lee su clave de la última fila
+        get_ordering = getattr(self.paginator, 'get_ordering', None)
+        ordering = [field.lstrip('-') for field in get_ordering(queryset)] if get_ordering else []
+        rows = mapper.map_queryset(queryset, ordering)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(mapper.map_rows(page))
+        return Response(mapper.map_rows(rows))
+
+    def is_sparse_request(self) -> bool:
+        params = self.request.query_params
+        return 'fields' in params or 'expand' in params
+
+    def get_row_mapper(self) -> RowMapper:
+        params = self.request.query_params
+        return get_row_mapper(
+            self.get_serializer_class(),
+            parse_field_list(params.get('fields')),
+            parse_field_list(params.get('expand'))
+        )
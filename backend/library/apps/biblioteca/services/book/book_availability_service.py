@@ -2,7 +2,9 @@
 from django.core.exceptions import ValidationError
 from django.apps import apps
 from django.db.models import QuerySet
+from ...metrics import instrument_service
 
+@instrument_service
 class BookAvailabilityService:
     def __init__(self):
         self.Book = apps.get_model('biblioteca', 'Book')
@@ -0,0 +1,138 @@
+# services/book/book_import_service.py
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, IO, Iterable, Iterator, List, Tuple
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BookImportService:
+    """
+    Importación masiva del catálogo con upsert por `code`.
+
+    Las filas se leen en streaming, se validan y se procesan por bloques:
+    cada bloque consulta los códigos existentes con una sola consulta y
+    escribe con bulk_create/bulk_update dentro de su propia transacción.
+    El estado de los libros existentes no se modifica, porque lo controla
+    la circulación (préstamos y devoluciones).
+    """
+    FORMATS = ('csv', 'jsonl')
+    REQUIRED_FIELDS = ('code', 'title', 'author', 'genre')
+    UPDATE_FIELDS = ('title', 'author', 'genre')
+
+    def __init__(self, chunk_size: int = 2000):
+        self.Book = apps.get_model('biblioteca', 'Book')
+        self.chunk_size = chunk_size
+        self.statuses = [choice for choice, _ in self.Book._meta.get_field('status').choices]
+
+    def read_rows(self, stream: IO[str], file_format: str) -> Iterator[Tuple[int, Any]]:
+        """Devuelve (número de fila, datos) sin cargar el archivo en memoria."""
+        if file_format not in self.FORMATS:
+            raise ValidationError(f"Formato inválido: {file_format}, use {', '.join(self.FORMATS)}")
+        if file_format == 'csv':
+            for number, row in enumerate(csv.DictReader(stream), start=1):
+                yield number, row
+            return
+
+        number = 0
+        for line in stream:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, ValidationError(f"JSON inválido: {str(e)}")
+
+    def validate_row(self, row: Any) -> Dict[str, str]:
+        """Normaliza una fila y verifica campos obligatorios, longitudes y estado."""
+        if isinstance(row, ValidationError):
+            raise row
+        if not isinstance(row, dict):
+            raise ValidationError("La fila debe ser un objeto")
+
+        data = {}
+        for field in self.REQUIRED_FIELDS:
+            value = str(row.get(field) or '').strip()
+            if not value:
+                raise ValidationError(f"Falta el campo {field}")
+            max_length = self.Book._meta.get_field(field).max_length
+            if len(value) > max_length:
+                raise ValidationError(f"{field} supera {max_length} caracteres")
+            data[field] = value
+
+        status = str(row.get('status') or '').strip()
+        if status:
+            if status not in self.statuses:
+                raise ValidationError(f"Estado inválido: {status}")
+            data['status'] = status
+        return data
+
+    def import_rows(self, rows: Iterable[Tuple[int, Any]], skip: int = 0,
+                    dry_run: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Procesa las filas por bloques, omitiendo las primeras `skip`.
+
+        Devuelve, por cada bloque confirmado, sus estadísticas y el número de
+        la última fila procesada (el punto de reanudación).
+        """
+        rows = iter(rows)
+        if skip:
+            for _ in islice(rows, skip):
+                pass
+
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            stats = self._import_chunk(chunk, dry_run)
+            stats['last_row'] = chunk[-1][0]
+            yield stats
+
+    def _import_chunk(self, chunk: List[Tuple[int, Any]], dry_run: bool) -> Dict[str, Any]:
+        stats = {'rows': len(chunk), 'created': 0, 'updated': 0, 'unchanged': 0,
+                 'duplicates': 0, 'rejected': []}
+
+        # La última aparición de un código dentro del bloque es la que vale
+        valid = {}
+        for number, row in chunk:
+            try:
+                data = self.validate_row(row)
+            except ValidationError as e:
+                stats['rejected'].append((number, ' '.join(e.messages)))
+                continue
+            if data['code'] in valid:
+                stats['duplicates'] += 1
+            valid[data['code']] = data
+
+        with transaction.atomic():
+            existing = self.Book.objects.in_bulk(list(valid), field_name='code')
+            now = timezone.now()
+            to_create = []
+            to_update = []
+            for code, data in valid.items():
+                book = existing.get(code)
+                if book is None:
+                    to_create.append(self.Book(**data))
+                    continue
+                if all(getattr(book, field) == data[field] for field in self.UPDATE_FIELDS):
+                    stats['unchanged'] += 1
+                    continue
+                for field in self.UPDATE_FIELDS:
+                    setattr(book, field, data[field])
+                book.updated_at = now
+                to_update.append(book)
+
+            stats['created'] = len(to_create)
+            stats['updated'] = len(to_update)
+            if not dry_run:
+                self.Book.objects.bulk_create(to_create, batch_size=500)
+                self.Book.objects.bulk_update(
+                    to_update, [*self.UPDATE_FIELDS, 'updated_at'], batch_size=500
+                )
+        return stats
@@ -0,0 +1,80 @@
+# services/book/book_search_service.py
+import re
+from typing import List
+from django.apps import apps
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+class BookSearchService:
+    """
+    Búsqueda de texto completo sobre el catálogo usando el índice FTS5
+    `biblioteca_book_fts` (ver migración 0004_book_fts).
+
+    El índice normaliza mayúsculas y acentos, ordena por relevancia (bm25)
+    y trata cada término como prefijo. Si el motor no es SQLite o el índice
+    no existe se usa la búsqueda LIKE original.
+    """
+    FTS_TABLE = 'biblioteca_book_fts'
+    SEARCH_COLUMNS = ('title', 'author', 'genre', 'code')
+    TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+    _fts_available = {}
+
+    def __init__(self):
+        self.Book = apps.get_model('biblioteca', 'Book')
+
+    def search(self, query: str, search_type: str = 'all') -> QuerySet:
+        """Busca libros ordenados por relevancia."""
+        columns = self._get_columns(search_type)
+        terms = self._tokenize(query)
+
+        if not terms or not self.is_fts_available():
+            return self.search_like(query, search_type)
+
+        # bm25() solo existe dentro de una consulta MATCH: el filtro busca los
+        # rowid en el índice y el rango se calcula solo para esos libros
+        expression = self.build_match_expression(terms, columns)
+        fts = self.FTS_TABLE
+        table = self.Book._meta.db_table
+        return self.Book.objects.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [expression])
+        ).annotate(
+            rank=RawSQL(
+                f'SELECT bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND {fts}.rowid = "{table}"."id"',
+                [expression]
+            )
+        ).order_by('rank', 'title')
+
+    def search_like(self, query: str, search_type: str = 'all') -> QuerySet:
+        """Búsqueda por subcadena (LIKE '%q%') sin índice."""
+        columns = self._get_columns(search_type)
+        condition = Q()
+        for column in columns:
+            condition |= Q(**{f'{column}__icontains': query})
+        return self.Book.objects.filter(condition)
+
+    def build_match_expression(self, terms: List[str], columns: tuple) -> str:
+        """Construye la expresión MATCH con términos entre comillas y como prefijo."""
+        expression = ' '.join(f'"{term}"*' for term in terms)
+        if columns == self.SEARCH_COLUMNS:
+            return expression
+        return f"{{{' '.join(columns)}}} : ({expression})"
+
+    def is_fts_available(self) -> bool:
+        """Indica si la conexión actual dispone del índice FTS5."""
+        alias = connection.alias
+        if alias not in self._fts_available:
+            self._fts_available[alias] = (
+                connection.vendor == 'sqlite'
+                and self.FTS_TABLE in connection.introspection.table_names()
+            )
+        return self._fts_available[alias]
+
+    def _get_columns(self, search_type: str) -> tuple:
+        if search_type in self.SEARCH_COLUMNS:
+            return (search_type,)
+        return self.SEARCH_COLUMNS
+
+    def _tokenize(self, query: str) -> List[str]:
+        return self.TERM_PATTERN.findall(query or '')
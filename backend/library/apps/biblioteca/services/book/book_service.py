@@ -1,13 +1,17 @@
 # services/book/book_service.py
 from typing import List, Optional
-from django.db.models import Q, QuerySet
+from django.db.models import QuerySet
 from django.core.exceptions import ValidationError
 from django.apps import apps
+from .book_search_service import BookSearchService
+from ...metrics import instrument_service
 
+@instrument_service
 class BookService:
     def __init__(self):
         self.Book = apps.get_model('biblioteca', 'Book')
         self.Loan = apps.get_model('biblioteca', 'Loan')
+        self.search_service = BookSearchService()
 
     def create_book(self, data: dict) -> object:
         """Crea un nuevo libro en el sistema."""
@@ -46,19 +50,5 @@ class BookService:
             raise ValidationError(f"El libro con ID {book_id} no existe")
 
     def search_books(self, query: str, search_type: str = 'all') -> QuerySet:
-        """Busca libros según diferentes criterios."""
-        if search_type == 'title':
-            return self.Book.objects.filter(title__icontains=query)
-        elif search_type == 'author':
-            return self.Book.objects.filter(author__icontains=query)
-        elif search_type == 'genre':
-            return self.Book.objects.filter(genre__icontains=query)
-        elif search_type == 'code':
-            return self.Book.objects.filter(code__icontains=query)
-        else:
-            return self.Book.objects.filter(
-                Q(title__icontains=query) |
-                Q(author__icontains=query) |
-                Q(genre__icontains=query) |
-                Q(code__icontains=query)
-            )
\ No newline at end of file
+        """Busca libros según diferentes criterios, ordenados por relevancia."""
+        return self.search_service.search(query, search_type)
\ No newline at end of file
@@ -0,0 +1,196 @@
+# services/dataset/dataset_service.py
+import random
+from datetime import timedelta
+from typing import Dict
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+WORDS = [
+    'árbol', 'ciencia', 'años', 'soledad', 'amor', 'tiempos', 'cólera', 'ciudad',
+    'perros', 'casa', 'espíritus', 'sombra', 'viento', 'laberinto', 'pasión',
+    'noche', 'mar', 'río', 'montaña', 'corazón', 'historia', 'guerra', 'paz',
+    'jardín', 'senderos', 'bifurcan', 'ficciones', 'rayuela', 'pedro', 'páramo',
+]
+AUTHORS = [
+    'Gabriel García Márquez', 'Mario Vargas Llosa', 'Isabel Allende',
+    'Jorge Luis Borges', 'Julio Cortázar', 'Juan Rulfo', 'Pío Baroja',
+    'Benito Pérez Galdós', 'Miguel de Cervantes', 'Carlos Ruiz Zafón',
+]
+GENRES = ['Novela', 'Poesía', 'Ensayo', 'Cuento', 'Teatro', 'Historia', 'Ciencia ficción']
+FIRST_NAMES = ['Ana', 'Luis', 'María', 'José', 'Carmen', 'Jorge', 'Lucía', 'Pedro', 'Sofía', 'Diego']
+LAST_NAMES = ['García', 'Pérez', 'López', 'Torres', 'Andrade', 'Castillo', 'Vega', 'Mora']
+
+class DatasetService:
+    """
+    Genera datos sintéticos para pruebas de carga y benchmarks.
+
+    Los préstamos se reparten en los últimos `history_days` días: la mayoría
+    se devuelve entre 1 y 30 días después (algunos tarde), una parte sigue
+    abierta y otra queda vencida sin devolver. Se respetan las reglas de
+    circulación: un préstamo abierto por libro y como máximo `MAX_LOANS` por
+    usuario. Al final se recalculan los contadores y el resumen diario.
+    """
+    PASSWORD = 'biblioteca'
+
+    def __init__(self, seed: int = 42, batch_size: int = 5000, history_days: int = 365):
+        self.User = apps.get_model('auth', 'User')
+        self.Book = apps.get_model('biblioteca', 'Book')
+        self.Loan = apps.get_model('biblioteca', 'Loan')
+        self.Reservation = apps.get_model('biblioteca', 'Reservation')
+        self.Notification = apps.get_model('biblioteca', 'Notification')
+        self.BorrowerProfile = apps.get_model('biblioteca', 'BorrowerProfile')
+        self.DailyLoanStats = apps.get_model('biblioteca', 'DailyLoanStats')
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.history_days = history_days
+        self.prefix = f'ds{seed}'
+
+    def generate(self, users: int = 1000, books: int = 10000, loans: int = 50000,
+                 reservations: int = 2000, notifications: int = 20000) -> Dict[str, int]:
+        """Genera todo el conjunto en una transacción. Devuelve lo creado por tabla."""
+        with transaction.atomic():
+            user_ids = self.generate_users(users)
+            book_ids = self.generate_books(books)
+            borrowed = self.generate_loans(loans, user_ids, book_ids)
+            created_reservations = self.generate_reservations(reservations, user_ids, borrowed)
+            self.generate_notifications(notifications, user_ids)
+            self.BorrowerProfile.rebuild()
+            self.DailyLoanStats.rebuild()
+
+        return {
+            'users': len(user_ids),
+            'books': len(book_ids),
+            'loans': loans,
+            'open_loans': len(borrowed),
+            'reservations': created_reservations,
+            'notifications': notifications,
+        }
+
+    def generate_users(self, total: int) -> list:
+        password = make_password(self.PASSWORD)
+        for offset in range(0, total, self.batch_size):
+            self.User.objects.bulk_create([
+                self.User(
+                    username=f'{self.prefix}_lector{index}',
+                    email=f'{self.prefix}_lector{index}@biblioteca.local',
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                    password=password
+                )
+                for index in range(offset, min(offset + self.batch_size, total))
+            ])
+        return list(
+            self.User.objects.filter(username__startswith=f'{self.prefix}_lector')
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def generate_books(self, total: int) -> list:
+        for offset in range(0, total, self.batch_size):
+            self.Book.objects.bulk_create([
+                self.Book(
+                    title=' '.join(self.rng.sample(WORDS, self.rng.randint(2, 5))).capitalize(),
+                    author=self.rng.choice(AUTHORS),
+                    genre=self.rng.choice(GENRES),
+                    code=f'{self.prefix.upper()}-{index:08d}'
+                )
+                for index in range(offset, min(offset + self.batch_size, total))
+            ])
+        return list(
+            self.Book.objects.filter(code__startswith=f'{self.prefix.upper()}-')
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def generate_loans(self, total: int, user_ids: list, book_ids: list) -> Dict[int, int]:
+        """Crea los préstamos y devuelve {libro: usuario} de los que siguen abiertos."""
+        now = timezone.now()
+        loan_days = 15
+        max_loans = self.Loan.MAX_LOANS
+        open_books = {}
+        open_per_user = {}
+
+        for offset in range(0, total, self.batch_size):
+            batch = []
+            for _ in range(min(self.batch_size, total - offset)):
+                book_id = self.rng.choice(book_ids)
+                user_id = self.rng.choice(user_ids)
+                loan_date = now - timedelta(seconds=self.rng.randint(0, self.history_days * 86400))
+                due_date = (loan_date + timedelta(days=loan_days)).date()
+
+                # 5% no se devuelve; el resto tarda entre 1 y 30 días, con moda en 12
+                if self.rng.random() < 0.05:
+                    returned_date = None
+                else:
+                    returned_date = loan_date + timedelta(days=self.rng.triangular(1, 30, 12))
+                    if returned_date > now:
+                        returned_date = None
+
+                can_stay_open = (
+                    book_id not in open_books
+                    and open_per_user.get(user_id, 0) < max_loans
+                )
+                if returned_date is None and not can_stay_open:
+                    returned_date = min(now, loan_date + timedelta(days=self.rng.randint(1, loan_days)))
+                if returned_date is None:
+                    open_books[book_id] = user_id
+                    open_per_user[user_id] = open_per_user.get(user_id, 0) + 1
+
+                batch.append(self.Loan(
+                    book_id=book_id,
+                    user_id=user_id,
+                    loan_date=loan_date,
+                    due_date=due_date,
+                    returned=returned_date is not None,
+                    returned_date=returned_date
+                ))
+            self.Loan.objects.bulk_create(batch)
+
+        borrowed = list(open_books)
+        for offset in range(0, len(borrowed), self.batch_size):
+            self.Book.objects.filter(id__in=borrowed[offset:offset + self.batch_size]).update(
+                status='borrowed'
+            )
+        return open_books
+
+    def generate_reservations(self, total: int, user_ids: list, borrowed: Dict[int, int]) -> int:
+        """Reservas sobre libros prestados, sin repetir libro y usuario."""
+        if not borrowed:
+            return 0
+        book_ids = list(borrowed)
+        now = timezone.now()
+        seen = set()
+        batch = []
+        for _ in range(total):
+            book_id = self.rng.choice(book_ids)
+            user_id = self.rng.choice(user_ids)
+            if user_id == borrowed[book_id] or (book_id, user_id) in seen:
+                continue
+            seen.add((book_id, user_id))
+            batch.append(self.Reservation(
+                book_id=book_id,
+                user_id=user_id,
+                reservation_date=now - timedelta(minutes=self.rng.randint(0, 30 * 1440)),
+                active=self.rng.random() < 0.7
+            ))
+        self.Reservation.objects.bulk_create(batch, batch_size=self.batch_size)
+        return len(batch)
+
+    def generate_notifications(self, total: int, user_ids: list) -> None:
+        emails = dict(
+            self.User.objects.filter(id__in=user_ids[:5000]).values_list('id', 'email')
+        )
+        recipients = list(emails.values())
+        if not recipients:
+            return
+        subjects = ['Préstamo registrado', 'Recordatorio de devolución', 'Préstamo vencido']
+        for offset in range(0, total, self.batch_size):
+            self.Notification.objects.bulk_create([
+                self.Notification(
+                    subject=self.rng.choice(subjects),
+                    message='Mensaje generado para pruebas de carga.',
+                    recipient=self.rng.choice(recipients),
+                    read=self.rng.random() < 0.7
+                )
+                for _ in range(min(self.batch_size, total - offset))
+            ])
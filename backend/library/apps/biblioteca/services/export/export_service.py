@@ -0,0 +1,187 @@
+# services/export/export_service.py
+import csv
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.utils import timezone
+from ..report.book_report_service import BookReportService
+from ..report.loan_report_service import LoanReportService
+from ...routers import get_report_database
+
+class _Echo:
+    """Buffer mínimo para csv.writer: devuelve la línea en lugar de guardarla."""
+
+    def write(self, value: str) -> str:
+        return value
+
+class ExportService:
+    """
+    Exportación de datos en CSV o NDJSON.
+
+    Las filas se leen por bloques ordenados por id (paginación por clave) y
+    se serializan una a una en un generador, así la memoria usada no depende
+    del tamaño de la tabla. Las columnas se eligen de una lista fija por
+    tipo de exportación. Todas las lecturas de una exportación usan la misma
+    base, `using` (por defecto la réplica de reportes si está al día).
+    """
+    FORMATS = {
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson',
+    }
+    LOAN_COLUMNS = {
+        'id': 'id',
+        'book_code': 'book__code',
+        'book_title': 'book__title',
+        'username': 'user__username',
+        'email': 'user__email',
+        'loan_date': 'loan_date',
+        'due_date': 'due_date',
+        'returned_date': 'returned_date',
+        'returned': 'returned',
+    }
+    LOAN_STATUSES = ('open', 'returned', 'overdue')
+    BOOK_COLUMNS = {
+        name: name
+        for name in ('id', 'code', 'title', 'author', 'genre', 'status', 'created_at', 'updated_at')
+    }
+    LOAN_REPORTS = ('monthly', 'users', 'overdue')
+    BOOK_REPORTS = ('most_borrowed', 'genres')
+
+    def __init__(self, chunk_size: int = 2000, using: str = None):
+        self.Loan = apps.get_model('biblioteca', 'Loan')
+        self.Book = apps.get_model('biblioteca', 'Book')
+        self.chunk_size = chunk_size
+        self.using = using or get_report_database()
+        self.loan_report_service = LoanReportService(using=self.using)
+        self.book_report_service = BookReportService(using=self.using)
+        self._encoder = DjangoJSONEncoder()
+
+    def export_loans(self, columns: Optional[List[str]] = None, start_date: date = None,
+                     end_date: date = None, status: str = None) -> tuple:
+        """Historial de préstamos. Devuelve (columnas, filas)."""
+        columns = self._select_columns(self.LOAN_COLUMNS, columns)
+        loans = self.loan_report_service.filter_by_loan_date(
+            self.Loan.objects.using(self.using), start_date, end_date
+        )
+
+        if status == 'open':
+            loans = loans.filter(returned=False)
+        elif status == 'returned':
+            loans = loans.filter(returned=True)
+        elif status == 'overdue':
+            loans = loans.filter(returned=False, due_date__lt=timezone.localdate())
+        elif status:
+            raise ValidationError(f"Estado inválido: {status}, use {', '.join(self.LOAN_STATUSES)}")
+
+        return columns, self._iterate_by_id(loans, {name: self.LOAN_COLUMNS[name] for name in columns})
+
+    def export_books(self, columns: Optional[List[str]] = None, start_date: date = None,
+                     end_date: date = None, status: str = None) -> tuple:
+        """Catálogo de libros, filtrado por fecha de alta y estado. Devuelve (columnas, filas)."""
+        columns = self._select_columns(self.BOOK_COLUMNS, columns)
+        books = self.Book.objects.using(self.using)
+
+        if status:
+            valid = [choice for choice, _ in self.Book._meta.get_field('status').choices]
+            if status not in valid:
+                raise ValidationError(f"Estado inválido: {status}, use {', '.join(valid)}")
+            books = books.filter(status=status)
+        if start_date:
+            books = books.filter(created_at__gte=self._start_of_day(start_date))
+        if end_date:
+            books = books.filter(created_at__lt=self._start_of_day(end_date + timedelta(days=1)))
+
+        return columns, self._iterate_by_id(books, {name: name for name in columns})
+
+    def export_loan_report(self, report: str, columns: Optional[List[str]] = None,
+                           start_date: date = None, end_date: date = None) -> tuple:
+        """Secciones de LoanReportService como filas. Devuelve (columnas, filas)."""
+        if report == 'monthly':
+            rows = self.loan_report_service.get_monthly_breakdown(start_date, end_date)
+            available = ['month', 'total_loans', 'total_returns', 'late_returns', 'avg_loan_duration']
+        elif report == 'users':
+            rows = self.loan_report_service.get_user_statistics(start_date, end_date).iterator(
+                chunk_size=self.chunk_size
+            )
+            available = ['user__username', 'user__email', 'total_loans', 'overdue_loans']
+        elif report == 'overdue':
+            rows = self.loan_report_service.get_overdue_histogram()
+            available = ['range', 'min_days', 'max_days', 'total', 'fine_amount']
+        else:
+            raise ValidationError(f"Reporte inválido: {report}, use {', '.join(self.LOAN_REPORTS)}")
+        return self._report_rows(rows, available, columns)
+
+    def export_book_report(self, report: str, columns: Optional[List[str]] = None,
+                           limit: int = 100) -> tuple:
+        """Secciones de BookReportService como filas. Devuelve (columnas, filas)."""
+        if report == 'most_borrowed':
+            rows = self.book_report_service.get_most_borrowed_books(limit)
+            available = ['book__title', 'book__author', 'total_loans']
+        elif report == 'genres':
+            rows = self.book_report_service.get_genre_statistics().iterator(chunk_size=self.chunk_size)
+            available = ['genre', 'total_books', 'available_books', 'borrowed_books']
+        else:
+            raise ValidationError(f"Reporte inválido: {report}, use {', '.join(self.BOOK_REPORTS)}")
+        return self._report_rows(rows, available, columns)
+
+    def render(self, columns: List[str], rows: Iterable[Dict[str, Any]],
+               file_format: str = 'csv') -> Iterator[str]:
+        """Serializa las filas una a una en el formato pedido."""
+        if file_format not in self.FORMATS:
+            raise ValidationError(f"Formato inválido: {file_format}, use {', '.join(self.FORMATS)}")
+        if file_format == 'ndjson':
+            return self._render_ndjson(columns, rows)
+        return self._render_csv(columns, rows)
+
+    def _render_csv(self, columns: List[str], rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow([self._format_value(row.get(column)) for column in columns])
+
+    def _render_ndjson(self, columns: List[str], rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        for row in rows:
+            yield json.dumps(
+                {column: row.get(column) for column in columns},
+                cls=DjangoJSONEncoder,
+                ensure_ascii=False
+            ) + '\n'
+
+    def _format_value(self, value: Any) -> Any:
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        return self._encoder.default(value)
+
+    def _iterate_by_id(self, queryset: QuerySet, fields: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+        """Recorre el queryset en bloques por id, con solo las columnas pedidas."""
+        lookups = list(fields.values())
+        rows = queryset.order_by('id').values_list('id', *lookups)
+        last_id = 0
+        while True:
+            chunk = list(rows.filter(id__gt=last_id)[:self.chunk_size])
+            if not chunk:
+                return
+            last_id = chunk[-1][0]
+            for values in chunk:
+                yield dict(zip(fields, values[1:]))
+
+    def _report_rows(self, rows: Iterable[Dict[str, Any]], available: List[str],
+                     columns: Optional[List[str]]) -> tuple:
+        return self._select_columns(dict.fromkeys(available), columns), rows
+
+    def _start_of_day(self, day: date) -> datetime:
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    def _select_columns(self, available: Dict[str, Any], columns: Optional[List[str]]) -> List[str]:
+        if not columns:
+            return list(available)
+        unknown = [column for column in columns if column not in available]
+        if unknown:
+            raise ValidationError(
+                f"Columnas desconocidas: {', '.join(unknown)}. Disponibles: {', '.join(available)}"
+            )
+        return columns
@@ -0,0 +1,109 @@
+# services/fine/fine_service.py
+from datetime import date, timedelta
+from typing import Any, Dict
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Sum
+from django.db.models.query import QuerySet
+from django.utils import timezone
+from ...metrics import instrument_service
+
+@instrument_service
+class FineService:
+    """
+    Multas pendientes por usuario y de toda la biblioteca.
+
+    - Cobradas: las que LoanService guarda en el préstamo al devolverlo y
+      aún no se pagaron.
+    - Acumuladas: las de los préstamos abiertos vencidos, con las mismas
+      reglas (Loan.fine_for) que se aplicarían si se devolvieran hoy.
+
+    La multa acumulada de un préstamo solo depende de su fecha límite, así
+    que se calcula por fecha y no por préstamo: una consulta agrupada por
+    `due_date` sobre el índice parcial de préstamos abiertos devuelve una
+    fila por día. Se lee de Loan y no del resumen diario (DailyLoanStats)
+    porque los updates masivos de `due_date` no lo mantienen.
+
+    Los totales de la biblioteca recorren todos los préstamos abiertos
+    vencidos; la API los sirve de get_cached_library_fines, que los guarda
+    LIBRARY_FINES_CACHE_TIMEOUT segundos.
+    """
+    LIBRARY_FINES_KEY = 'fines:library'
+
+    def __init__(self):
+        self.Loan = apps.get_model('biblioteca', 'Loan')
+
+    def get_user_fines(self, user_id: int) -> Dict[str, Any]:
+        """Multas cobradas y acumuladas del usuario, con el detalle de sus préstamos vencidos."""
+        today = timezone.localdate()
+        overdue_loans = list(
+            self._billable(self.Loan.objects.filter(user_id=user_id), today)
+            .order_by('due_date', 'id')
+            .values('id', 'book__title', 'due_date')
+        )
+        for loan in overdue_loans:
+            loan['days_late'] = (today - loan['due_date']).days
+            loan['fine_amount'] = self._fine(loan['due_date'], today)
+
+        accrued = sum(loan['fine_amount'] for loan in overdue_loans)
+        assessed = self._assessed(self.Loan.objects.filter(user_id=user_id))
+        return {
+            'user_id': user_id,
+            'accrued': accrued,
+            'assessed': assessed['total'],
+            'outstanding': accrued + assessed['total'],
+            'overdue_loans': overdue_loans,
+        }
+
+    def get_library_fines(self) -> Dict[str, Any]:
+        """Totales de la biblioteca, agrupados por fecha límite."""
+        accrued = self.accrued_fines(self.Loan.objects.all())
+        assessed = self._assessed(self.Loan.objects.all())
+        return {
+            'accrued': accrued['accrued'],
+            'accrued_loans': accrued['loans'],
+            'assessed': assessed['total'],
+            'assessed_loans': assessed['loans'],
+            'outstanding': accrued['accrued'] + assessed['total'],
+        }
+
+    def get_cached_library_fines(self) -> Dict[str, Any]:
+        """get_library_fines guardado unos segundos: puede ir por detrás de los préstamos."""
+        cache = caches[getattr(settings, 'LIBRARY_FINES_CACHE_ALIAS', 'default')]
+        totals = cache.get(self.LIBRARY_FINES_KEY)
+        if totals is None:
+            totals = self.get_library_fines()
+            cache.set(self.LIBRARY_FINES_KEY, totals, getattr(settings, 'LIBRARY_FINES_CACHE_TIMEOUT', 60))
+        return totals
+
+    def accrued_fines(self, loans: QuerySet) -> Dict[str, int]:
+        """Multa acumulada de los préstamos del queryset en una consulta agrupada por fecha límite."""
+        today = timezone.localdate()
+        rows = (
+            self._billable(loans, today)
+            .order_by()
+            .values('due_date')
+            .annotate(total=Count('id'))
+            .values_list('due_date', 'total')
+        )
+        totals = {'loans': 0, 'accrued': 0}
+        for due_date, total in rows:
+            totals['loans'] += total
+            totals['accrued'] += total * self._fine(due_date, today)
+        return totals
+
+    def _billable(self, loans: QuerySet, today: date) -> QuerySet:
+        """Préstamos abiertos que ya pasaron el periodo de gracia (índice loan_open_due_idx)."""
+        return loans.filter(returned=False, due_date__lt=today - timedelta(days=self.Loan.GRACE_DAYS))
+
+    def _assessed(self, loans: QuerySet) -> Dict[str, int]:
+        """Multas cobradas sin pagar (índice loan_unpaid_fine_idx)."""
+        totals = loans.filter(fine_amount__gt=0, fine_paid=False).aggregate(
+            total=Sum('fine_amount'),
+            loans=Count('id')
+        )
+        return {'total': totals['total'] or 0, 'loans': totals['loans']}
+
+    def _fine(self, due_date: date, today: date) -> int:
+        return self.Loan.fine_for(due_date, today)
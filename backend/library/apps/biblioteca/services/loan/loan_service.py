@@ -2,66 +2,63 @@
 from datetime import timedelta
 from typing import Dict, Any
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.utils import timezone
 from django.apps import apps
+from ..notification.notification_service import NotificationService
+from ...metrics import instrument_service
 
+@instrument_service
 class LoanService:
     def __init__(self):
         self.Loan = apps.get_model('biblioteca', 'Loan')
         self.Book = apps.get_model('biblioteca', 'Book')
         self.User = apps.get_model('auth', 'User')
+        self.BorrowerProfile = apps.get_model('biblioteca', 'BorrowerProfile')
+        self.DailyLoanStats = apps.get_model('biblioteca', 'DailyLoanStats')
         self.MAX_LOANS = 5
         self.LOAN_DAYS = 15
-        self.GRACE_DAYS = 2
-        self.DAILY_FINE = 10
+        self.GRACE_DAYS = self.Loan.GRACE_DAYS
+        self.DAILY_FINE = self.Loan.DAILY_FINE
+        self.notification_service = NotificationService()
 
     def create_loan(self, user_id: int, book_id: int) -> object:
-        """Crea un nuevo préstamo."""
-        user = self._verify_user(user_id)
-        book = self._verify_book(book_id)
-        self._verify_loan_limits(user_id)
-        
+        """
+        Crea un nuevo préstamo.
+
+        El libro se reclama con un UPDATE condicional dentro de la transacción,
+        por lo que dos préstamos simultáneos del mismo ejemplar no pueden tener
+        éxito. El límite se aplica con otro UPDATE condicional sobre el contador
+        del usuario, de modo que el préstamo cuesta un número fijo de consultas.
+        La notificación se encola en la misma transacción.
+        """
         due_date = timezone.now().date() + timedelta(days=self.LOAN_DAYS)
-        
-        try:
-            loan = self.Loan.objects.create(
-                user=user,
-                book=book,
-                due_date=due_date
-            )
-            book.status = 'borrowed'
-            book.save()
+
+        with transaction.atomic():
+            self._claim_book(book_id)
+            user = self._verify_user(user_id)
+            self._verify_loan_limits(user_id)
+
+            try:
+                # El libro ya se reclamó: se carga solo si alguien lo usa
+                loan = self.Loan(user=user, book_id=book_id, due_date=due_date)
+                loan.save(book_claimed=True)
+            except Exception as e:
+                raise ValidationError(f"Error al crear el préstamo: {str(e)}")
+
+            self.notification_service.send_loan_notification(loan)
             return loan
-        except Exception as e:
-            raise ValidationError(f"Error al crear el préstamo: {str(e)}")
 
-    def process_return(self, loan_id: int, damaged: bool = False) -> Dict[str, Any]:
-        """Procesa la devolución de un libro."""
-        loan = self._get_loan(loan_id)
-        
-        if loan.returned:
-            raise ValidationError("Este préstamo ya fue devuelto")
-        
-        return_info = {
-            'loan': loan,
-            'return_date': timezone.now(),
-            'fine_amount': 0,
-            'days_late': 0
-        }
-        
-        if not loan.returned:
-            fine_info = self._calculate_fine(loan)
-            return_info.update(fine_info)
-        
-        loan.returned = True
-        loan.returned_date = return_info['return_date']
-        loan.save()
-        
-        new_status = 'damaged' if damaged else 'available'
-        loan.book.status = new_status
-        loan.book.save()
-        
-        return return_info
+    def _claim_book(self, book_id: int) -> None:
+        """Marca el libro como prestado solo si sigue disponible."""
+        claimed = self.Book.objects.filter(
+            id=book_id,
+            status='available'
+        ).update(status='borrowed', updated_at=timezone.now())
+
+        if not claimed:
+            self._verify_book(book_id)
+            raise ValidationError("El libro no está disponible para préstamo")
 
     def _verify_user(self, user_id: int) -> object:
         """Verifica que el usuario exista y esté activo."""
@@ -84,32 +81,27 @@ class LoanService:
             raise ValidationError("Libro no encontrado")
 
     def _verify_loan_limits(self, user_id: int) -> None:
-        """Verifica que el usuario no exceda el límite de préstamos."""
-        active_loans = self.Loan.objects.filter(
-            user_id=user_id,
-            returned=False
-        ).count()
-        
-        if active_loans >= self.MAX_LOANS:
+        """
+        Verifica que el usuario no exceda el límite de préstamos.
+
+        Incrementa el contador de préstamos activos solo si está bajo el
+        límite; debe llamarse dentro de la transacción del préstamo.
+        """
+        if not self.BorrowerProfile.increment_active_loans(user_id, self.MAX_LOANS):
             raise ValidationError(
                 f"El usuario ha alcanzado el límite de {self.MAX_LOANS} préstamos"
             )
 
-    def _calculate_fine(self, loan: object) -> Dict[str, Any]:
-        """Calcula la multa por retraso si aplica."""
-        today = timezone.now().date()
-        days_late = (today - loan.due_date).days
-        
-        fine_info = {
-            'days_late': max(0, days_late),
-            'fine_amount': 0
+    def calculate_fine(self, loan: object) -> Dict[str, Any]:
+        """
+        Calcula la multa por retraso si aplica (regla de Loan.fine_for, la
+        misma que usan Loan.save y FineService).
+        """
+        today = timezone.localdate()
+        return {
+            'days_late': max(0, (today - loan.due_date).days),
+            'fine_amount': self.Loan.fine_for(loan.due_date, today)
         }
-        
-        if days_late > self.GRACE_DAYS:
-            billable_days = days_late - self.GRACE_DAYS
-            fine_info['fine_amount'] = billable_days * self.DAILY_FINE
-            
-        return fine_info
     
     def _get_loan(self, loan_id: int) -> object:
         """
@@ -125,7 +117,7 @@ class LoanService:
             ValidationError: Si el préstamo no existe
         """
         try:
-            return self.Loan.objects.get(id=loan_id)
+            return self.Loan.objects.select_related('book', 'user').get(id=loan_id)
         except self.Loan.DoesNotExist:
             raise ValidationError(f"Préstamo con ID {loan_id} no encontrado")
 
@@ -153,15 +145,35 @@ class LoanService:
         }
         
         if not loan.returned:
-            fine_info = self._calculate_fine(loan)
+            fine_info = self.calculate_fine(loan)
             return_info.update(fine_info)
         
+        new_status = 'damaged' if damaged else 'available'
+
+        with transaction.atomic():
+            # Solo una devolución concurrente puede marcar el préstamo
+            marked = self.Loan.objects.filter(id=loan.id, returned=False).update_untracked(
+                returned=True,
+                returned_date=return_info['return_date'],
+                fine_amount=return_info['fine_amount']
+            )
+            if not marked:
+                raise ValidationError("Este préstamo ya fue devuelto")
+
+            self.BorrowerProfile.decrement_active_loans(loan.user_id)
+            self.DailyLoanStats.record_return(
+                loan.loan_date,
+                loan.due_date,
+                return_info['return_date']
+            )
+            self.Book.objects.filter(id=loan.book_id).update(
+                status=new_status,
+                updated_at=return_info['return_date']
+            )
+
         loan.returned = True
         loan.returned_date = return_info['return_date']
-        loan.save()
-        
-        new_status = 'damaged' if damaged else 'available'
+        loan.fine_amount = return_info['fine_amount']
         loan.book.status = new_status
-        loan.book.save()
         
         return return_info
\ No newline at end of file
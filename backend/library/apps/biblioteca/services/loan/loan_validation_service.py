@@ -7,15 +7,12 @@ from django.apps import apps
 class LoanValidationService:
     def __init__(self):
         self.Loan = apps.get_model('biblioteca', 'Loan')
+        self.BorrowerProfile = apps.get_model('biblioteca', 'BorrowerProfile')
         self.MAX_LOANS = 5
 
     def validate_loan_limits(self, user_id: int) -> bool:
         """Valida los límites de préstamo para un usuario."""
-        active_loans = self.Loan.objects.filter(
-            user_id=user_id,
-            returned=False
-        ).count()
-        return active_loans < self.MAX_LOANS
+        return self.BorrowerProfile.get_active_loans(user_id) < self.MAX_LOANS
 
     def validate_due_date(self, due_date: datetime) -> bool:
         """Valida que la fecha de devolución sea válida."""
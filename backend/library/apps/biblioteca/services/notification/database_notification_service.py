@@ -1,19 +1,26 @@
 # services/notification/database_notification_service.py
 from typing import Optional, List
 from django.apps import apps
+from .notification_writer import NotificationWriter
 import logging
 
 logger = logging.getLogger(__name__)
 
 class DatabaseNotificationService:
-    def __init__(self):
+    def __init__(self, writer: Optional[NotificationWriter] = None):
         self.Notification = apps.get_model('biblioteca', 'Notification')
+        self.writer = writer
 
     def save_notification(self, subject: str, message: str, recipient: str) -> Optional[object]:
         """
         Guarda una notificación en la base de datos.
+        Con un NotificationWriter la fila se agrega a su buffer y se guarda en el
+        siguiente vaciado.
         """
         try:
+            if self.writer is not None:
+                return self.writer.add(subject, message, recipient)
+
             notification = self.Notification.objects.create(
                 subject=subject,
                 message=message,
@@ -34,15 +41,27 @@ class DatabaseNotificationService:
             read=False
         ).order_by('-created_at')
 
+    def get_unread_count(self, recipient: str) -> int:
+        """
+        Obtiene el número de notificaciones no leídas (cacheado).
+        """
+        return self.Notification.unread_count(recipient)
+
     def mark_as_read(self, notification_id: int) -> bool:
         """
         Marca una notificación como leída.
         """
-        try:
-            notification = self.Notification.objects.get(id=notification_id)
-            notification.read = True
-            notification.save()
-            return True
-        except self.Notification.DoesNotExist:
+        if not self.Notification.objects.filter(id=notification_id).update(read=True):
             logger.error(f"Notificación {notification_id} no encontrada")
-            return False
\ No newline at end of file
+            return False
+        return True
+
+    def mark_many_as_read(self, recipient: str, notification_ids: Optional[List[int]] = None) -> int:
+        """
+        Marca como leídas todas las notificaciones del destinatario, o solo las
+        indicadas, con un único UPDATE. Devuelve cuántas cambiaron.
+        """
+        notifications = self.Notification.objects.filter(recipient=recipient, read=False)
+        if notification_ids is not None:
+            notifications = notifications.filter(id__in=notification_ids)
+        return notifications.update_for([recipient], read=True)
\ No newline at end of file
@@ -1,30 +1,154 @@
 # services/notification/email_service.py
-from typing import Optional
-from django.core.mail import send_mail
+import threading
+import time
+from smtplib import SMTPServerDisconnected
+from typing import Any, Dict, List, Optional
+from django.core.mail import EmailMessage, get_connection
 from django.conf import settings
 import logging
+from ...metrics import EMAIL_ERRORS, EMAIL_LATENCY, instrument_service
 
 logger = logging.getLogger(__name__)
 
+# Hijos de las métricas resueltos una vez, no en cada envío
+SINGLE_LATENCY = EMAIL_LATENCY.labels('single')
+SINGLE_ERRORS = EMAIL_ERRORS.labels('single')
+BATCH_LATENCY = EMAIL_LATENCY.labels('batch')
+BATCH_ERRORS = EMAIL_ERRORS.labels('batch')
+
+@instrument_service
 class EmailService:
+    """
+    Envío de emails. Los envíos sueltos (`send_email`, `deliver`) reutilizan
+    una conexión SMTP abierta por instancia, que se reabre si el servidor la
+    cerró; `close()` la libera. `send_bulk` abre una por lote.
+    """
+
+    def __init__(self):
+        self._connection = None
+        self._connection_lock = threading.Lock()
+
     def send_email(self, subject: str, message: str, recipient: str) -> bool:
         """
         Envía un email usando la configuración de Django.
         """
         try:
-            if not recipient:
-                raise ValueError("Email de destinatario no proporcionado")
-
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.EMAIL_HOST_USER,
-                recipient_list=[recipient],
-                fail_silently=False,
-            )
+            self.deliver(subject, message, recipient)
             logger.info(f"Email enviado exitosamente a {recipient}")
             return True
-            
+
         except Exception as e:
             logger.error(f"Error enviando email a {recipient}: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+    def deliver(self, subject: str, message: str, recipient: str) -> None:
+        """
+        Envía un email y propaga cualquier error al llamador.
+        """
+        if not recipient:
+            raise ValueError("Email de destinatario no proporcionado")
+
+        email = self.build_message(subject, message, recipient)
+        start = time.perf_counter()
+        try:
+            self._send_reusing_connection(email)
+        except Exception:
+            SINGLE_ERRORS.inc()
+            raise
+        finally:
+            SINGLE_LATENCY.observe(time.perf_counter() - start)
+
+    def close(self) -> None:
+        """Cierra la conexión de los envíos sueltos, si hay una abierta."""
+        with self._connection_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _send_reusing_connection(self, email: EmailMessage) -> None:
+        with self._connection_lock:
+            if self._connection is None:
+                self._connection = get_connection(fail_silently=False)
+            # Abierta aquí, send_messages no la cierra al terminar
+            self._connection.open()
+            try:
+                self._connection.send_messages([email])
+            except SMTPServerDisconnected:
+                # El servidor cortó la sesión inactiva: se reintenta una vez
+                self._connection.close()
+                self._connection.open()
+                self._connection.send_messages([email])
+
+    def build_message(self, subject: str, message: str, recipient: str) -> EmailMessage:
+        """
+        Prepara un EmailMessage para `send_bulk`.
+        """
+        return EmailMessage(
+            subject=subject,
+            body=message,
+            from_email=settings.EMAIL_HOST_USER,
+            to=[recipient] if recipient else [],
+        )
+
+    def send_bulk(self, messages: List[EmailMessage],
+                  batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Envía mensajes reutilizando una conexión SMTP por lote.
+
+        Cada lote de `batch_size` mensajes (por defecto EMAIL_BATCH_SIZE) abre
+        una sola conexión TLS. Devuelve un resultado por mensaje, en el mismo
+        orden: {'recipients', 'sent', 'error'}.
+        """
+        batch_size = batch_size or getattr(settings, 'EMAIL_BATCH_SIZE', 100)
+        results = []
+        for start in range(0, len(messages), batch_size):
+            results.extend(self._send_batch(messages[start:start + batch_size]))
+
+        sent = sum(1 for result in results if result['sent'])
+        logger.info(f"Envío masivo: {sent} de {len(results)} emails enviados")
+        return results
+
+    def _send_batch(self, messages: List[EmailMessage]) -> List[Dict[str, Any]]:
+        connection = get_connection(fail_silently=False)
+        results = []
+        try:
+            connection.open()
+        except Exception as e:
+            logger.error(f"Error abriendo conexión SMTP: {str(e)}")
+            return [self._result(message, str(e)) for message in messages]
+
+        try:
+            for message in messages:
+                error = None
+                start = time.perf_counter()
+                try:
+                    if not message.recipients():
+                        raise ValueError("Email de destinatario no proporcionado")
+                    message.connection = connection
+                    connection.send_messages([message])
+                    BATCH_LATENCY.observe(time.perf_counter() - start)
+                except SMTPServerDisconnected as e:
+                    # El servidor cortó la sesión: se reabre para el resto del lote
+                    error = str(e)
+                    connection.close()
+                    connection.open()
+                except Exception as e:
+                    error = str(e)
+
+                if error:
+                    BATCH_ERRORS.inc()
+                    logger.error(f"Error enviando email a {message.recipients()}: {error}")
+                results.append(self._result(message, error))
+        except Exception as e:
+            logger.error(f"Error reconectando con el servidor SMTP: {str(e)}")
+            results.extend(self._result(message, str(e)) for message in messages[len(results):])
+        finally:
+            connection.close()
+        return results
+
+    def _result(self, message: EmailMessage, error: Optional[str]) -> Dict[str, Any]:
+        return {
+            'recipients': message.recipients(),
+            'sent': error is None,
+            'error': error,
+        }
@@ -0,0 +1,122 @@
+# services/notification/loan_reminder_service.py
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+from django.apps import apps
+from django.db.models import QuerySet
+from ...factories.notification.due_date_notification import DueDateNotificationFactory
+from ...factories.notification.overdue_notification import OverdueNotificationFactory
+from .notification_writer import NotificationWriter
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LoanReminderService:
+    """
+    Barrido de préstamos vencidos y próximos a vencer.
+
+    Recorre los préstamos abiertos por id en bloques de tamaño fijo (memoria
+    acotada), renderiza los mensajes con las factories y escribe las
+    notificaciones (con un NotificationWriter, en la transacción del bloque)
+    y los emails del outbox con inserciones por lotes. Cada préstamo recibe
+    como máximo un aviso de cada tipo por día.
+    """
+    KIND_OVERDUE = 'overdue'
+    KIND_DUE_DATE = 'due_date'
+
+    def __init__(self, reminder_days: int = 2):
+        self.Loan = apps.get_model('biblioteca', 'Loan')
+        self.Notification = apps.get_model('biblioteca', 'Notification')
+        self.OutboxMessage = apps.get_model('biblioteca', 'OutboxMessage')
+        self.reminder_days = reminder_days
+        # La restricción única descarta el aviso que otro barrido ya insertó
+        self.writer = NotificationWriter(max_rows=500, ignore_conflicts=True)
+        self.factories = {
+            self.KIND_OVERDUE: OverdueNotificationFactory(self.writer),
+            self.KIND_DUE_DATE: DueDateNotificationFactory(self.writer),
+        }
+
+    def get_candidates(self, kind: str, run_date: date) -> QuerySet:
+        """Préstamos abiertos que deben recibir el aviso `kind` en `run_date`."""
+        loans = self.Loan.objects.filter(returned=False)
+        if kind == self.KIND_OVERDUE:
+            return loans.filter(due_date__lt=run_date)
+        return loans.filter(due_date=run_date + timedelta(days=self.reminder_days))
+
+    def sweep(self, kind: str, run_date: date, chunk_size: int = 1000,
+              send_email: bool = True, dry_run: bool = False) -> Iterator[Dict[str, int]]:
+        """Procesa los candidatos por bloques y devuelve las estadísticas de cada bloque."""
+        candidates = (
+            self.get_candidates(kind, run_date)
+            .select_related('book', 'user')
+            .only(
+                'id', 'due_date', 'book__title', 'user__username',
+                'user__first_name', 'user__last_name', 'user__email'
+            )
+            .order_by('id')
+        )
+        last_id = 0
+        while True:
+            chunk = list(candidates.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                return
+            last_id = chunk[-1].id
+            yield self._process_chunk(kind, run_date, chunk, send_email, dry_run)
+
+    def _process_chunk(self, kind: str, run_date: date, chunk: List[object],
+                       send_email: bool, dry_run: bool) -> Dict[str, int]:
+        stats = {'candidates': len(chunk), 'created': 0, 'skipped': 0, 'rejected': 0}
+        already_sent = set(
+            self.Notification.objects.filter(
+                loan_id__in=[loan.id for loan in chunk],
+                kind=kind,
+                sent_on=run_date
+            ).values_list('loan_id', flat=True)
+        )
+
+        factory = self.factories[kind]
+        pending = {}
+        for loan in chunk:
+            if loan.id in already_sent:
+                stats['skipped'] += 1
+                continue
+            try:
+                subject, message = factory.render_notification(loan)
+            except ValueError:
+                stats['rejected'] += 1
+                continue
+            pending[loan.id] = (subject, message, loan.user.email)
+
+        if dry_run or not pending:
+            stats['created'] = len(pending)
+            return stats
+
+        with self.writer.atomic():
+            # Dos barridos superpuestos (cron, reintento manual) se ordenan por
+            # préstamo (en SQLite, por BEGIN IMMEDIATE): el segundo ve los
+            # avisos del primero y los omite. La restricción única queda como
+            # respaldo con ignore_conflicts.
+            locked = self.Loan.objects.select_for_update().filter(id__in=list(pending))
+            list(locked.values_list('id', flat=True))
+            sent_meanwhile = set(
+                self.Notification.objects.filter(
+                    loan_id__in=list(pending),
+                    kind=kind,
+                    sent_on=run_date
+                ).values_list('loan_id', flat=True)
+            )
+            for loan_id in sent_meanwhile:
+                del pending[loan_id]
+            stats['skipped'] += len(sent_meanwhile)
+
+            for loan_id, (subject, message, recipient) in pending.items():
+                self.writer.add(subject, message, recipient, loan_id=loan_id, kind=kind, sent_on=run_date)
+            if send_email:
+                # Solo para los avisos insertados por este barrido
+                self.OutboxMessage.objects.bulk_create([
+                    self.OutboxMessage(subject=subject, message=message, recipient=recipient)
+                    for subject, message, recipient in pending.values()
+                ], batch_size=500)
+
+        stats['created'] = len(pending)
+        logger.info(f"Barrido {kind} {run_date}: {stats['created']} notificaciones creadas")
+        return stats
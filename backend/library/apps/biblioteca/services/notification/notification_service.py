@@ -1,15 +1,16 @@
 # services/notification/notification_service.py
 from typing import Optional, List
 from django.apps import apps
-from .email_service import EmailService
-from .database_notification_service import DatabaseNotificationService
+from django.db import transaction
+from ...metrics import instrument_service
+from ...observers.notification_subject import NotificationSubject, get_notification_subject
 
+@instrument_service
 class NotificationService:
-    def __init__(self):
+    def __init__(self, subject: Optional[NotificationSubject] = None):
         self.Loan = apps.get_model('biblioteca', 'Loan')
         self.Book = apps.get_model('biblioteca', 'Book')
-        self.email_service = EmailService()
-        self.db_service = DatabaseNotificationService()
+        self.subject = subject or get_notification_subject()
 
     def send_loan_notification(self, loan: object) -> bool:
         """
@@ -22,8 +23,7 @@ class NotificationService:
                 f"hasta el {loan.due_date.strftime('%d/%m/%Y')}."
             )
             
-            self.email_service.send_email(subject, message, loan.user.email)
-            self.db_service.save_notification(subject, message, loan.user.email)
+            self._dispatch(subject, message, loan.user.email)
             return True
         except Exception as e:
             print(f"Error en notificación de préstamo: {e}")
@@ -40,8 +40,7 @@ class NotificationService:
                 f"el día {loan.due_date.strftime('%d/%m/%Y')}."
             )
             
-            self.email_service.send_email(subject, message, loan.user.email)
-            self.db_service.save_notification(subject, message, loan.user.email)
+            self._dispatch(subject, message, loan.user.email)
             return True
         except Exception as e:
             print(f"Error en recordatorio de devolución: {e}")
@@ -58,9 +57,25 @@ class NotificationService:
                 f"desde el {loan.due_date.strftime('%d/%m/%Y')}."
             )
             
-            self.email_service.send_email(subject, message, loan.user.email)
-            self.db_service.save_notification(subject, message, loan.user.email)
+            self._dispatch(subject, message, loan.user.email)
             return True
         except Exception as e:
             print(f"Error en notificación de vencimiento: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def _dispatch(self, subject: str, message: str, recipient: str) -> None:
+        """
+        Reparte la notificación entre los observadores del sujeto.
+
+        Con el sujeto por defecto el email se encola en el outbox y la
+        notificación se guarda en la misma transacción: dentro de la del
+        llamador (por ejemplo, la del préstamo) en un savepoint, para que ambos
+        se confirmen junto con la operación y un fallo aquí no la invalide;
+        fuera de una, en la suya propia. El envío SMTP, con sus reintentos, lo
+        hace `deliver_notifications`.
+        """
+        if not recipient:
+            raise ValueError("Email de destinatario no proporcionado")
+
+        with transaction.atomic():
+            self.subject.notify(subject, message, recipient)
@@ -0,0 +1,194 @@
+# services/notification/notification_writer.py
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+import logging
+
+logger = logging.getLogger(__name__)
+
+class NotificationWriter:
+    """
+    Acumula notificaciones y las escribe con INSERT por lotes.
+
+    Fuera de una transacción el buffer se vacía al llegar a `max_rows` filas
+    o cuando la fila más antigua cumple `max_seconds`, con un temporizador si
+    no llegan más filas. Cada vaciado es atómico: al volver de `flush()`
+    todas las filas del lote están guardadas. Antes de terminar el proceso se
+    debe llamar a `close()` (o usar el writer como context manager) para no
+    perder lo pendiente.
+
+    Dentro de una transacción las filas se agrupan con `writer.atomic()`: se
+    escriben en esa misma transacción cada `max_rows` filas y al salir del
+    bloque, antes de confirmar, así quedan tan durables como con `create()`;
+    si el bloque se revierte, las pendientes se descartan con él. Para
+    agrupar dentro de un savepoint que puede revertirse se anida otro
+    `writer.atomic()`. Una fila agregada en una transacción fuera de un
+    `writer.atomic()` se escribe en el acto.
+    """
+
+    def __init__(self, max_rows: int = 500, max_seconds: float = 2.0, using: str = DEFAULT_DB_ALIAS,
+                 ignore_conflicts: bool = False):
+        self.Notification = apps.get_model('biblioteca', 'Notification')
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.using = using
+        self.ignore_conflicts = ignore_conflicts
+        self._buffer: List[object] = []
+        self._oldest = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._metrics = {
+            'flushes': 0,
+            'rows_written': 0,
+            'failed_flushes': 0,
+            'max_batch': 0,
+            'total_flush_ms': 0.0,
+        }
+
+    def add(self, subject: str, message: str, recipient: str, **fields: Any) -> object:
+        """Agrega una notificación al buffer y la devuelve (sin id hasta el vaciado)."""
+        notification = self.Notification(
+            subject=subject,
+            message=message,
+            recipient=recipient,
+            **fields
+        )
+
+        scopes = getattr(self._local, 'scopes', None)
+        if scopes:
+            rows = scopes[-1]
+            rows.append(notification)
+            if len(rows) >= self.max_rows:
+                self._write_scope(rows)
+        elif transaction.get_connection(self.using).in_atomic_block:
+            self._write([notification])
+        elif self._buffer_row(notification):
+            self.flush()
+        return notification
+
+    @contextmanager
+    def atomic(self) -> Iterator['NotificationWriter']:
+        """Transacción (o savepoint) cuyas filas se escriben por lotes antes de confirmar."""
+        if not hasattr(self._local, 'scopes'):
+            self._local.scopes = []
+        rows = []
+        self._local.scopes.append(rows)
+        try:
+            with transaction.atomic(using=self.using):
+                yield self
+                self._write_scope(rows)
+        finally:
+            # Tras un rollback las filas del bloque se pierden con él
+            self._local.scopes.pop()
+
+    def flush(self) -> int:
+        """Escribe las filas pendientes fuera de transacción. Devuelve cuántas se guardaron."""
+        with self._lock:
+            rows, self._buffer, self._oldest = self._buffer, [], None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not rows:
+            return 0
+        try:
+            self._write(rows)
+        except Exception:
+            with self._lock:
+                self._buffer[:0] = rows
+                self._oldest = self._oldest or time.monotonic()
+                self._start_timer()
+            raise
+        return len(rows)
+
+    def close(self) -> None:
+        self.flush()
+
+    def get_metrics(self) -> Dict[str, float]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['pending'] = len(self._buffer)
+        metrics['avg_batch'] = (
+            metrics['rows_written'] / metrics['flushes'] if metrics['flushes'] else 0.0
+        )
+        return metrics
+
+    def __enter__(self) -> 'NotificationWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _buffer_row(self, notification: object) -> bool:
+        """Agrega la fila al buffer. Devuelve True si hay que vaciarlo ya."""
+        with self._lock:
+            self._buffer.append(notification)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            due = (
+                len(self._buffer) >= self.max_rows
+                or time.monotonic() - self._oldest >= self.max_seconds
+            )
+            if not due:
+                self._start_timer()
+        return due
+
+    def _start_timer(self) -> None:
+        """Programa el vaciado por tiempo; se llama con el lock tomado."""
+        if self._timer is None:
+            self._timer = threading.Timer(self.max_seconds, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error guardando notificaciones pendientes: {str(e)}")
+        finally:
+            # El hilo del temporizador abre su propia conexión
+            connections[self.using].close()
+
+    def _write_scope(self, rows: List[object]) -> None:
+        batch = rows[:]
+        rows.clear()
+        if batch:
+            self._write(batch)
+
+    def _write(self, rows: List[object]) -> None:
+        start = time.perf_counter()
+        try:
+            # Dentro de una transacción se escribe en ella, sin savepoint propio
+            with transaction.atomic(using=self.using, savepoint=False):
+                self.Notification.objects.using(self.using).bulk_create(
+                    rows, batch_size=self.max_rows, ignore_conflicts=self.ignore_conflicts
+                )
+        except Exception:
+            with self._lock:
+                self._metrics['failed_flushes'] += 1
+            raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self._metrics['flushes'] += 1
+            self._metrics['rows_written'] += len(rows)
+            self._metrics['max_batch'] = max(self._metrics['max_batch'], len(rows))
+            self._metrics['total_flush_ms'] += elapsed_ms
+        logger.info(f"{len(rows)} notificaciones guardadas en {elapsed_ms:.1f} ms")
+
+
+_default_writer = None
+_default_writer_lock = threading.Lock()
+
+def get_notification_writer() -> NotificationWriter:
+    """Writer compartido de los observadores y servicios por defecto."""
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = NotificationWriter()
+        return _default_writer
@@ -0,0 +1,154 @@
+# services/notification/outbox_service.py
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, List, Optional
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .email_service import EmailService
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTBOX_SETTINGS = {
+    'WORKERS': 4,
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 30,
+    'MAX_BACKOFF_SECONDS': 3600,
+    'CLAIM_TIMEOUT_SECONDS': 300,
+}
+
+def get_outbox_settings() -> Dict[str, int]:
+    return {**DEFAULT_OUTBOX_SETTINGS, **getattr(settings, 'NOTIFICATION_OUTBOX', {})}
+
+class OutboxService:
+    """
+    Cola persistente de emails.
+
+    `enqueue` se ejecuta dentro de la transacción del llamador; `deliver_batch`
+    reclama un lote de mensajes vencidos, los reparte entre los hilos del
+    pool (cada hilo envía su parte por una sola conexión SMTP) y registra el
+    resultado con reintentos exponenciales y estado `dead` al agotar los
+    intentos. Los hilos solo hacen SMTP; las escrituras en BD se hacen desde
+    el hilo que llama.
+    """
+
+    def __init__(self, email_service: EmailService = None):
+        self.OutboxMessage = apps.get_model('biblioteca', 'OutboxMessage')
+        self.email_service = email_service or EmailService()
+        self.config = get_outbox_settings()
+
+    def enqueue(self, subject: str, message: str, recipient: str) -> object:
+        """Registra un email para envío diferido."""
+        return self.OutboxMessage.objects.create(
+            subject=subject,
+            message=message,
+            recipient=recipient
+        )
+
+    def deliver_batch(self, executor: ThreadPoolExecutor, batch_size: Optional[int] = None,
+                      workers: Optional[int] = None) -> Dict[str, int]:
+        """Entrega un lote de mensajes y devuelve cuántos se enviaron, reintentan o descartan."""
+        self.requeue_stale()
+        batch = self.claim_batch(batch_size or self.config['BATCH_SIZE'])
+        results = {'sent': 0, 'retry': 0, 'dead': 0}
+        if not batch:
+            return results
+
+        workers = max(1, workers or self.config['WORKERS'])
+        chunks = [batch[index::workers] for index in range(workers) if batch[index::workers]]
+        futures = [
+            (executor.submit(self._send_chunk, chunk), chunk)
+            for chunk in chunks
+        ]
+        for future, chunk in futures:
+            for item, outcome in zip(chunk, future.result()):
+                if outcome['sent']:
+                    self.mark_sent(item)
+                    results['sent'] += 1
+                elif self.mark_failed(item, outcome['error']):
+                    results['dead'] += 1
+                else:
+                    results['retry'] += 1
+        return results
+
+    def _send_chunk(self, chunk: List[object]) -> List[Dict]:
+        messages = [
+            self.email_service.build_message(item.subject, item.message, item.recipient)
+            for item in chunk
+        ]
+        return self.email_service.send_bulk(messages)
+
+    def claim_batch(self, batch_size: int) -> List[object]:
+        """Marca como `sending` un lote de mensajes vencidos para este proceso."""
+        token = uuid.uuid4().hex
+        now = timezone.now()
+        candidates = (
+            self.OutboxMessage.objects.filter(
+                status=self.OutboxMessage.STATUS_PENDING,
+                next_attempt_at__lte=now
+            )
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        with transaction.atomic():
+            self.OutboxMessage.objects.filter(
+                id__in=list(candidates),
+                status=self.OutboxMessage.STATUS_PENDING
+            ).update(
+                status=self.OutboxMessage.STATUS_SENDING,
+                claim_token=token,
+                claimed_at=now
+            )
+        return list(self.OutboxMessage.objects.filter(claim_token=token))
+
+    def mark_sent(self, item: object) -> None:
+        self.OutboxMessage.objects.filter(id=item.id, claim_token=item.claim_token).update(
+            status=self.OutboxMessage.STATUS_SENT,
+            attempts=F('attempts') + 1,
+            sent_at=timezone.now(),
+            claim_token='',
+            last_error=''
+        )
+
+    def mark_failed(self, item: object, error: str) -> bool:
+        """Programa un reintento o descarta el mensaje. Devuelve True si quedó `dead`."""
+        attempts = item.attempts + 1
+        dead = attempts >= self.config['MAX_ATTEMPTS']
+        logger.error(f"Error enviando email {item.id} a {item.recipient} (intento {attempts}): {error}")
+
+        self.OutboxMessage.objects.filter(id=item.id, claim_token=item.claim_token).update(
+            status=self.OutboxMessage.STATUS_DEAD if dead else self.OutboxMessage.STATUS_PENDING,
+            attempts=attempts,
+            next_attempt_at=timezone.now() + self.get_backoff(attempts),
+            claim_token='',
+            last_error=str(error)
+        )
+        return dead
+
+    def get_backoff(self, attempts: int) -> timedelta:
+        """Espera exponencial con jitter entre intentos."""
+        delay = min(
+            self.config['BACKOFF_SECONDS'] * 2 ** (attempts - 1),
+            self.config['MAX_BACKOFF_SECONDS']
+        )
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    def requeue_stale(self) -> int:
+        """Devuelve a la cola los mensajes reclamados por un proceso que no terminó."""
+        limit = timezone.now() - timedelta(seconds=self.config['CLAIM_TIMEOUT_SECONDS'])
+        return self.OutboxMessage.objects.filter(
+            status=self.OutboxMessage.STATUS_SENDING,
+            claimed_at__lt=limit
+        ).update(status=self.OutboxMessage.STATUS_PENDING, claim_token='')
+
+    def get_backlog(self) -> int:
+        """Número de mensajes pendientes de entrega."""
+        return self.OutboxMessage.objects.filter(
+            status__in=[self.OutboxMessage.STATUS_PENDING, self.OutboxMessage.STATUS_SENDING]
+        ).count()
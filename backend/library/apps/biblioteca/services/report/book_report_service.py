@@ -3,16 +3,21 @@ from typing import Dict, List, Any
 from datetime import datetime
 from django.db.models import Count, Q
 from django.apps import apps
+from ...metrics import instrument_service
+from ...routers import get_report_database
 
+@instrument_service
 class BookReportService:
-    def __init__(self):
+    def __init__(self, using: str = None):
         self.Book = apps.get_model('biblioteca', 'Book')
         self.Loan = apps.get_model('biblioteca', 'Loan')
+        # Réplica de reportes si está al día, si no la base principal
+        self.using = using or get_report_database()
 
     def get_most_borrowed_books(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Obtiene los libros más prestados."""
         return (
-            self.Loan.objects.values(
+            self.Loan.objects.using(self.using).values(
                 'book__title',
                 'book__author'
             )
@@ -23,7 +28,7 @@ class BookReportService:
     def get_genre_statistics(self) -> List[Dict[str, Any]]:
         """Obtiene estadísticas por género."""
         return (
-            self.Book.objects.values('genre')
+            self.Book.objects.using(self.using).values('genre')
             .annotate(
                 total_books=Count('id'),
                 available_books=Count(
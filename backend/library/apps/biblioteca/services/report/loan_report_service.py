@@ -1,57 +1,176 @@
 # services/report/loan_report_service.py
-from typing import Dict, List, Any
-from datetime import datetime
-from django.db.models import Count, Q, Avg, F
+from typing import Dict, List, Any, Sequence
+from datetime import date, datetime, time, timedelta
+from django.conf import settings
+from django.db.models import Case, CharField, Count, Q, Sum, Value, When
 from django.db.models.functions import TruncMonth
 from django.apps import apps
 from django.utils import timezone
 from django.db.models.query import QuerySet
 
+from ...metrics import instrument_service
+from ...routers import get_report_database
+
+@instrument_service
 class LoanReportService:
-    def __init__(self):
+    """
+    Reportes de préstamos. Las consultas leen de `using`; por defecto la
+    réplica de reportes si está al día (ver get_report_database).
+    """
+
+    def __init__(self, aging_edges: Sequence[int] = None, using: str = None):
         self.Loan = apps.get_model('biblioteca', 'Loan')
+        self.DailyLoanStats = apps.get_model('biblioteca', 'DailyLoanStats')
+        self.using = using or get_report_database()
+        # Días de atraso con los que empieza cada tramo del histograma
+        self.aging_edges = sorted(
+            aging_edges or getattr(settings, 'LOAN_AGING_EDGES', (1, 8, 15, 31, 91))
+        )
+
+    def get_loan_statistics(self, start_date: date = None,
+                          end_date: date = None) -> Dict[str, Any]:
+        """
+        Genera estadísticas de préstamos.
 
-    def get_loan_statistics(self, start_date: datetime = None, 
-                          end_date: datetime = None) -> Dict[str, Any]:
-        """Genera estadísticas de préstamos."""
-        loans = self.Loan.objects.all()
-        
+        Los totales, el desglose mensual y los vencidos salen del resumen
+        diario (DailyLoanStats), así el costo depende de los días y no de la
+        cantidad de préstamos; las estadísticas por usuario leen solo los
+        préstamos del rango (ver get_user_statistics). Ambas fechas son
+        inclusivas.
+        """
+        monthly_breakdown = self.get_monthly_breakdown(start_date, end_date)
+
+        return {
+            'total_loans': sum(month['total_loans'] for month in monthly_breakdown),
+            'monthly_breakdown': monthly_breakdown,
+            'overdue_loans': self._get_overdue_statistics(),
+            'user_statistics': self.get_user_statistics(start_date, end_date)
+        }
+
+    def get_monthly_breakdown(self, start_date: date = None,
+                              end_date: date = None) -> List[Dict[str, Any]]:
+        """Préstamos, devoluciones y duración promedio por mes, desde el resumen diario."""
+        days = self.DailyLoanStats.objects.using(self.using)
         if start_date:
-            loans = loans.filter(loan_date__gte=start_date)
+            days = days.filter(day__gte=start_date)
         if end_date:
-            loans = loans.filter(loan_date__lte=end_date)
+            days = days.filter(day__lte=end_date)
 
         monthly_loans = (
-            loans.annotate(month=TruncMonth('loan_date'))
+            days.annotate(month=TruncMonth('day'))
             .values('month')
             .annotate(
-                total_loans=Count('id'),
-                avg_loan_duration=Avg(
-                    F('returned_date') - F('loan_date'),
-                    filter=Q(returned=True)
-                )
+                total_loans=Sum('loans'),
+                total_returns=Sum('returns'),
+                late_returns=Sum('late_returns'),
+                total_duration=Sum('total_duration')
             )
             .order_by('month')
         )
 
+        monthly_breakdown = []
+        for month in monthly_loans:
+            total_duration = month.pop('total_duration') or timedelta()
+            month['avg_loan_duration'] = (
+                total_duration / month['total_returns'] if month['total_returns'] else None
+            )
+            monthly_breakdown.append(month)
+        return monthly_breakdown
+
+    def get_user_statistics(self, start_date: date = None,
+                            end_date: date = None) -> QuerySet:
+        """
+        Préstamos y vencidos por usuario en el rango. Sin fecha inicial se
+        toman los últimos LOAN_USER_STATISTICS_DAYS días hasta `end_date` (u
+        hoy), para no agrupar toda la tabla Loan.
+        """
+        if not start_date:
+            days = getattr(settings, 'LOAN_USER_STATISTICS_DAYS', 30)
+            start_date = (end_date or timezone.localdate()) - timedelta(days=days - 1)
+        loans = self.filter_by_loan_date(self.Loan.objects.using(self.using), start_date, end_date)
+        return self._get_user_statistics(loans)
+
+    def get_overdue_histogram(self) -> List[Dict[str, Any]]:
+        """Préstamos vencidos a la fecha agrupados por días de atraso."""
+        return self._get_overdue_statistics()['overdue_by_days']
+
+    def filter_by_loan_date(self, loans: QuerySet, start_date: date = None,
+                            end_date: date = None) -> QuerySet:
+        """Filtra por fecha de préstamo (días locales, ambos inclusivos)."""
+        if start_date:
+            loans = loans.filter(loan_date__gte=self._start_of_day(start_date))
+        if end_date:
+            loans = loans.filter(loan_date__lt=self._start_of_day(end_date + timedelta(days=1)))
+        return loans
+
+    def _get_overdue_statistics(self) -> Dict[str, Any]:
+        """Préstamos vencidos a la fecha, desde el resumen diario."""
+        today = timezone.localdate()
         return {
-            'total_loans': loans.count(),
-            'monthly_breakdown': list(monthly_loans),
-            'overdue_loans': self._get_overdue_statistics(loans),
-            'user_statistics': self._get_user_statistics(loans)
+            'total_overdue': self.DailyLoanStats.objects.using(self.using).filter(day__lt=today).aggregate(
+                total=Sum('open_due')
+            )['total'] or 0,
+            'overdue_by_days': self._group_by_days_overdue()
         }
 
-    def _get_overdue_statistics(self, loans: QuerySet) -> Dict[str, Any]:
-        """Obtiene estadísticas de préstamos vencidos."""
-        overdue = loans.filter(
-            returned=False,
-            due_date__lt=timezone.now().date()
+    def _group_by_days_overdue(self) -> List[Dict[str, Any]]:
+        """
+        Histograma de préstamos vencidos por días de atraso.
+
+        Lee `open_due` del resumen diario: cada día anterior a hoy se asigna a
+        su tramo con un CASE y se suma en una sola consulta agrupada por tramo
+        y día, una fila por día de atraso y no una por préstamo. La multa
+        pendiente (días de atraso después del periodo de gracia por la multa
+        diaria) se suma a partir de esas filas.
+        """
+        today = timezone.localdate()
+        buckets = self._get_aging_buckets()
+
+        bucket = Case(
+            *[
+                When(self._due_date_range(today, low, high), then=Value(label))
+                for label, low, high in buckets
+            ],
+            default=Value(None),
+            output_field=CharField()
         )
-        
-        return {
-            'total_overdue': overdue.count(),
-            'overdue_by_days': self._group_by_days_overdue(overdue)
+        rows = (
+            self.DailyLoanStats.objects.using(self.using)
+            .filter(open_due__gt=0)
+            .annotate(bucket=bucket)
+            .exclude(bucket=None)
+            .order_by()
+            .values('bucket', 'day')
+            .annotate(total=Sum('open_due'))
+        )
+
+        histogram = {
+            label: {'range': label, 'min_days': low, 'max_days': high, 'total': 0, 'fine_amount': 0}
+            for label, low, high in buckets
         }
+        for row in rows:
+            entry = histogram[row['bucket']]
+            entry['total'] += row['total']
+            entry['fine_amount'] += row['total'] * self.Loan.fine_for(row['day'], today)
+        return list(histogram.values())
+
+    def _get_aging_buckets(self) -> List[tuple]:
+        """Tramos (etiqueta, mínimo, máximo) a partir de los bordes configurados."""
+        buckets = []
+        for index, low in enumerate(self.aging_edges):
+            if index + 1 < len(self.aging_edges):
+                high = self.aging_edges[index + 1] - 1
+                buckets.append((f'{low}-{high}', low, high))
+            else:
+                buckets.append((f'{low}+', low, None))
+        return buckets
+
+    def _due_date_range(self, today: date, low: int, high: int = None) -> Q:
+        """Días del resumen con entre `low` y `high` días de atraso."""
+        condition = Q(day__lte=today - timedelta(days=low))
+        if high is not None:
+            condition &= Q(day__gte=today - timedelta(days=high))
+        return condition
 
     def _get_user_statistics(self, loans: QuerySet) -> List[Dict[str, Any]]:
         """Obtiene estadísticas por usuario."""
@@ -71,4 +190,7 @@ class LoanReportService:
                 )
             )
             .order_by('-total_loans')
-        )
\ No newline at end of file
+        )
+
+    def _start_of_day(self, day: date) -> datetime:
+        return timezone.make_aware(datetime.combine(day, time.min))
@@ -1,3 +1,1360 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core import mail
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from .models import (
+    Book, BorrowerProfile, DailyLoanStats, Loan, Notification, OutboxMessage, Reservation, TableVersion
+)
+from .models.notification import UNREAD_COUNT_KEY
+from .observers.email_observer import EmailObserver
+from .observers.notification_observer import NotificationObserver
+from .observers.notification_subject import NotificationSubject
+from .pagination import KeysetPagination
+from .profiling import MemoryTracing, profile_store
+from .query_budget import QueryBudget, QueryBudgetExceeded
+from .routers import get_report_database
+from .serializers.book_serializers import BookListSerializer
+from .serializers.loan_serializers import LoanDetailSerializer
+from .serializers.reservation_serializers import ReservationDetailSerializer
+from .serializers.row_mappers import RowMapper
+from .services.book.book_import_service import BookImportService
+from .services.book.book_search_service import BookSearchService
+from .services.book.book_service import BookService
+from .services.dataset.dataset_service import DatasetService
+from .services.export.export_service import ExportService
+from .services.fine.fine_service import FineService
+from .services.loan.loan_service import LoanService
+from .services.notification.database_notification_service import DatabaseNotificationService
+from .services.notification.email_service import EmailService
+from .services.notification.loan_reminder_service import LoanReminderService
+from .services.notification.notification_service import NotificationService
+from .services.notification.notification_writer import NotificationWriter, get_notification_writer
+from .services.notification.outbox_service import OutboxService
+from .services.report.book_report_service import BookReportService
+from .services.report.loan_report_service import LoanReportService
 
-# Create your tests here.
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Fija el número de consultas de los endpoints de listado. `list` suma la
+    lectura de las versiones de tabla para los validadores HTTP.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', 'staff@biblioteca.com', 'clave')
+        due_date = timezone.now().date() + timedelta(days=15)
+        for index in range(10):
+            user = User.objects.create_user(f'lector{index}', f'lector{index}@biblioteca.com', 'clave')
+            book = Book.objects.create(
+                title=f'Libro {index}', author='Autor', genre='Novela', code=f'QB-{index}'
+            )
+            Loan.objects.create(book=book, user=user, due_date=due_date)
+            Reservation.objects.create(book=book, user=cls.staff)
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_loan_list(self):
+        with QueryBudget(2, exact=True):
+            response = self.client.get('/api/loans/')
+        self.assertEqual(len(response.json()), 10)
+
+    def test_loan_list_paginated(self):
+        with QueryBudget(2, exact=True):
+            response = self.client.get('/api/loans/?page_size=5')
+        self.assertEqual(len(response.json()['results']), 5)
+
+    def test_reservation_list(self):
+        with QueryBudget(2, exact=True):
+            response = self.client.get('/api/reservations/')
+        self.assertEqual(len(response.json()), 10)
+
+    def test_active_reservations(self):
+        with QueryBudget(1, exact=True):
+            response = self.client.get('/api/reservations/active/')
+        self.assertEqual(len(response.json()), 10)
+
+    def test_book_list(self):
+        with QueryBudget(2, exact=True):
+            self.client.get('/api/books/')
+
+    def test_budget_exceeded(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with QueryBudget(1):
+                list(Loan.objects.all())
+                list(Book.objects.all())
+
+
+class CheckoutTestCase(TestCase):
+    """Préstamo con reclamo condicional del libro."""
+
+    def setUp(self):
+        self.service = LoanService()
+        self.user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        BorrowerProfile.objects.create(user=self.user)
+        self.books = [
+            Book.objects.create(title=f'Libro {index}', author='Autor', genre='Novela', code=f'CK-{index}')
+            for index in range(LoanService().MAX_LOANS + 1)
+        ]
+
+    def test_checkout_query_count(self):
+        # UPDATE del libro, usuario, UPDATE del contador, INSERT del préstamo,
+        # resumen diario (un UPDATE para ambos días), libro para el aviso,
+        # outbox y notificación, más los savepoints.
+        # Las versiones de libros y préstamos se suman al confirmar, en un
+        # solo UPDATE fuera de la transacción
+        today = timezone.localdate()
+        DailyLoanStats.objects.create(day=today)
+        DailyLoanStats.objects.create(day=timezone.now().date() + timedelta(days=self.service.LOAN_DAYS))
+        before = TableVersion.current(['book', 'loan'])
+        with self.captureOnCommitCallbacks() as callbacks:
+            with QueryBudget(12, exact=True):
+                loan = self.service.create_loan(self.user.id, self.books[0].id)
+        with QueryBudget(1, exact=True):
+            for callback in callbacks:
+                callback()
+        after = TableVersion.current(['book', 'loan'])
+        self.assertEqual({table: after[table][0] - before[table][0] for table in after}, {'book': 1, 'loan': 1})
+        self.assertEqual(loan.book.status, 'borrowed')
+        self.assertEqual(BorrowerProfile.get_active_loans(self.user.id), 1)
+
+    def test_return_releases_counter(self):
+        loan = self.service.create_loan(self.user.id, self.books[0].id)
+        self.service.process_return(loan.id)
+        with self.assertRaises(ValidationError):
+            self.service.process_return(loan.id)
+        self.assertEqual(BorrowerProfile.get_active_loans(self.user.id), 0)
+
+    def test_rebuild_counters(self):
+        self.service.create_loan(self.user.id, self.books[0].id)
+        BorrowerProfile.objects.filter(user=self.user).update(active_loans=4)
+        self.assertEqual(BorrowerProfile.rebuild(), 1)
+        self.assertEqual(BorrowerProfile.get_active_loans(self.user.id), 1)
+
+    def test_deleting_open_loans_releases_counter(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        loans = [self.service.create_loan(self.user.id, book.id) for book in self.books[:3]]
+        self.service.process_return(loans[2].id)
+
+        self.assertEqual(client.delete(f'/api/loans/{loans[0].id}/').status_code, 204)
+        self.assertEqual(BorrowerProfile.get_active_loans(self.user.id), 1)
+        # Borrado en cascada desde el libro; el préstamo devuelto no descuenta
+        self.books[1].delete()
+        Loan.objects.filter(id=loans[2].id).delete()
+        self.assertEqual(BorrowerProfile.get_active_loans(self.user.id), 0)
+
+        self.service.create_loan(self.user.id, self.books[3].id)
+        self.user.delete()
+        self.assertFalse(BorrowerProfile.objects.exists())
+
+    def test_book_cannot_be_lent_twice(self):
+        other = User.objects.create_user('otro', 'otro@biblioteca.com', 'clave')
+        self.service.create_loan(self.user.id, self.books[0].id)
+        with self.assertRaises(ValidationError):
+            self.service.create_loan(other.id, self.books[0].id)
+        self.assertEqual(Loan.objects.filter(book=self.books[0]).count(), 1)
+
+    def test_limit_rolls_back_claim(self):
+        for book in self.books[:-1]:
+            self.service.create_loan(self.user.id, book.id)
+        with self.assertRaises(ValidationError):
+            self.service.create_loan(self.user.id, self.books[-1].id)
+        self.books[-1].refresh_from_db()
+        self.assertEqual(self.books[-1].status, 'available')
+
+
+class CheckoutConcurrencyTestCase(TransactionTestCase):
+    """Préstamos simultáneos desde varios hilos (comando stress_checkout)."""
+
+    def test_no_double_loans_under_contention(self):
+        output = io.StringIO()
+        call_command('stress_checkout', threads=6, books=3, users=2, attempts=10, stdout=output)
+        report = output.getvalue()
+        self.assertRegex(report, r"'ok': [1-9]")
+        for check in (
+            'libros prestados dos veces', 'usuarios sobre el límite',
+            'contadores desfasados', 'libros marcados sin préstamo',
+        ):
+            self.assertIn(f'{check}: 0', report)
+
+
+class DailyLoanStatsTestCase(TestCase):
+    """Resumen diario mantenido al prestar y devolver."""
+
+    def setUp(self):
+        self.service = LoanService()
+        self.user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        self.loans = [
+            self.service.create_loan(
+                self.user.id,
+                Book.objects.create(title=f'Libro {index}', author='Autor', genre='Novela', code=f'DS-{index}').id
+            )
+            for index in range(3)
+        ]
+        Loan.objects.filter(id=self.loans[0].id).update(due_date=timezone.localdate() - timedelta(days=3))
+        DailyLoanStats.rebuild()
+        self.service.process_return(self.loans[0].id)
+        self.service.process_return(self.loans[1].id)
+
+    def snapshot(self):
+        return list(DailyLoanStats.objects.filter(
+            Q(loans__gt=0) | Q(returns__gt=0) | Q(open_due__gt=0)
+        ).values('day', 'loans', 'returns', 'total_duration', 'late_returns', 'open_due'))
+
+    def test_incremental_matches_rebuild(self):
+        incremental = self.snapshot()
+        DailyLoanStats.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+        self.assertEqual(DailyLoanStats.objects.get(day=timezone.localdate()).late_returns, 1)
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        DailyLoanStats.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_due_date_edit_moves_open_loan(self):
+        due_date = timezone.localdate() + timedelta(days=30)
+        loan = Loan.objects.get(id=self.loans[2].id)
+        loan.due_date = due_date
+        loan.save()
+        self.assertMatchesRebuild()
+        self.assertEqual(DailyLoanStats.objects.get(day=due_date).open_due, 1)
+
+        # Un préstamo devuelto ya no cuenta en ninguna fecha límite
+        returned = Loan.objects.get(id=self.loans[1].id)
+        returned.due_date = due_date
+        returned.save()
+        self.assertMatchesRebuild()
+
+    def test_deleting_loans_updates_rollup(self):
+        Loan.objects.get(id=self.loans[2].id).delete()
+        self.assertMatchesRebuild()
+        self.assertFalse(DailyLoanStats.objects.filter(open_due__gt=0).exists())
+
+        # El préstamo devuelto con atraso también sale de las devoluciones
+        Loan.objects.filter(id=self.loans[0].id).delete()
+        self.assertMatchesRebuild()
+        self.assertEqual(DailyLoanStats.objects.get(day=timezone.localdate()).late_returns, 0)
+
+    def test_bulk_updates_keep_rollup(self):
+        today = timezone.localdate()
+        Loan.objects.filter(returned=False).update(due_date=today + timedelta(days=10))
+        self.assertMatchesRebuild()
+        Loan.objects.filter(id=self.loans[2].id).update(returned=True, returned_date=timezone.now())
+        self.assertMatchesRebuild()
+
+        loan = Loan.objects.get(id=self.loans[0].id)
+        loan.returned_date = timezone.now() + timedelta(days=1)
+        Loan.objects.bulk_update([loan], ['returned_date'])
+        self.assertMatchesRebuild()
+
+    def test_user_statistics_default_to_recent_days(self):
+        Loan.objects.filter(id=self.loans[0].id).update(loan_date=timezone.now() - timedelta(days=60))
+        service = LoanReportService()
+        self.assertEqual(service.get_user_statistics()[0]['total_loans'], 2)
+        self.assertEqual(
+            service.get_user_statistics(start_date=timezone.localdate() - timedelta(days=90))[0]['total_loans'], 3
+        )
+
+    def test_statistics_from_rollup(self):
+        today = timezone.localdate()
+        service = LoanReportService()
+        stats = service.get_loan_statistics(start_date=today, end_date=today)
+        self.assertEqual(stats['total_loans'], 3)
+        self.assertEqual(stats['monthly_breakdown'][0]['total_returns'], 2)
+
+        stats = service.get_loan_statistics(start_date=today + timedelta(days=1))
+        self.assertEqual(stats['total_loans'], 0)
+
+
+class OverdueAgingTestCase(TestCase):
+    """Histograma de préstamos vencidos."""
+
+    def setUp(self):
+        user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        today = timezone.localdate()
+        for index, days_late in enumerate([0, 1, 3, 7, 8, 20, 45, 200]):
+            Loan.objects.bulk_create([Loan(
+                book=Book.objects.create(title=f'Libro {index}', author='Autor', genre='Novela', code=f'AG-{index}'),
+                user=user,
+                due_date=today - timedelta(days=days_late)
+            )])
+        # bulk_create no mantiene el resumen diario
+        DailyLoanStats.rebuild()
+
+    def test_buckets_in_one_query(self):
+        service = LoanReportService()
+        with QueryBudget(1, exact=True):
+            histogram = service._group_by_days_overdue()
+
+        # Multa de 10 por día después de 2 días de gracia
+        self.assertEqual(
+            [(row['range'], row['total'], row['fine_amount']) for row in histogram],
+            [('1-7', 3, 60), ('8-14', 1, 60), ('15-30', 1, 180), ('31-90', 1, 430), ('91+', 1, 1980)]
+        )
+
+    def test_custom_edges(self):
+        service = LoanReportService(aging_edges=[1, 31])
+        totals = [row['total'] for row in service._group_by_days_overdue()]
+        self.assertEqual(totals, [5, 2])
+
+    def test_bulk_update_keeps_histogram(self):
+        today = timezone.localdate()
+        Loan.objects.filter(due_date__lt=today - timedelta(days=30)).update(due_date=today - timedelta(days=2))
+        Loan.objects.filter(due_date=today - timedelta(days=1)).update(returned=True, returned_date=timezone.now())
+        totals = [row['total'] for row in LoanReportService(aging_edges=[1, 31])._group_by_days_overdue()]
+        self.assertEqual(totals, [6, 0])
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTestCase(TestCase):
+    """Entrega diferida de emails desde el outbox."""
+
+    def setUp(self):
+        user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        book = Book.objects.create(title='Libro', author='Autor', genre='Novela', code='OB-1')
+        self.loan = LoanService().create_loan(user.id, book.id)
+
+    def test_checkout_enqueues_without_sending(self):
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxMessage.objects.filter(status=OutboxMessage.STATUS_PENDING).count(), 1)
+
+    def test_worker_delivers_pending(self):
+        call_command('deliver_notifications', '--once', '--workers', '2', stdout=mock.MagicMock())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['lector@biblioteca.com'])
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.STATUS_SENT)
+
+    @override_settings(NOTIFICATION_OUTBOX={'MAX_ATTEMPTS': 2, 'BACKOFF_SECONDS': 0})
+    def test_failures_retry_then_dead_letter(self):
+        service = OutboxService()
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('SMTP caído')):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                self.assertEqual(service.deliver_batch(executor)['retry'], 1)
+                OutboxMessage.objects.update(next_attempt_at=timezone.now())
+                self.assertEqual(service.deliver_batch(executor)['dead'], 1)
+        item = OutboxMessage.objects.get()
+        self.assertEqual((item.status, item.attempts, item.last_error), (OutboxMessage.STATUS_DEAD, 2, 'SMTP caído'))
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxWithoutTransactionTestCase(TransactionTestCase):
+    """Fuera de una transacción la notificación también pasa por el outbox."""
+
+    def test_dispatch_enqueues_outside_atomic(self):
+        user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        book = Book.objects.create(title='Libro', author='Autor', genre='Novela', code='OB-2')
+        loan = Loan.objects.create(book=book, user=user, due_date=timezone.localdate() + timedelta(days=3))
+        self.assertFalse(connection.in_atomic_block)
+
+        self.assertTrue(NotificationService().send_due_date_reminder(loan))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.STATUS_PENDING)
+        self.assertEqual(Notification.objects.get().recipient, 'lector@biblioteca.com')
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class BulkEmailTestCase(TestCase):
+    """Envío masivo con una conexión por lote."""
+
+    def test_send_bulk_reports_each_message(self):
+        service = EmailService()
+        messages = [
+            service.build_message('Aviso', 'Mensaje', recipient)
+            for recipient in ['a@biblioteca.com', '', 'b@biblioteca.com']
+        ]
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open') as open_connection:
+            results = service.send_bulk(messages, batch_size=2)
+        self.assertEqual([result['sent'] for result in results], [True, False, True])
+        self.assertEqual(open_connection.call_count, 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_observer_update_reuses_one_connection(self):
+        observer = EmailObserver()
+        with mock.patch(
+            'apps.biblioteca.services.notification.email_service.get_connection',
+            wraps=mail.get_connection
+        ) as get_connection:
+            results = [
+                observer.update('Aviso', 'Mensaje', recipient)
+                for recipient in ['a@biblioteca.com', 'b@biblioteca.com', 'c@biblioteca.com']
+            ]
+        self.assertEqual(results, [True, True, True])
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+
+class LoanReminderSweepTestCase(TestCase):
+    """Barrido diario de préstamos vencidos."""
+
+    def test_sweep_is_idempotent_per_day(self):
+        user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        today = timezone.localdate()
+        for index in range(5):
+            book = Book.objects.create(title=f'Libro {index}', author='Autor', genre='Novela', code=f'SW-{index}')
+            Loan.objects.create(book=book, user=user, due_date=today + timedelta(days=1))
+        Loan.objects.update(due_date=today - timedelta(days=3))
+
+        service = LoanReminderService()
+        first = list(service.sweep(service.KIND_OVERDUE, today, chunk_size=2))
+        second = list(service.sweep(service.KIND_OVERDUE, today, chunk_size=2))
+
+        self.assertEqual(sum(stats['created'] for stats in first), 5)
+        self.assertEqual(sum(stats['skipped'] for stats in second), 5)
+        self.assertEqual(Notification.objects.filter(kind=service.KIND_OVERDUE).count(), 5)
+        self.assertEqual(OutboxMessage.objects.count(), 5)
+
+    def test_overlapping_sweep_skips_rows_already_sent(self):
+        user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        today = timezone.localdate()
+        for index in range(3):
+            book = Book.objects.create(title=f'Libro {index}', author='Autor', genre='Novela', code=f'SW-{index}')
+            Loan.objects.create(book=book, user=user, due_date=today + timedelta(days=1))
+        Loan.objects.update(due_date=today - timedelta(days=3))
+        first = Loan.objects.order_by('id').first()
+
+        service = LoanReminderService()
+        factory = service.factories[service.KIND_OVERDUE]
+        render = factory.render_notification
+
+        def render_while_other_sweep_runs(loan):
+            # Otro barrido inserta el aviso del primer préstamo entre la
+            # consulta de enviados y la inserción
+            if loan.id == first.id:
+                Notification.objects.create(
+                    subject='Otro barrido', message='-', recipient=user.email,
+                    loan=first, kind=service.KIND_OVERDUE, sent_on=today
+                )
+            return render(loan)
+
+        with mock.patch.object(factory, 'render_notification', side_effect=render_while_other_sweep_runs):
+            stats = list(service.sweep(service.KIND_OVERDUE, today))
+        self.assertEqual((stats[0]['created'], stats[0]['skipped']), (2, 1))
+        self.assertEqual(Notification.objects.filter(loan=first).count(), 1)
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+
+
+class NotificationSubjectTestCase(TestCase):
+    """Reparto paralelo entre observadores."""
+
+    class BlockedObserver(NotificationObserver):
+        def __init__(self):
+            self.release = threading.Event()
+
+        def update(self, subject, message, recipient):
+            return self.release.wait(timeout=5)
+
+    class FastObserver(NotificationObserver):
+        def update(self, subject, message, recipient):
+            return True
+
+    class BrokenObserver(NotificationObserver):
+        def update(self, subject, message, recipient):
+            raise RuntimeError('canal caído')
+
+    def test_slow_and_failing_observers_are_isolated(self):
+        blocked = self.BlockedObserver()
+        notification_subject = NotificationSubject(max_workers=3, timeout=1)
+        notification_subject.attach(blocked, timeout=0.05)
+        notification_subject.attach(self.FastObserver())
+        notification_subject.attach(self.BrokenObserver())
+
+        results = notification_subject.notify('Aviso', 'Mensaje', 'lector@biblioteca.com')
+        blocked.release.set()
+        notification_subject.shutdown()
+
+        self.assertEqual(results, {'BlockedObserver': False, 'FastObserver': True, 'BrokenObserver': False})
+        stats = notification_subject.get_stats()
+        self.assertEqual(stats['BlockedObserver']['timeouts'], 1)
+        self.assertEqual(stats['BrokenObserver']['failures'], 1)
+        self.assertEqual(stats['FastObserver']['calls'], 1)
+
+    def test_transactional_observers_run_in_caller_thread(self):
+        class RecordingObserver(NotificationObserver):
+            transactional = True
+
+            def __init__(self):
+                self.threads = []
+
+            def update(self, subject, message, recipient):
+                self.threads.append(threading.current_thread())
+                return connection.in_atomic_block
+
+        class FailingObserver(NotificationObserver):
+            transactional = True
+
+            def update(self, subject, message, recipient):
+                raise RuntimeError('outbox caído')
+
+        recording = RecordingObserver()
+        notification_subject = NotificationSubject(max_workers=1)
+        notification_subject.attach(recording)
+        with transaction.atomic():
+            results = notification_subject.notify('Aviso', 'Mensaje', 'lector@biblioteca.com')
+        self.assertEqual(results, {'RecordingObserver': True})
+        self.assertEqual(recording.threads, [threading.current_thread()])
+
+        # El error de un canal transaccional llega al llamador para revertir
+        notification_subject.attach(FailingObserver())
+        with self.assertRaises(RuntimeError):
+            notification_subject.notify('Aviso', 'Mensaje', 'lector@biblioteca.com')
+        notification_subject.shutdown()
+        self.assertEqual(notification_subject.get_stats()['FailingObserver']['failures'], 1)
+
+    def test_notification_service_dispatches_through_subject(self):
+        fast = self.FastObserver()
+        notification_subject = NotificationSubject(max_workers=1)
+        notification_subject.attach(fast)
+        user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        book = Book.objects.create(title='Libro', author='Autor', genre='Novela', code='NS-1')
+        loan = Loan.objects.create(book=book, user=user, due_date=timezone.localdate() + timedelta(days=3))
+
+        self.assertTrue(NotificationService(notification_subject).send_due_date_reminder(loan))
+        notification_subject.shutdown()
+        self.assertEqual(notification_subject.get_stats()['FastObserver']['calls'], 1)
+        self.assertFalse(Notification.objects.exists())
+
+
+class NotificationWriterTestCase(TestCase):
+    """Escritura por lotes de notificaciones."""
+
+    def test_flushes_by_size_inside_the_transaction(self):
+        writer = NotificationWriter(max_rows=2)
+        with writer.atomic():
+            counts = []
+            for index in range(3):
+                writer.add('Aviso', f'Mensaje {index}', 'lector@biblioteca.com')
+                counts.append(Notification.objects.count())
+            self.assertEqual(counts, [0, 2, 2])
+            # El resto se escribe al salir del bloque, antes de confirmar
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertEqual(writer.get_metrics()['flushes'], 2)
+
+    def test_rolled_back_rows_are_discarded(self):
+        writer = NotificationWriter()
+        with self.assertRaises(RuntimeError):
+            with writer.atomic():
+                writer.add('Aviso', 'Revertido', 'lector@biblioteca.com')
+                raise RuntimeError
+        self.assertEqual(writer.get_metrics()['rows_written'], 0)
+
+        # El estado del bloque revertido no queda para el siguiente
+        with writer.atomic():
+            writer.add('Aviso', 'Confirmado', 'lector@biblioteca.com')
+            with self.assertRaises(RuntimeError):
+                with writer.atomic():
+                    writer.add('Aviso', 'Savepoint revertido', 'lector@biblioteca.com')
+                    raise RuntimeError
+        self.assertEqual(list(Notification.objects.values_list('message', flat=True)), ['Confirmado'])
+
+    def test_row_in_plain_transaction_is_written_at_once(self):
+        writer = NotificationWriter()
+        with transaction.atomic():
+            writer.add('Aviso', 'Mensaje', 'lector@biblioteca.com')
+            self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(writer.get_metrics()['pending'], 0)
+
+    def test_checkout_notification_goes_through_shared_writer(self):
+        written = get_notification_writer().get_metrics()['rows_written']
+        user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        book = Book.objects.create(title='Libro', author='Autor', genre='Novela', code='NW-1')
+        LoanService().create_loan(user.id, book.id)
+        self.assertEqual(get_notification_writer().get_metrics()['rows_written'], written + 1)
+        self.assertEqual(Notification.objects.get().recipient, 'lector@biblioteca.com')
+
+
+class NotificationWriterTimerTestCase(TransactionTestCase):
+    """Vaciado por tiempo desde el hilo del temporizador."""
+
+    def test_lone_row_is_written_by_timer(self):
+        writer = NotificationWriter(max_seconds=0.1)
+        writer.add('Aviso', 'Mensaje', 'lector@biblioteca.com')
+        timer = writer._timer
+        self.assertIsNotNone(timer)
+        timer.join(5)
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(writer.get_metrics()['pending'], 0)
+
+
+class NotificationInboxTestCase(TestCase):
+    """Bandeja de notificaciones y contador de no leídas."""
+
+    def setUp(self):
+        Notification.unread_cache().clear()
+        self.user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Notification.objects.bulk_create([
+            Notification(subject='Aviso', message=f'Mensaje {index}', recipient=self.user.email)
+            for index in range(3)
+        ] + [Notification(subject='Aviso', message='Otro', recipient='otro@biblioteca.com')])
+
+    def test_unread_count_is_cached_and_invalidated(self):
+        self.assertEqual(Notification.unread_count(self.user.email), 3)
+        with QueryBudget(0, exact=True):
+            self.assertEqual(Notification.unread_count(self.user.email), 3)
+
+        Notification.objects.create(subject='Aviso', message='Nuevo', recipient=self.user.email)
+        self.assertEqual(Notification.unread_count(self.user.email), 4)
+
+    def test_mark_read_is_a_single_update(self):
+        ids = list(Notification.objects.filter(recipient=self.user.email).values_list('id', flat=True))
+        response = self.client.post('/api/notifications/mark_read/', {'ids': ids[:2]}, format='json')
+        self.assertEqual(response.data, {'updated': 2, 'unread': 1})
+
+        response = self.client.post('/api/notifications/mark_read/', {'all': True}, format='json')
+        self.assertEqual(response.data['unread'], 0)
+        self.assertEqual(Notification.unread_count('otro@biblioteca.com'), 1)
+
+        response = self.client.get('/api/notifications/', {'unread': 'false'})
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(self.client.get('/api/notifications/unread_count/').data, {'unread': 0})
+
+    def test_mark_many_skips_recipient_lookup(self):
+        service = DatabaseNotificationService()
+        with self.assertNumQueries(1):
+            self.assertEqual(service.mark_many_as_read(self.user.email), 3)
+
+    def test_invalidation_is_repeated_at_commit(self):
+        self.assertEqual(Notification.unread_count(self.user.email), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.filter(recipient=self.user.email).update(read=True)
+            self.assertEqual(Notification.unread_count(self.user.email), 0)
+            # Otra petición guarda el valor anterior antes de que se confirme
+            Notification.unread_cache().set(UNREAD_COUNT_KEY.format(self.user.email), 3)
+        self.assertEqual(Notification.unread_count(self.user.email), 0)
+
+    def test_invalidation_from_another_cache_instance(self):
+        def process_cache(location):
+            cache = LocMemCache(location, {})
+            cache.clear()
+            return cache
+
+        # Caché compartida: otra instancia sobre el mismo almacenamiento invalida
+        web, worker = process_cache('compartida'), process_cache('compartida')
+        with mock.patch.object(Notification, 'unread_cache', return_value=web):
+            self.assertEqual(Notification.unread_count(self.user.email), 3)
+        with mock.patch.object(Notification, 'unread_cache', return_value=worker):
+            Notification.objects.create(subject='Aviso', message='Nuevo', recipient=self.user.email)
+        with mock.patch.object(Notification, 'unread_cache', return_value=web):
+            self.assertEqual(Notification.unread_count(self.user.email), 4)
+
+        # Caché de otro proceso: la invalidación no llega y el valor vence en segundos
+        web, worker = process_cache('proceso-web'), process_cache('proceso-worker')
+        with mock.patch.object(Notification, 'unread_cache', return_value=web):
+            self.assertEqual(Notification.unread_count(self.user.email), 4)
+        with mock.patch.object(Notification, 'unread_cache', return_value=worker):
+            Notification.objects.create(subject='Aviso', message='Otro', recipient=self.user.email)
+        now = time.time()
+        with mock.patch.object(Notification, 'unread_cache', return_value=web):
+            self.assertEqual(Notification.unread_count(self.user.email), 4)
+            with mock.patch('django.core.cache.backends.locmem.time.time', return_value=now + 6):
+                self.assertEqual(Notification.unread_count(self.user.email), 5)
+
+
+class ExportTestCase(TestCase):
+    """Exportaciones en streaming."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        service = LoanService()
+        for index in range(5):
+            book = Book.objects.create(title=f'Libro {index}', author='Autor', genre='Novela', code=f'EX-{index}')
+            loan = service.create_loan(self.user.id, book.id)
+        service.process_return(loan.id)
+
+    def content(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_loans_csv_in_chunks(self):
+        service = ExportService(chunk_size=2)
+        columns, rows = service.export_loans(['id', 'book_code'], status='open')
+        lines = list(service.render(columns, rows))
+        self.assertEqual(lines[0], 'id,book_code\r\n')
+        self.assertEqual(len(lines), 5)
+
+        response = self.client.get('/api/exports/loans/', {'fields': 'book_code,returned'})
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="prestamos.csv"')
+        self.assertIn('EX-4,True', self.content(response))
+
+    def test_ndjson_and_reports(self):
+        response = self.client.get('/api/exports/books/', {'file_format': 'ndjson', 'status': 'borrowed'})
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual(len(rows), 4)
+
+        response = self.client.get('/api/exports/loan_report/', {'report': 'overdue'})
+        self.assertEqual(self.content(response).splitlines()[0], 'range,min_days,max_days,total,fine_amount')
+
+    def test_invalid_parameters(self):
+        response = self.client.get('/api/exports/loans/', {'fields': 'password'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/exports/books/', {'file_format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_service_built_only_for_exports(self):
+        with mock.patch('apps.biblioteca.views.export_views.ExportService') as export_service:
+            self.assertEqual(APIClient().get('/api/exports/loans/').status_code, 401)
+            self.assertEqual(export_service.call_count, 0)
+
+
+class BookImportTestCase(TestCase):
+    """Importación masiva del catálogo."""
+
+    def test_upsert_by_code(self):
+        Book.objects.create(title='Viejo', author='Autor', genre='Novela', code='IMP-1', status='borrowed')
+        rows = io.StringIO(
+            'code,title,author,genre,status\n'
+            'IMP-1,Nuevo,Autor,Novela,available\n'
+            'IMP-2,Otro,Autor,Cuento,\n'
+            'IMP-2,Otro corregido,Autor,Cuento,\n'
+            'IMP-3,,Autor,Cuento,\n'
+        )
+        service = BookImportService(chunk_size=10)
+        stats = list(service.import_rows(service.read_rows(rows, 'csv')))
+
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(
+            {key: stats[0][key] for key in ('created', 'updated', 'duplicates', 'last_row')},
+            {'created': 1, 'updated': 1, 'duplicates': 1, 'last_row': 4}
+        )
+        self.assertEqual(stats[0]['rejected'], [(4, 'Falta el campo title')])
+        book = Book.objects.get(code='IMP-1')
+        self.assertEqual((book.title, book.status), ('Nuevo', 'borrowed'))
+        self.assertEqual(Book.objects.get(code='IMP-2').title, 'Otro corregido')
+
+    def test_command_resumes_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'catalogo.jsonl')
+            with open(source, 'w', encoding='utf-8') as handle:
+                for index in range(5):
+                    handle.write(json.dumps({
+                        'code': f'JS-{index}', 'title': f'Libro {index}', 'author': 'Autor', 'genre': 'Novela'
+                    }) + '\n')
+            with open(f'{source}.checkpoint', 'w', encoding='utf-8') as handle:
+                json.dump({'source': source, 'last_row': 3}, handle)
+
+            call_command('import_books', source, chunk_size=2, stdout=io.StringIO())
+            self.assertEqual(
+                sorted(Book.objects.values_list('code', flat=True)), ['JS-3', 'JS-4']
+            )
+            self.assertFalse(os.path.exists(f'{source}.checkpoint'))
+
+
+class DatasetServiceTestCase(TestCase):
+    """Generador de datos sintéticos."""
+
+    def test_respects_circulation_rules(self):
+        created = DatasetService(seed=7, batch_size=100).generate(
+            users=20, books=50, loans=400, reservations=30, notifications=40
+        )
+        open_loans = Loan.objects.filter(returned=False)
+        self.assertEqual(open_loans.count(), created['open_loans'])
+        self.assertEqual(open_loans.values('book').distinct().count(), created['open_loans'])
+        self.assertEqual(Book.objects.filter(status='borrowed').count(), created['open_loans'])
+        self.assertFalse(BorrowerProfile.objects.filter(active_loans__gt=Loan.MAX_LOANS).exists())
+        self.assertEqual(BorrowerProfile.rebuild(), 0)
+
+
+@override_settings(REQUEST_PROFILING={'SAMPLE_RATE': 0.0, 'HEADER_SECRET': 'perfil', 'SLOW_REQUEST_MS': 10000})
+class RequestProfilingTestCase(TestCase):
+    """Server-Timing y perfiles muestreados."""
+
+    def setUp(self):
+        profile_store.clear()
+        caches['responses'].clear()
+        self.staff = User.objects.create_user('staff', 'staff@biblioteca.com', 'clave', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_server_timing_without_sampling(self):
+        response = self.client.get('/api/books/')
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ consultas"')
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(profile_store.list(), [])
+
+    def test_header_profiles_request(self):
+        response = self.client.get('/api/books/', HTTP_X_PROFILE='perfil')
+        profile_id = response['X-Profile-Id']
+
+        listing = self.client.get('/api/debug/profiles/').data
+        self.assertEqual([profile['id'] for profile in listing], [int(profile_id)])
+        detail = self.client.get(f'/api/debug/profiles/{profile_id}/').data
+        self.assertIn('cumulative', detail['functions'])
+        self.assertGreater(detail['sql_count'], 0)
+
+        self.client.force_authenticate(User.objects.create_user('lector', 'lector@biblioteca.com', 'clave'))
+        self.assertEqual(self.client.get('/api/debug/profiles/').status_code, 403)
+
+    def test_overlapping_memory_tracing_is_shared(self):
+        if tracemalloc.is_tracing():
+            self.skipTest('tracemalloc ya está activo')
+        first = MemoryTracing().__enter__()
+        second = MemoryTracing().__enter__()
+        # Salir del primero no detiene el rastreo que usa el segundo
+        first.__exit__(None, None, None)
+        self.assertTrue(tracemalloc.is_tracing())
+        self.assertTrue(second.snapshot(5)['peak_shared'])
+        second.__exit__(None, None, None)
+        self.assertFalse(tracemalloc.is_tracing())
+
+        with MemoryTracing() as tracing:
+            self.assertFalse(tracing.snapshot(5)['peak_shared'])
+            tracemalloc.stop()
+            self.assertIn('memory_error', tracing.snapshot(5))
+
+
+@override_settings(METRICS_TOKEN='metricas')
+class MetricsTestCase(TestCase):
+    """Exposición de métricas Prometheus."""
+
+    def test_service_calls_and_backlog(self):
+        book = Book.objects.create(title='Rayuela', author='Julio Cortázar', genre='Novela', code='MET-001')
+        user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        LoanService().create_loan(user.id, book.id)
+
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer metricas')
+        content = response.content.decode()
+        self.assertIn('biblioteca_service_calls_total{method="create_loan",service="LoanService"}', content)
+        self.assertIn('biblioteca_service_duration_seconds_bucket{le="0.001",method="create_loan"', content)
+        self.assertIn('biblioteca_notification_outbox_backlog', content)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_closed_without_token_unless_public(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 401)
+
+        self.client.force_login(User.objects.create_user('lector', 'lector@biblioteca.com', 'clave'))
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.client.force_login(User.objects.create_user('admin', 'admin@biblioteca.com', 'clave', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+        self.client.logout()
+        with self.settings(METRICS_PUBLIC=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_client_errors_are_not_counted(self):
+        def errors(metric, **labels):
+            return REGISTRY.get_sample_value(f'biblioteca_{metric}_errors_total', labels) or 0
+
+        book = Book.objects.create(title='Rayuela', author='Julio Cortázar', genre='Novela', code='MET-002')
+        user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        service = LoanService()
+        service.create_loan(user.id, book.id)
+        before = errors('service', service='LoanService', method='create_loan')
+        with self.assertRaises(ValidationError):
+            service.create_loan(user.id, book.id)
+        self.assertEqual(errors('service', service='LoanService', method='create_loan'), before)
+
+        client = APIClient()
+        client.force_authenticate(user)
+        before = errors('view', view='BookViewSet', action='retrieve')
+        self.assertEqual(client.get('/api/books/999999/').status_code, 404)
+        self.assertEqual(errors('view', view='BookViewSet', action='retrieve'), before)
+
+        before = errors('service', service='FineService', method='get_user_fines')
+        with mock.patch.object(FineService, '_billable', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                FineService().get_user_fines(user.id)
+        self.assertEqual(errors('service', service='FineService', method='get_user_fines'), before + 1)
+
+
+class ConditionalGetTestCase(TestCase):
+    """ETag y Last-Modified a partir de la versión de las tablas."""
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        self.book = Book.objects.create(title='Rayuela', author='Julio Cortázar', genre='Novela', code='CG-001')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_unchanged_list_returns_304(self):
+        response = self.client.get('/api/books/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with self.assertNumQueries(1):
+            cached = self.client.get('/api/books/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        cached = self.client.get('/api/books/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertNotEqual(self.client.get('/api/books/?page_size=10')['ETag'], response['ETag'])
+
+    def test_writes_invalidate_validators(self):
+        books = self.client.get(f'/api/books/{self.book.id}/')['ETag']
+        loans = self.client.get('/api/loans/')['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            loan = LoanService().create_loan(self.user.id, self.book.id)
+        self.assertEqual(self.client.get('/api/books/', HTTP_IF_NONE_MATCH=books).status_code, 200)
+        self.assertEqual(self.client.get('/api/loans/', HTTP_IF_NONE_MATCH=loans).status_code, 200)
+
+        loans = self.client.get('/api/loans/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            LoanService().process_return(loan.id)
+        self.assertEqual(self.client.get('/api/loans/', HTTP_IF_NONE_MATCH=loans).status_code, 200)
+
+        reservations = self.client.get('/api/reservations/')['ETag']
+        Book.objects.filter(id=self.book.id).update(status='borrowed')
+        with self.captureOnCommitCallbacks(execute=True):
+            created = self.client.post('/api/reservations/', {'book_id': self.book.id, 'user_id': self.user.id})
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(
+            self.client.get('/api/reservations/', HTTP_IF_NONE_MATCH=reservations).status_code, 200
+        )
+
+    def test_cascade_delete_bumps_related_tables(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            LoanService().create_loan(self.user.id, self.book.id)
+        before = TableVersion.current(['loan'])['loan'][0]
+        Book.objects.filter(id=self.book.id).update(status='available')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.delete()
+        self.assertEqual(TableVersion.current(['loan'])['loan'][0], before + 1)
+
+
+class BookResponseCacheTestCase(TestCase):
+    """Caché versionada de listado, detalle y búsqueda de libros."""
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        self.book = Book.objects.create(title='Rayuela', author='Julio Cortázar', genre='Novela', code='RC-001')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def cache_hits(self, action):
+        return REGISTRY.get_sample_value(
+            'biblioteca_response_cache_requests_total', {'action': action, 'result': 'hit'}
+        ) or 0
+
+    def test_list_and_search_hits(self):
+        hits = self.cache_hits('list')
+        self.client.get('/api/books/')
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/books/')
+        self.assertEqual(response.json()[0]['title'], 'Rayuela')
+        self.assertEqual(self.cache_hits('list'), hits + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title='Ficciones', author='Jorge Luis Borges', genre='Cuento', code='RC-002')
+        self.assertEqual(len(self.client.get('/api/books/').json()), 2)
+
+        hits = self.cache_hits('search')
+        self.client.get('/api/books/search/', {'query': 'rayuela'})
+        self.client.get('/api/books/search/', {'query': 'rayuela'})
+        self.assertEqual(self.cache_hits('search'), hits + 1)
+
+    def test_detail_invalidated_by_services(self):
+        url = f'/api/books/{self.book.id}/'
+        self.assertEqual(self.client.get(url).json()['status'], 'available')
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            loan = LoanService().create_loan(self.user.id, self.book.id)
+        self.assertEqual(self.client.get(url).json()['status'], 'borrowed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            LoanService().process_return(loan.id, damaged=True)
+        self.assertEqual(self.client.get(url).json()['status'], 'damaged')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BookService().update_book(self.book.id, {'title': 'Rayuela (edición crítica)'})
+        self.assertEqual(self.client.get(url).json()['title'], 'Rayuela (edición crítica)')
+
+    def test_detail_invalidated_by_any_write(self):
+        url = f'/api/books/{self.book.id}/'
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(url, {'title': 'Rayuela (bolsillo)'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url).json()['title'], 'Rayuela (bolsillo)')
+
+        # Escrituras fuera de los servicios: admin, Loan.save, updates masivos
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.filter(id=self.book.id).update(status='damaged')
+        self.assertEqual(self.client.get(url).json()['status'], 'damaged')
+
+    def test_detail_kept_when_other_books_change(self):
+        other = Book.objects.create(title='Ficciones', author='Jorge Luis Borges', genre='Cuento', code='RC-002')
+        url = f'/api/books/{self.book.id}/'
+        self.client.get(url)
+
+        # Un préstamo de otro libro no invalida este detalle, sí el listado
+        with self.captureOnCommitCallbacks(execute=True):
+            LoanService().create_loan(self.user.id, other.id)
+        hits = self.cache_hits('retrieve')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).json()['status'], 'available')
+        self.assertEqual(self.cache_hits('retrieve'), hits + 1)
+        self.assertEqual(self.client.get(f'/api/books/{other.id}/').json()['status'], 'borrowed')
+
+    def test_missing_detail_not_cached(self):
+        self.assertEqual(self.client.get('/api/books/999999/').status_code, 404)
+        self.assertEqual(self.client.get('/api/books/abc/').status_code, 404)
+
+
+class RowMapperTestCase(TestCase):
+    """Los RowMapper producen el mismo JSON que los serializers."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'lector', 'lector@biblioteca.com', 'clave', first_name='Ana', last_name='Vega'
+        )
+        self.books = [
+            Book.objects.create(title=f'Libro {index}', author='Autor', genre='Novela', code=f'RM-{index}')
+            for index in range(3)
+        ]
+        self.loan = LoanService().create_loan(self.user.id, self.books[0].id)
+        LoanService().process_return(LoanService().create_loan(self.user.id, self.books[1].id).id)
+        Reservation.objects.create(
+            book=Book.objects.get(id=self.books[0].id), user=User.objects.create_user('otro')
+        )
+
+    def assertSameJson(self, serializer_class, queryset):
+        renderer = JSONRenderer()
+        mapper = RowMapper(serializer_class)
+        self.assertEqual(
+            renderer.render(mapper.map_rows(mapper.map_queryset(queryset))),
+            renderer.render(serializer_class(queryset, many=True).data)
+        )
+
+    def test_byte_identical_output(self):
+        self.assertSameJson(BookListSerializer, Book.objects.all())
+        self.assertSameJson(LoanDetailSerializer, Loan.objects.select_related('book', 'user'))
+        self.assertSameJson(ReservationDetailSerializer, Reservation.objects.select_related('book', 'user'))
+
+    def test_list_endpoint_uses_mapper(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/loans/?page_size=1')
+        self.assertEqual(
+            response.json()['results'],
+            json.loads(JSONRenderer().render(LoanDetailSerializer(Loan.objects.all()[:1], many=True).data))
+        )
+        following = client.get(response.json()['next']).json()['results']
+        self.assertEqual([loan['id'] for loan in following], [self.loan.id])
+
+
+class SparseFieldsetTestCase(TestCase):
+    """`?fields=` y `?expand=` en préstamos, reservaciones y libros."""
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        self.book = Book.objects.create(title='Rayuela', author='Julio Cortázar', genre='Novela', code='SF-001')
+        self.loan = LoanService().create_loan(self.user.id, self.book.id)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_fields_select_only_needed_columns(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/loans/', {'fields': 'id,book.title,user.username'})
+        self.assertEqual(response.json(), [
+            {'id': self.loan.id, 'book': {'title': 'Rayuela'}, 'user': {'username': 'lector'}}
+        ])
+        sql = context.captured_queries[-1]['sql']
+        self.assertNotIn('"biblioteca_book"."genre"', sql)
+        self.assertNotIn('"auth_user"."email"', sql)
+
+    def test_expand_collapses_other_relations(self):
+        response = self.client.get('/api/loans/', {'expand': 'user', 'page_size': 10})
+        loan = response.json()['results'][0]
+        self.assertEqual(loan['book'], self.book.id)
+        self.assertEqual(loan['user']['username'], 'lector')
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/api/reservations/', {'expand': ''})
+        self.assertNotIn('JOIN', context.captured_queries[-1]['sql'])
+
+    def test_detail_and_errors(self):
+        detail = self.client.get(f'/api/books/{self.book.id}/', {'fields': 'title,status'}).json()
+        self.assertEqual(detail, {'title': 'Rayuela', 'status': 'borrowed'})
+        self.assertEqual(
+            self.client.get(f'/api/loans/{self.loan.id}/', {'fields': 'due_date'}).json(),
+            {'due_date': self.loan.due_date.isoformat()}
+        )
+        self.assertEqual(self.client.get('/api/books/999/', {'fields': 'title'}).status_code, 404)
+
+        response = self.client.get('/api/loans/', {'fields': 'id,book.isbn', 'expand': 'titulo'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('book.isbn', response.json()['error'])
+        self.assertIn('titulo', response.json()['error'])
+
+
+class SqliteProfileTestCase(TestCase):
+    """Pragmas de conexión y comando de mantenimiento."""
+
+    def test_connection_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_maintenance_command(self):
+        output = io.StringIO()
+        call_command('sqlite_maintenance', '--analyze', stdout=output)
+        self.assertIn('ANALYZE', output.getvalue())
+
+
+class FineTestCase(TestCase):
+    """Multas cobradas al devolver y acumuladas por préstamos vencidos."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('moroso', 'moroso@biblioteca.com', 'clave')
+        self.other = User.objects.create_user('puntual', 'puntual@biblioteca.com', 'clave')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        service = LoanService()
+        self.loans = []
+        for index, (user, days_late) in enumerate([(self.user, 10), (self.user, 1), (self.other, 5)]):
+            book = Book.objects.create(title=f'Multa {index}', author='Autor', genre='Novela', code=f'FN-{index}')
+            loan = service.create_loan(user.id, book.id)
+            self.loans.append(loan)
+            # El update masivo no pasa por el resumen diario: los totales salen de Loan
+            Loan.objects.filter(id=loan.id).update(due_date=timezone.localdate() - timedelta(days=days_late))
+
+    def test_accrued_and_assessed_fines(self):
+        service = FineService()
+        # 10 días de atraso con 2 de gracia, y 5 días del otro usuario
+        fines = service.get_user_fines(self.user.id)
+        self.assertEqual(fines['accrued'], 80)
+        self.assertEqual([loan['days_late'] for loan in fines['overdue_loans']], [10])
+        library = service.get_library_fines()
+        self.assertEqual((library['accrued'], library['accrued_loans']), (110, 2))
+        self.assertEqual(service.accrued_fines(Loan.objects.all())['accrued'], 110)
+
+        return_info = LoanService().process_return(self.loans[0].id)
+        self.assertEqual(Loan.objects.get(id=self.loans[0].id).fine_amount, return_info['fine_amount'])
+        fines = service.get_user_fines(self.user.id)
+        self.assertEqual((fines['accrued'], fines['assessed'], fines['outstanding']), (0, 80, 80))
+
+        Loan.objects.filter(id=self.loans[0].id).update(fine_paid=True)
+        self.assertEqual(service.get_library_fines()['outstanding'], 30)
+
+    def test_fines_endpoint(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/users/{self.user.id}/fines/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['outstanding'], 80)
+        self.assertNotIn('library', response.data)
+        self.assertEqual(self.client.get('/api/users/0/fines/').status_code, 404)
+
+    def test_library_fines_endpoint_cached(self):
+        caches['default'].delete(FineService.LIBRARY_FINES_KEY)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/users/fines/')
+        self.assertEqual(response.data['library']['outstanding'], 110)
+
+        # Hasta que vence la caché no vuelve a recorrer los préstamos
+        Loan.objects.filter(id=self.loans[0].id).update(due_date=timezone.localdate())
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/users/fines/').data['library']['outstanding'], 110)
+        caches['default'].delete(FineService.LIBRARY_FINES_KEY)
+        self.assertEqual(self.client.get('/api/users/fines/').data['library']['outstanding'], 30)
+
+    def test_fine_rule_on_loan(self):
+        today = timezone.localdate()
+        self.assertEqual(Loan.fine_for(today - timedelta(days=Loan.GRACE_DAYS), today), 0)
+        self.assertEqual(Loan.fine_for(today - timedelta(days=10), today), 8 * Loan.DAILY_FINE)
+        self.assertEqual(Loan.fine_for(today + timedelta(days=3), today), 0)
+
+    def test_return_through_api_assesses_fine(self):
+        staff = User.objects.create_user('staff', 'staff@biblioteca.com', 'clave', is_staff=True)
+        self.client.force_authenticate(staff)
+        response = self.client.patch(f'/api/loans/{self.loans[0].id}/', {'returned': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        loan = Loan.objects.get(id=self.loans[0].id)
+        self.assertEqual((loan.returned, loan.fine_amount), (True, 80))
+        fines = FineService().get_user_fines(self.user.id)
+        self.assertEqual((fines['accrued'], fines['assessed']), (0, 80))
+
+
+@override_settings(REPORT_REPLICA={'ENABLED': True, 'MAX_STALENESS_SECONDS': 60})
+class ReportReplicaTestCase(TransactionTestCase):
+    """
+    Reportes en la réplica de solo lectura y escrituras en la principal. La
+    réplica de prueba es otra conexión a la misma base, que solo ve los datos
+    confirmados.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.user = User.objects.create_user('lector', 'lector@biblioteca.com', 'clave')
+        self.book = Book.objects.create(title='Replicado', author='Autor', genre='Novela', code='RP-1')
+        self.loan = LoanService().create_loan(self.user.id, self.book.id)
+
+    def snapshot_path(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return os.path.join(directory.name, 'replica.sqlite3')
+
+    def test_reports_read_from_replica(self):
+        service = ExportService()
+        self.assertEqual(service.using, 'replica')
+        self.assertEqual(service.loan_report_service.using, 'replica')
+        self.assertEqual(BookReportService().using, 'replica')
+        columns, rows = service.export_loans(['book_code'], status='open')
+        self.assertEqual(list(rows), [{'book_code': 'RP-1'}])
+
+        with override_settings(REPORT_REPLICA={'ENABLED': False}):
+            self.assertEqual(LoanReportService().using, 'default')
+
+    def test_stale_or_missing_snapshot_falls_back_to_primary(self):
+        path = self.snapshot_path()
+        with mock.patch.dict(connections['replica'].settings_dict, {'NAME': path}):
+            self.assertEqual(get_report_database(), 'default')
+            open(path, 'w').close()
+            self.assertEqual(get_report_database(), 'replica')
+            old = timezone.now().timestamp() - 120
+            os.utime(path, (old, old))
+            self.assertEqual(get_report_database(), 'default')
+
+    def test_writes_go_to_primary(self):
+        book = Book.objects.using('replica').get(id=self.book.id)
+        book.title = 'Editado'
+        book.save()
+        self.assertEqual(book._state.db, 'default')
+        self.assertEqual(self.loan._state.db, 'default')
+
+        LoanService().process_return(self.loan.id)
+        self.assertTrue(Loan.objects.using('replica').get(id=self.loan.id).returned)
+
+    def test_refresh_command_copies_primary(self):
+        path = self.snapshot_path()
+        output = io.StringIO()
+        call_command('refresh_report_replica', '--once', '--output', path, stdout=output)
+        self.assertIn('páginas', output.getvalue())
+
+        with closing(sqlite3.connect(path)) as snapshot:
+            self.assertEqual(snapshot.execute('PRAGMA journal_mode').fetchone()[0], 'delete')
+            codes = snapshot.execute('SELECT code FROM biblioteca_book').fetchall()
+        self.assertEqual(codes, [('RP-1',)])
+
+
+class BookSearchTestCase(TestCase):
+    """Búsqueda FTS5 del catálogo (migración 0004_book_fts)."""
+
+    def setUp(self):
+        self.service = BookSearchService()
+        self.solitude = Book.objects.create(
+            title='Cien años de soledad', author='Gabriel García Márquez', genre='Novela', code='FTS-1'
+        )
+        self.labyrinth = Book.objects.create(
+            title='El laberinto', author='Jorge Luis Borges', genre='Cuento', code='FTS-2'
+        )
+
+    def search(self, query, search_type='all'):
+        return list(self.service.search(query, search_type).values_list('code', flat=True))
+
+    def test_accents_case_and_prefix(self):
+        self.assertTrue(self.service.is_fts_available())
+        self.assertEqual(self.search('anos'), ['FTS-1'])
+        self.assertEqual(self.search('MARQUEZ'), ['FTS-1'])
+        self.assertEqual(self.search('labe'), ['FTS-2'])
+        # Los términos son prefijos: una subcadena interior ya no coincide
+        self.assertEqual(self.search('ledad'), [])
+        self.assertEqual(list(self.service.search_like('ledad').values_list('code', flat=True)), ['FTS-1'])
+
+    def test_column_restriction(self):
+        self.assertEqual(self.search('borges', 'author'), ['FTS-2'])
+        self.assertEqual(self.search('borges', 'title'), [])
+        self.assertEqual(self.search('cuento', 'genre'), ['FTS-2'])
+        self.assertCountEqual(self.search('fts', 'code'), ['FTS-1', 'FTS-2'])
+
+    def test_ordered_by_relevance(self):
+        Book.objects.create(title='Soledad', author='Autor', genre='Poesía', code='FTS-3')
+        # El título corto con el término pesa más en bm25 que el largo
+        self.assertEqual(self.search('soledad'), ['FTS-3', 'FTS-1'])
+        self.assertLess(*self.service.search('soledad').values_list('rank', flat=True))
+
+    def test_triggers_follow_updates_and_deletes(self):
+        Book.objects.filter(id=self.solitude.id).update(title='El otoño del patriarca')
+        self.assertEqual(self.search('soledad'), [])
+        self.assertEqual(self.search('otono'), ['FTS-1'])
+
+        self.labyrinth.delete()
+        self.assertEqual(self.search('laberinto'), [])
+
+
+class KeysetPaginationTestCase(TestCase):
+    """Recorrido completo por cursor con claves de orden repetidas."""
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.user = User.objects.create_user('paginador', 'paginador@biblioteca.com', 'clave')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for index in range(7):
+            # Varios títulos iguales: el id desempata
+            Book.objects.create(title=f'Título {index % 3}', author='Autor', genre='Novela', code=f'KP-{index}')
+        service = LoanService()
+        for book in Book.objects.filter(code__in=['KP-0', 'KP-1', 'KP-2', 'KP-3', 'KP-4']):
+            service.create_loan(self.user.id, book.id)
+        Loan.objects.update(loan_date=timezone.now() - timedelta(days=1))
+
+    def walk(self, url):
+        ids, pages = [], 0
+        response = self.client.get(url, {'page_size': 2})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.data['results']]
+            pages += 1
+            if response.data['next'] is None:
+                return ids, pages
+            response = self.client.get(response.data['next'])
+
+    def test_walks_every_row_once(self):
+        ids, pages = self.walk('/api/books/')
+        expected = list(Book.objects.order_by('title', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 4)
+
+        ids, pages = self.walk('/api/loans/')
+        expected = list(Loan.objects.order_by('-loan_date', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_last_page_and_invalid_cursors(self):
+        response = self.client.get('/api/books/', {'page_size': 10})
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(len(response.data['results']), 7)
+
+        paginator = KeysetPagination()
+        paginator.ordering = ('title', 'id')
+        for cursor in ('no-es-base64!', paginator.encode_cursor(['Título 0']),
+                       paginator.encode_cursor(['Título 0', 1, 2]), paginator.encode_cursor(['Título 0', 'x'])):
+            response = self.client.get('/api/books/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
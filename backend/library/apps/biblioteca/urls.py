@@ -5,6 +5,9 @@ from .views.book_views import BookViewSet
 from .views.loan_views import LoanViewSet
 from .views.reservation_views import ReservationViewSet
 from .views.user_views import UserViewSet
+from .views.notification_views import NotificationViewSet
+from .views.export_views import ExportViewSet
+from .views.profile_views import ProfileViewSet
 
 # Crear router y registrar viewsets
 router = DefaultRouter()
@@ -12,6 +15,9 @@ router.register(r'users', UserViewSet, basename='user')
 router.register(r'books', BookViewSet, basename='book')
 router.register(r'loans', LoanViewSet, basename='loan')
 router.register(r'reservations', ReservationViewSet, basename='reservation')
+router.register(r'notifications', NotificationViewSet, basename='notification')
+router.register(r'exports', ExportViewSet, basename='export')
+router.register(r'debug/profiles', ProfileViewSet, basename='profile')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -19,6 +25,8 @@ urlpatterns = [
 
 # Las URLs generadas automáticamente incluirán:
 # /api/users/
+# /api/users/fines/
+# /api/users/{id}/fines/
 # /api/books/
 # /api/books/search/
 # /api/loans/
@@ -27,4 +35,12 @@ urlpatterns = [
 # /api/loans/statistics/
 # /api/reservations/
 # /api/reservations/active/
-# /api/reservations/cancel/
\ No newline at end of file
+# /api/reservations/cancel/
+# /api/notifications/
+# /api/notifications/unread_count/
+# /api/notifications/mark_read/
+# /api/exports/loans/
+# /api/exports/books/
+# /api/exports/loan_report/
+# /api/exports/book_report/
+# /api/debug/profiles/
\ No newline at end of file
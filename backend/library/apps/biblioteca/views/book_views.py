@@ -5,10 +5,17 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from ..models import Book
 from ..serializers.book_serializers import BookListSerializer, BookDetailSerializer
+from ..serializers.row_mappers import FastListMixin
 from ..services.book.book_service import BookService
+from ..conditional import ConditionalGetMixin
+from ..metrics import instrument_viewset
+from ..response_cache import CachedBookResponseMixin
 
-class BookViewSet(viewsets.ModelViewSet):
+@instrument_viewset
+class BookViewSet(ConditionalGetMixin, CachedBookResponseMixin, FastListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
+    version_tables = ('book',)
+    row_version_field = 'updated_at'
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -32,6 +39,9 @@ class BookViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def search(self, request):
+        return self.cached_response('search', self._search, request)
+
+    def _search(self, request):
         query = request.query_params.get('query', '')
         search_type = request.query_params.get('type', 'all')
         
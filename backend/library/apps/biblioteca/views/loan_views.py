@@ -3,21 +3,28 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from datetime import date
+from django.core.exceptions import ValidationError
+from django.utils import timezone
 from ..models import Loan
 from ..serializers.loan_serializers import LoanCreateSerializer, LoanDetailSerializer
+from ..serializers.row_mappers import FastListMixin
 from ..services.loan.loan_service import LoanService
 from ..services.report.loan_report_service import LoanReportService
+from ..conditional import ConditionalGetMixin
+from ..metrics import instrument_viewset
 
-class LoanViewSet(viewsets.ModelViewSet):
+@instrument_viewset
+class LoanViewSet(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
+    version_tables = ('loan', 'book', 'user')
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.loan_service = LoanService()
-        self.report_service = LoanReportService()
 
     def get_queryset(self):
-        return Loan.objects.all()
+        return Loan.objects.select_related('book', 'user')
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -53,10 +60,30 @@ class LoanViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['get'])
+    def overdue(self, request):
+        overdue_loans = self.get_queryset().filter(
+            returned=False,
+            due_date__lt=timezone.localdate()
+        )
+        return self.fast_list(overdue_loans)
+
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         try:
-            stats = self.report_service.get_loan_statistics()
+            # Solo esta acción usa reportes: no se crea el servicio en cada petición
+            stats = LoanReportService().get_loan_statistics(
+                start_date=self._parse_date(request.query_params.get('start_date')),
+                end_date=self._parse_date(request.query_params.get('end_date'))
+            )
             return Response(stats)
         except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    def _parse_date(self, value: str):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise ValidationError(f"Fecha inválida: {value}, use el formato AAAA-MM-DD")
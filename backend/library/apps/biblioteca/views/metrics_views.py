@@ -0,0 +1,21 @@
+# views/metrics_views.py
+from django.conf import settings
+from django.http import HttpResponse
+from ..metrics import render_metrics
+
+def metrics(request):
+    """
+    Métricas en formato Prometheus. Se exige METRICS_TOKEN como Bearer o una
+    sesión de staff, salvo que METRICS_PUBLIC las deje abiertas (p. ej. en
+    una red interna).
+    """
+    if not (getattr(settings, 'METRICS_PUBLIC', False) or _authorized(request)):
+        return HttpResponse(status=401)
+    content, content_type = render_metrics()
+    return HttpResponse(content, content_type=content_type)
+
+def _authorized(request) -> bool:
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization') == f'Bearer {token}':
+        return True
+    return request.user.is_authenticated and request.user.is_staff
@@ -0,0 +1,45 @@
+# views/notification_views.py
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from ..models import Notification
+from ..serializers.notification_serializers import NotificationSerializer, MarkReadSerializer
+from ..services.notification.database_notification_service import DatabaseNotificationService
+from ..metrics import instrument_viewset
+
+@instrument_viewset
+class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+    """Bandeja de notificaciones del usuario autenticado"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = NotificationSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.notification_service = DatabaseNotificationService()
+
+    def get_queryset(self):
+        notifications = Notification.objects.filter(recipient=self.request.user.email)
+        unread = self.request.query_params.get('unread')
+        if unread is not None:
+            notifications = notifications.filter(read=unread.lower() in ('0', 'false'))
+        return notifications
+
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        return Response({
+            'unread': self.notification_service.get_unread_count(request.user.email)
+        })
+
+    @action(detail=False, methods=['post'])
+    def mark_read(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = None if serializer.validated_data['all'] else serializer.validated_data['ids']
+        updated = self.notification_service.mark_many_as_read(request.user.email, ids)
+        return Response({
+            'updated': updated,
+            'unread': self.notification_service.get_unread_count(request.user.email)
+        })
@@ -0,0 +1,25 @@
+# views/profile_views.py
+from rest_framework import viewsets, status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+from ..profiling import profile_store
+
+class ProfileViewSet(viewsets.ViewSet):
+    """Perfiles recientes guardados por RequestProfilingMiddleware (solo staff)"""
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        summary_fields = ('id', 'method', 'path', 'status', 'started_at', 'wall_ms', 'sql_count', 'sql_ms', 'sampled')
+        return Response([
+            {field: profile[field] for field in summary_fields}
+            for profile in profile_store.list()
+        ])
+
+    def retrieve(self, request, pk=None):
+        try:
+            profile = profile_store.get(int(pk))
+        except ValueError:
+            profile = None
+        if profile is None:
+            return Response({'error': 'Perfil no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(profile)
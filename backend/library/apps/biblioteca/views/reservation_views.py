@@ -8,12 +8,17 @@ from ..serializers.reservation_serializers import (
     ReservationCreateSerializer, 
     ReservationDetailSerializer
 )
+from ..serializers.row_mappers import FastListMixin
+from ..conditional import ConditionalGetMixin
+from ..metrics import instrument_viewset
 
-class ReservationViewSet(viewsets.ModelViewSet):
+@instrument_viewset
+class ReservationViewSet(ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
+    version_tables = ('reservation', 'book', 'user')
 
     def get_queryset(self):
-        return Reservation.objects.all()
+        return Reservation.objects.select_related('book', 'user')
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -36,5 +41,4 @@ class ReservationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def active(self, request):
         active_reservations = self.get_queryset().filter(active=True)
-        serializer = self.get_serializer(active_reservations, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return self.fast_list(active_reservations)
\ No newline at end of file
@@ -1,10 +1,27 @@
 # views/user_views.py
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from django.contrib.auth.models import User
 from ..serializers.user_serializers import UserSerializer
+from ..services.fine.fine_service import FineService
+from ..metrics import instrument_viewset
 
+@instrument_viewset
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
-    permission_classes = [IsAuthenticated]
\ No newline at end of file
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=True, methods=['get'])
+    def fines(self, request, pk=None):
+        """Multas pendientes del usuario."""
+        user = self.get_object()
+        # Solo estas acciones usan multas: no se crea el servicio en cada petición
+        return Response({'user': FineService().get_user_fines(user.id)})
+
+    @action(detail=False, methods=['get'], url_path='fines')
+    def library_fines(self, request):
+        """Totales de la biblioteca, guardados unos segundos (ver FineService)."""
+        return Response({'library': FineService().get_cached_library_fines()})
@@ -59,6 +59,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'apps.biblioteca.pagination.KeysetPagination',
     'DATETIME_FORMAT': '%Y-%m-%d %H:%M:%S',
     'DATE_FORMAT': '%Y-%m-%d'
 }
@@ -72,6 +73,7 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    'apps.biblioteca.profiling.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -132,13 +134,61 @@ WSGI_APPLICATION = 'library.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Perfil de producción de SQLite, aplicado al abrir cada conexión:
+# - WAL: las lecturas no bloquean a las escrituras ni al revés.
+# - synchronous=NORMAL: en WAL solo hace fsync en los checkpoints; una caída
+#   del sistema puede perder las últimas transacciones, nunca corromper.
+# - busy_timeout: espera el bloqueo en lugar de fallar con "database is locked".
+# - cache_size negativo está en KiB; mmap_size en bytes.
+# BEGIN IMMEDIATE toma el bloqueo de escritura al abrir la transacción, así
+# dos transacciones no fallan al intentar pasar de lectura a escritura.
+SQLITE_PRODUCTION_PROFILE = os.getenv('SQLITE_PRODUCTION_PROFILE', 'true').lower() == 'true'
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 10000)),
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+            'transaction_mode': 'IMMEDIATE',
+        } if SQLITE_PRODUCTION_PROFILE else {},
     }
 }
 
+# Réplica de solo lectura para reportes y exportaciones. Por defecto es un
+# snapshot SQLite de la base principal que refresh_report_replica copia con la
+# API de backup en línea; para usar una réplica de otro motor basta con
+# reemplazar DATABASES['replica']. Si el snapshot no existe o es más antiguo que
+# MAX_STALENESS_SECONDS, los reportes leen de la base principal. El resto de
+# la aplicación (préstamos, devoluciones) siempre usa la principal.
+REPORT_REPLICA = {
+    'ENABLED': os.getenv('REPORT_REPLICA_ENABLED', 'false').lower() == 'true',
+    'ALIAS': 'replica',
+    'MAX_STALENESS_SECONDS': int(os.getenv('REPORT_REPLICA_MAX_STALENESS', 900)),
+    'REFRESH_SECONDS': int(os.getenv('REPORT_REPLICA_REFRESH_SECONDS', 300)),
+}
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.getenv('REPORT_REPLICA_NAME', BASE_DIR / 'db.replica.sqlite3'),
+    'OPTIONS': {
+        'init_command': 'PRAGMA query_only=ON;' + ';'.join(
+            f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()
+            if name in ('cache_size', 'mmap_size', 'temp_store')
+        ),
+    },
+    # En las pruebas la réplica es la misma base de prueba
+    'TEST': {'MIRROR': 'default'},
+}
+DATABASE_ROUTERS = ['apps.biblioteca.routers.PrimaryReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -194,3 +244,72 @@ EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', 'javiigonzaga2012@gmail.com')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', 'myoq aknj oydu goiu')
+EMAIL_BATCH_SIZE = 100  # Emails enviados por conexión SMTP en EmailService.send_bulk
+
+# Entrega en segundo plano de emails (manage.py deliver_notifications)
+NOTIFICATION_OUTBOX = {
+    'WORKERS': int(os.getenv('NOTIFICATION_OUTBOX_WORKERS', 4)),
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_SECONDS': 30,
+    'MAX_BACKOFF_SECONDS': 3600,
+    'CLAIM_TIMEOUT_SECONDS': 300,
+}
+
+# Caché y segundos que se conserva el contador de notificaciones no leídas.
+# Con una caché compartida (Redis, Memcached) la invalidación llega a todos los
+# procesos; con LocMemCache no, y el contador solo se guarda unos segundos
+NOTIFICATION_UNREAD_CACHE_ALIAS = 'responses'
+NOTIFICATION_UNREAD_CACHE_TIMEOUT = 3600
+NOTIFICATION_UNREAD_LOCAL_CACHE_TIMEOUT = 5
+
+# Días de atraso con los que empieza cada tramo del histograma de vencidos
+LOAN_AGING_EDGES = (1, 8, 15, 31, 91)
+
+# Caché y segundos que se conservan los totales de multas de la biblioteca
+# (/api/users/fines/): recorren todos los préstamos abiertos vencidos
+LIBRARY_FINES_CACHE_ALIAS = 'default'
+LIBRARY_FINES_CACHE_TIMEOUT = 60
+
+# Días que cubren las estadísticas por usuario cuando no se indica fecha inicial
+LOAN_USER_STATISTICS_DAYS = 30
+
+# Métricas por petición (Server-Timing) y perfiles en /api/debug/profiles/
+REQUEST_PROFILING = {
+    'SAMPLE_RATE': float(os.getenv('PROFILING_SAMPLE_RATE', 0)),
+    'HEADER_SECRET': os.getenv('PROFILING_HEADER_SECRET', ''),
+    'SLOW_REQUEST_MS': 1000,
+    'BUFFER_SIZE': 100,
+}
+
+# /metrics exige este token Bearer (o una sesión de staff); METRICS_PUBLIC=true
+# lo deja sin autenticación, p. ej. detrás de una red interna
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_PUBLIC = os.getenv('METRICS_PUBLIC', 'false').lower() == 'true'
+
+# 'responses' guarda los datos serializados del catálogo (BookResponseCache)
+# y el contador de notificaciones no leídas.
+# Por defecto es locmem, un LRU por proceso acotado por MAX_ENTRIES; con
+# varios procesos conviene un backend compartido (archivo, Redis, Memcached),
+# que aplica su propia política de desalojo
+RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': RESPONSE_CACHE_BACKEND,
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', 'biblioteca-responses'),
+    },
+}
+if RESPONSE_CACHE_BACKEND.endswith(('LocMemCache', 'FileBasedCache')):
+    CACHES['responses']['OPTIONS'] = {
+        'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 5000)),
+        'CULL_FREQUENCY': 10,
+    }
+
+BOOK_RESPONSE_CACHE = {
+    'ENABLED': os.getenv('BOOK_RESPONSE_CACHE', 'true').lower() == 'true',
+    'ALIAS': 'responses',
+    'TIMEOUT': 300,
+}